@@ -0,0 +1,254 @@
+"""
+Analytics caches keyed explicitly by trade date
+
+Every cache is partitioned per trade date and bounded (entries per trade date & number of trade dates, least
+recently used first out). A trade date is referenced while it is the env trade date or while it is retained by a
+caller (see retain/release), its entries are evicted from all caches once it is no longer referenced. Caches of a
+new env trade date are pre-warmed in a background thread when env.tweak_env() changes it.
+"""
+
+import datetime as dt
+import env
+import inspect
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+
+
+class TradeDateCache:
+
+    """
+    Bounded cache of values keyed by (trade date, key), one least recently used partition per trade date
+
+    The generation is incremented by every eviction or clear, a put of a value computed from data read at an older
+    generation is dropped.
+    """
+
+    __slots__ = ('name', 'max_entries', 'max_dates', 'partitions', 'lock', 'hits', 'misses', 'generation')
+
+    MISSING = object()
+
+    def __init__(self, name: str, max_entries: int = 1024, max_dates: int = 4):
+        assert max_entries > 0
+        assert max_dates > 0
+
+        self.name = name
+        self.max_entries = max_entries
+        self.max_dates = max_dates
+        self.partitions = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    def get(self, trade_date: dt.date, key: tuple) -> object:
+        """
+        :return: cached value or TradeDateCache.MISSING
+        """
+        with self.lock:
+            partition = self.partitions.get(trade_date)
+            if partition is None or key not in partition:
+                self.misses += 1
+                return self.MISSING
+
+            self.partitions.move_to_end(trade_date)
+            partition.move_to_end(key)
+            self.hits += 1
+
+            return partition[key]
+
+    def put(self, trade_date: dt.date, key: tuple, value: object, generation: int = None) -> bool:
+        """
+        :param generation: generation the value was computed at, the value is dropped if the cache was invalidated since
+        :return: whether the value was stored
+        """
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return False
+
+            partition = self.partitions.get(trade_date)
+            if partition is None:
+                partition = self.partitions[trade_date] = OrderedDict()
+                while len(self.partitions) > self.max_dates:
+                    self.partitions.popitem(last=False)
+            self.partitions.move_to_end(trade_date)
+
+            partition[key] = value
+            partition.move_to_end(key)
+            while len(partition) > self.max_entries:
+                partition.popitem(last=False)
+
+            return True
+
+    def evict(self, trade_date: dt.date) -> None:
+        with self.lock:
+            self.partitions.pop(trade_date, None)
+            self.generation += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.partitions.clear()
+            self.generation += 1
+
+    def trade_dates(self) -> list:
+        with self.lock:
+            return list(self.partitions.keys())
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'trade_dates': len(self.partitions),
+                'entries': sum(len(partition) for partition in self.partitions.values())
+            }
+
+
+caches = []
+references = Counter()
+references_lock = threading.Lock()
+
+
+def trade_date_cache(max_entries: int = 1024, max_dates: int = 4):
+    """
+    Decorator caching a function whose trade_date argument keys the cache partition, the remaining (bound)
+    arguments key the entry. The wrapper exposes cache (TradeDateCache), cache_clear() & prime(value, ...) i.e.
+    store the value of a call without computing it (unless the cache was invalidated since the given generation).
+    """
+    def decorator(function):
+        signature = inspect.signature(function)
+        assert 'trade_date' in signature.parameters
+
+        cache = TradeDateCache(name=function.__qualname__, max_entries=max_entries, max_dates=max_dates)
+        caches.append(cache)
+
+        def cache_key(args, kwargs) -> tuple:
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            arguments = dict(arguments.arguments)
+            trade_date = arguments.pop('trade_date')
+
+            return trade_date, tuple(arguments.items())
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            trade_date, key = cache_key(args, kwargs)
+            value = cache.get(trade_date, key)
+            if value is TradeDateCache.MISSING:
+                # a value read before a concurrent invalidation is returned but not cached
+                generation = cache.generation
+                value = function(*args, **kwargs)
+                cache.put(trade_date, key, value, generation=generation)
+
+            return value
+
+        def prime(value, *args, generation: int = None, **kwargs) -> bool:
+            trade_date, key = cache_key(args, kwargs)
+
+            return cache.put(trade_date, key, value, generation=generation)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.prime = prime
+
+        return wrapper
+
+    return decorator
+
+
+def retain(trade_date: dt.date) -> None:
+    with references_lock:
+        references[trade_date] += 1
+
+
+def release(trade_date: dt.date) -> None:
+    """
+    Drop a reference to trade_date, its entries are evicted from all caches once it is no longer referenced
+    """
+    with references_lock:
+        references[trade_date] -= 1
+        if references[trade_date] > 0:
+            return
+        del references[trade_date]
+
+    evict(trade_date)
+
+
+def evict(trade_date: dt.date) -> None:
+    for cache in caches:
+        cache.evict(trade_date)
+
+
+def clear() -> None:
+    for cache in caches:
+        cache.clear()
+
+
+def stats() -> dict:
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def prewarm(trade_date: dt.date, background: bool = True):
+    """
+    Loads the market snapshot of trade_date and primes the per expiry smile, ATM strike & yield curve caches from it
+
+    Nothing is primed for a trade date that is no longer referenced, nor into a cache invalidated (market data
+    persisted, trade date released) while the snapshot loads.
+
+    :return: the (daemon) pre-warm thread when background is set, otherwise None
+    """
+    if background:
+        thread = threading.Thread(target=prewarm, args=(trade_date, False), name=f'prewarm-{trade_date}', daemon=True)
+        thread.start()
+
+        return thread
+
+    import numpy as np
+    from analytics.constants import FUTURES_DELIVERY_MAP
+    from analytics.curves.yield_curve import yield_curve
+    from analytics.exceptions import BlackScholesCalculationError
+    from analytics.options.volatility import atm_strike, implied_vol_smile
+    from market.snapshot import MarketSnapshot
+
+    # generations are captured before the reference check, a release in between invalidates them
+    generations = {
+        function: function.cache.generation for function in (yield_curve, implied_vol_smile, atm_strike)
+    }
+    with references_lock:
+        if trade_date not in references:
+            return
+
+    months = {code: month for month, code in FUTURES_DELIVERY_MAP.items()}
+    snapshot = MarketSnapshot.load(trade_date=trade_date)
+
+    if np.all(np.isfinite(snapshot.yield_curve.rates)):
+        yield_curve.prime(snapshot.yield_curve, trade_date=trade_date, generation=generations[yield_curve])
+
+    for symbol in snapshot.ivm_index:
+        # {contract}_{exchange code}_{futures code}_{options code}_{expiration}_IVM
+        contract, exchange_code, __, __, expiration, __ = symbol.split('_')
+        kwargs = dict(contract=contract, exchange_code=exchange_code, month=months[expiration[0]], year=expiration[1:])
+        try:
+            implied_vol_smile.prime(
+                snapshot.implied_vol_smile(**kwargs), trade_date=trade_date, generation=generations[implied_vol_smile],
+                **kwargs
+            )
+            atm_strike.prime(
+                snapshot.atm_strike(**kwargs), trade_date=trade_date, generation=generations[atm_strike], **kwargs
+            )
+        except BlackScholesCalculationError:
+            # no smile of the expiry on trade_date
+            continue
+
+
+def _on_tweak(key: str, old_value, new_value) -> None:
+    if key != 'TRADE_DATE' or old_value == new_value:
+        return
+
+    retain(new_value)
+    release(old_value)
+    prewarm(new_value)
+
+
+retain(env.TRADE_DATE)
+env.on_tweak(_on_tweak)
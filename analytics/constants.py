@@ -30,6 +30,23 @@ CONTRACT_DEFAULT_EXCHANGE_MAP = {
 }
 
 
+def default_exchange_codes(contract, exchange_code):
+    """
+    :param contract: array of upper case contracts
+    :param exchange_code: array of exchange codes (same shape), missing (None/NaN/'') exchange codes fall back to the
+                          contract default exchange
+    :return: array of upper case exchange codes
+    """
+    import numpy as np
+    import pandas as pd
+
+    return np.array([
+        (CONTRACT_DEFAULT_EXCHANGE_MAP.get(_contract, '') if pd.isna(_exchange_code) or not _exchange_code
+         else _exchange_code).upper()
+        for _contract, _exchange_code in zip(contract, exchange_code)
+    ], dtype=str)
+
+
 class BlackScholesLimits:
 
     MAX32 = 2147483248.0
@@ -1,45 +1,165 @@
 import datetime
+import numpy as np
 import pandas as pd
+from analytics.cache import trade_date_cache
 from analytics.exceptions import BlackScholesCalculationError
 from api import LocalClient as c
-from functools import lru_cache
+from market.datastore_adapter import DataAPI
+
+
+class YieldCurve:
+
+    """
+    Yield curve of a trade date, tenors (years) & continuously compounded zero rates are held as float64 arrays
+
+    Interpolation:
+    - 'linear': linear on rates
+    - 'log_linear': linear on log discount factors i.e. piecewise flat forward rates
+    - 'monotone_cubic': monotone (PCHIP) cubic on rates, no overshoot between tenors
+
+    Extrapolation beyond the curve tenors:
+    - 'raise': BlackScholesCalculationError
+    - 'flat': zero rate of the nearest tenor e.g. the 1M rate for options within a month of expiry, only where a
+      caller asks for it
+    """
+
+    __slots__ = ('tenors', 'rates', 'interpolation', 'log_discount_factors', 'cubic')
+
+    # Fed Reserve US Treasury Constant Maturity
+    SYMBOL = 'RIFLGFC'
+    TENORS = (1/12, 3/12, 6/12, 1, 2, 3, 5, 7, 10, 20, 30)
+    INTERPOLATIONS = ('linear', 'log_linear', 'monotone_cubic')
+    EXTRAPOLATIONS = ('raise', 'flat')
+
+    def __init__(self, tenors, rates, interpolation: str = 'linear'):
+        assert interpolation in self.INTERPOLATIONS
+
+        self.tenors = np.asarray(tenors, dtype=np.float64)
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self.interpolation = interpolation
+
+        assert self.tenors.ndim == 1
+        assert self.tenors.shape == self.rates.shape
+        assert np.all(np.diff(self.tenors) > 0)
+
+        self.log_discount_factors = -self.rates * self.tenors
+        self.cubic = None
+        if interpolation == 'monotone_cubic' and np.all(np.isfinite(self.rates)):
+            from scipy.interpolate import PchipInterpolator
+
+            self.cubic = PchipInterpolator(self.tenors, self.rates, extrapolate=False)
+
+    @classmethod
+    def from_market_data(cls, trade_date: datetime.date, as_of=None, interpolation: str = 'linear'):
+        assert trade_date
+
+        dataframe = c.data(symbol=cls.SYMBOL, start_date=trade_date, end_date=trade_date, as_of=as_of)
+        data_row = dataframe[dataframe.index == pd.Timestamp(trade_date)]
+        if not len(data_row):
+            raise BlackScholesCalculationError(f'Missing yield curve market data for trade date {trade_date}')
+
+        return cls(tenors=cls.TENORS, rates=data_row.values[0], interpolation=interpolation)
+
+    @classmethod
+    def interpolate(
+            cls, rates, t, tenors=TENORS, interpolation: str = 'linear', extrapolation: str = 'raise'
+    ) -> np.ndarray:
+        """
+        Vectorised rate() of a stack of curves e.g. a yield curve time series, each curve at its own year fraction
+
+        :param rates: (curves x tenors) array of zero rates
+        :param t: array of year fractions, one per curve
+        :return: array of zero rates, one per curve
+        """
+        assert interpolation in cls.INTERPOLATIONS
+
+        tenors = np.asarray(tenors, dtype=np.float64)
+        rates = np.asarray(rates, dtype=np.float64)
+        t = cls._extrapolate(tenors, np.asarray(t, dtype=np.float64), extrapolation)
+
+        assert t.ndim == 1
+        assert rates.shape == t.shape + tenors.shape
+
+        if interpolation == 'monotone_cubic':
+            return np.array([
+                cls(tenors=tenors, rates=_rates, interpolation=interpolation).rate(_t, extrapolation='flat')
+                for _rates, _t in zip(rates, t)
+            ], dtype=np.float64)
+
+        values = rates if interpolation == 'linear' else -rates * tenors
+        upper = np.clip(np.searchsorted(tenors, t), 1, len(tenors) - 1)
+        weight = (t - tenors[upper - 1]) / (tenors[upper] - tenors[upper - 1])
+        rows = np.arange(len(t))
+        value = (1 - weight) * values[rows, upper - 1] + weight * values[rows, upper]
+
+        return value if interpolation == 'linear' else -value / t
+
+    @classmethod
+    def _extrapolate(cls, tenors: np.ndarray, t: np.ndarray, extrapolation: str) -> np.ndarray:
+        assert extrapolation in cls.EXTRAPOLATIONS
+
+        if extrapolation == 'flat':
+            return np.clip(t, tenors[0], tenors[-1])
+
+        with np.errstate(invalid='ignore'):
+            if np.any((t < tenors[0]) | (t > tenors[-1])):
+                raise BlackScholesCalculationError(f'Tenor {t} is not supported on the yield curve')
+
+        return t
+
+    def rate(self, t, extrapolation: str = 'raise'):
+        """
+        :param t: scalar or array of year fractions
+        :param extrapolation: beyond the curve tenors, see YieldCurve.EXTRAPOLATIONS
+        :return: zero rate, float for a scalar t otherwise an array
+        """
+        t_array = self._extrapolate(self.tenors, np.asarray(t, dtype=np.float64), extrapolation)
+
+        if self.interpolation == 'linear':
+            rate = np.interp(t_array, self.tenors, self.rates)
+        elif self.interpolation == 'log_linear':
+            rate = -np.interp(t_array, self.tenors, self.log_discount_factors) / t_array
+        elif self.cubic is not None:
+            rate = self.cubic(t_array)
+        else:
+            rate = np.full(t_array.shape, np.nan)
+
+        return rate if np.ndim(t) else float(rate)
+
+    def discount_factor(self, t, extrapolation: str = 'raise'):
+        """
+        :param t: scalar or array of year fractions
+        :param extrapolation: beyond the curve tenors, see YieldCurve.EXTRAPOLATIONS
+        :return: discount factor, float for a scalar t otherwise an array
+        """
+        discount_factor = np.exp(-self.rate(t, extrapolation=extrapolation) * np.asarray(t, dtype=np.float64))
+
+        return discount_factor if np.ndim(t) else float(discount_factor)
+
+
+@trade_date_cache(max_entries=16)
+def yield_curve(trade_date: datetime.date, as_of=None, interpolation: str = 'linear') -> YieldCurve:
+    return YieldCurve.from_market_data(trade_date=trade_date, as_of=as_of, interpolation=interpolation)
 
 
-@lru_cache
 def interpolate_rate(
-        trade_date: datetime.date, expiry_date: datetime.date
+        trade_date: datetime.date, expiry_date: datetime.date, as_of=None, interpolation: str = 'linear',
+        extrapolation: str = 'raise'
 ) -> float:
     assert trade_date
     assert expiry_date
     assert expiry_date > trade_date
 
-    # Fed Reserve US Treasury Constant Maturity
-    symbol = 'RIFLGFC'
-    dataframe = c.data(symbol=symbol)
-    dataframe.columns = [1/12, 3/12, 6/12, 1, 2, 3, 5, 7, 10, 20, 30]
-    data_row = dataframe.loc[pd.Timestamp(trade_date)]
     year_faction = (expiry_date - trade_date).days / 365.25
 
-    if year_faction < data_row.index[0] or year_faction > data_row.index[-1]:
-        raise BlackScholesCalculationError(f'Expiry date {expiry_date} is not supported on the yield curve')
+    return yield_curve(trade_date=trade_date, as_of=as_of, interpolation=interpolation).rate(
+        year_faction, extrapolation=extrapolation
+    )
 
-    index = None
-    for i, index_value in enumerate(data_row.index):
-        if index_value >= year_faction:
-            index = data_row.index[i - 1:]
-            break
-    interpolation_rates = data_row[index]
 
-    """
-    Example: 6.3Y rate -> use 5Y (1.49%) & 7Y (2.13%) interpolation
-    effective_annual_rate_5y = math.log(1 + (1+0.0149/2)**(2) - 1) = 0.01484477163127614
-    effective_annual_rate_7y = math.log(1 + (1+0.0213/2)**(2) - 1) = 0.02118737642173995
-    weight_5y = (7 - 6.3)/(7 - 5)
-    weight_7y = 1 - weight_5y
-    rate_interpolated = weight_5y * effective_annual_rate_5y + weight_7y * effective_annual_rate_7y
-    """
-    weight_1 = (index[1] - year_faction) / (index[1] - index[0])
-    weight_2 = 1 - weight_1
-    rate = weight_1 * interpolation_rates.values[0] + weight_2 * interpolation_rates.values[1]
+def _invalidate(symbol: str) -> None:
+    if symbol == YieldCurve.SYMBOL:
+        yield_curve.cache_clear()
+
 
-    return rate
+DataAPI.on_persist(_invalidate)
@@ -0,0 +1,78 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+from analytics.exceptions import BlackScholesCalculationError
+from analytics.portfolio import Portfolio
+
+
+def commodity_option_history(
+        contract: str, month: str, year: str, option_type: str, start_date: dt.date, end_date: dt.date,
+        strike: float = None, exchange_code: str = None, quantity: float = 1., second_order: bool = False, as_of=None,
+        extrapolation: str = 'raise'
+) -> pd.DataFrame:
+    """
+    Historical repricing of a commodity option position over every trade date of a date range in one pass
+
+    The IVM rows of the expiry and the yield curve rows of the range are read with one (date filtered) query each,
+    the market inputs of all trade dates are then built as arrays and priced with a single BlackScholesBatchPricer.
+    Rates are interpolated (linear) at each date's time to expiry, as the option pricers do, with
+    YieldCurve.interpolate() of the yield curve rows.
+
+    :param strike: Optional, fixed strike, the ATM strike (future) of each trade date when not set
+    :param quantity: position quantity in lots, PV & greeks are scaled by lot size * quantity
+    :param extrapolation: times to expiry beyond the curve tenors, see YieldCurve.EXTRAPOLATIONS i.e. 'flat' prices
+                          the dates within a month of expiry at the 1M rate
+    :return: DataFrame indexed by Date (trade dates with both IVM & yield curve rows) of the market inputs (FS, X, T,
+             R, V), PRICE (per unit), PV & position greeks, NaN where the option cannot be priced e.g. expired
+    """
+    assert contract
+    assert month
+    assert year
+    assert option_type
+    assert start_date
+    assert end_date
+
+    from analytics.constants import CONTRACT_DEFAULT_EXCHANGE_MAP, CONTRACT_EXCHANGE_MAP
+    from analytics.curves.yield_curve import YieldCurve
+    from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+    from analytics.options.reference_data import option_expiry
+    from analytics.options.volatility import implied_vol_model_symbol, ivm_implied_vol
+    from api import LocalClient as c
+
+    contract = contract.upper()
+    exchange_code = (exchange_code or CONTRACT_DEFAULT_EXCHANGE_MAP[contract]).upper()
+    symbol = implied_vol_model_symbol(contract=contract, exchange_code=exchange_code, month=month, year=year)
+
+    try:
+        ivm = c.data(symbol=symbol, start_date=start_date, end_date=end_date, as_of=as_of)
+        curves = c.data(symbol=YieldCurve.SYMBOL, start_date=start_date, end_date=end_date, as_of=as_of)
+    except FileNotFoundError as e:
+        raise BlackScholesCalculationError(f'Missing market data {e}')
+    expiry_date = option_expiry(contract=contract, exchange_code=exchange_code, month=month, year=year, as_of=as_of)
+
+    dates = ivm.index.intersection(curves.index).sort_values()
+    ivm = ivm.loc[dates]
+    curves = curves.loc[dates]
+
+    t = (np.datetime64(expiry_date, 'D') - dates.values.astype('datetime64[D]')).astype(np.float64) / 365.25
+    # expired dates are not priced
+    live = t > 0
+    r = np.full(t.shape, np.nan)
+    r[live] = YieldCurve.interpolate(rates=curves.values[live], t=t[live], extrapolation=extrapolation)
+    fs = ivm['Future'].values.astype(np.float64)
+    x = fs if strike is None else np.full(fs.shape, float(strike))
+    v = ivm_implied_vol(ivm, x)
+
+    pricer = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t, b=0., r=r, v=v)
+    __, __, lot_size = CONTRACT_EXCHANGE_MAP[(contract, exchange_code)]
+    position_size = quantity * lot_size
+    price = pricer.price()
+
+    history = pd.DataFrame({'FS': fs, 'X': x, 'T': t, 'R': r, 'V': v}, index=dates.rename('Date'))
+    history['PRICE'] = price
+    history['PV'] = price * position_size
+    greeks = pricer.greeks(second_order=second_order)
+    for greek in Portfolio.GREEKS + (Portfolio.SECOND_ORDER_GREEKS if second_order else ()):
+        history[greek] = greeks[greek].values * position_size
+
+    return history
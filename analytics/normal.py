@@ -0,0 +1,33 @@
+"""
+Standard normal distribution kernels for the option pricers
+
+scipy.stats.norm dispatches every call through the generic rv_continuous machinery (argument checks,
+array coercion), which dominates single option latency. Scalars use math.erfc directly, arrays use the
+scipy.special ufuncs.
+"""
+
+import math
+import numpy as np
+from scipy.special import ndtr
+
+
+SQRT_2 = math.sqrt(2.)
+SQRT_2_PI = math.sqrt(2. * math.pi)
+
+
+def cdf(x: float) -> float:
+    return 0.5 * math.erfc(-x / SQRT_2)
+
+
+def pdf(x: float) -> float:
+    return math.exp(-0.5 * x * x) / SQRT_2_PI
+
+
+def cdf_array(x: np.ndarray) -> np.ndarray:
+    return ndtr(x)
+
+
+def pdf_array(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+
+    return np.exp(-0.5 * x * x) / SQRT_2_PI
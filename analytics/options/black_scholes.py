@@ -1,9 +1,8 @@
 import env
 import math
-from scipy.stats import norm
+from analytics import normal
 from analytics.constants import BlackScholesLimits
 from analytics.exceptions import BlackScholesInputError
-from functools import lru_cache
 
 
 class BlackScholesOptionPricer:
@@ -80,15 +79,14 @@ class BlackScholesOptionPricer:
     def price(self) -> float:
 
         if self.option_type.lower() == 'c':
-            price = self.fs * math.exp((self.b - self.r) * self.t) * norm.cdf(self.d1)\
-                 - self.x * math.exp(-self.r * self.t) * norm.cdf(self.d2)
+            price = self.fs * math.exp((self.b - self.r) * self.t) * normal.cdf(self.d1)\
+                 - self.x * math.exp(-self.r * self.t) * normal.cdf(self.d2)
         elif self.option_type.lower() == 'p':
-            price = self.x * math.exp(-self.r * self.t) * norm.cdf(-self.d2) \
-                 - (self.fs * math.exp((self.b - self.r) * self.t) * norm.cdf(-self.d1))
+            price = self.x * math.exp(-self.r * self.t) * normal.cdf(-self.d2) \
+                 - (self.fs * math.exp((self.b - self.r) * self.t) * normal.cdf(-self.d1))
 
         return price
 
-    @lru_cache
     def greeks(self) -> dict:
 
         b = self.b
@@ -102,19 +100,19 @@ class BlackScholesOptionPricer:
         d2 = self.d2
 
         if self.option_type.lower() == "c":
-            delta = math.exp((b - r) * t) * norm.cdf(d1)
-            gamma = math.exp((b - r) * t) * norm.pdf(d1) / (fs * v * t_sqrt)
-            theta = -(fs * v * math.exp((b - r) * t) * norm.pdf(d1)) / (2 * t_sqrt) \
-                    - (b - r) * fs * math.exp((b - r) * t) * norm.cdf(d1) - r * x * math.exp(-r * t) * norm.cdf(d2)
-            vega = math.exp((b - r) * t) * fs * t_sqrt * norm.pdf(d1)
-            rho = x * t * math.exp(-r * t) * norm.cdf(d2)
+            delta = math.exp((b - r) * t) * normal.cdf(d1)
+            gamma = math.exp((b - r) * t) * normal.pdf(d1) / (fs * v * t_sqrt)
+            theta = -(fs * v * math.exp((b - r) * t) * normal.pdf(d1)) / (2 * t_sqrt) \
+                    - (b - r) * fs * math.exp((b - r) * t) * normal.cdf(d1) - r * x * math.exp(-r * t) * normal.cdf(d2)
+            vega = math.exp((b - r) * t) * fs * t_sqrt * normal.pdf(d1)
+            rho = x * t * math.exp(-r * t) * normal.cdf(d2)
         else:
-            delta = -math.exp((b - r) * t) * norm.cdf(-d1)
-            gamma = math.exp((b - r) * t) * norm.pdf(d1) / (fs * v * t_sqrt)
-            theta = -(fs * v * math.exp((b - r) * t) * norm.pdf(d1)) / (2 * t_sqrt) + (b - r) * fs * math.exp(
-                (b - r) * t) * norm.cdf(-d1) + r * x * math.exp(-r * t) * norm.cdf(-d2)
-            vega = math.exp((b - r) * t) * fs * t_sqrt * norm.pdf(d1)
-            rho = -x * t * math.exp(-r * t) * norm.cdf(-d2)
+            delta = -math.exp((b - r) * t) * normal.cdf(-d1)
+            gamma = math.exp((b - r) * t) * normal.pdf(d1) / (fs * v * t_sqrt)
+            theta = -(fs * v * math.exp((b - r) * t) * normal.pdf(d1)) / (2 * t_sqrt) + (b - r) * fs * math.exp(
+                (b - r) * t) * normal.cdf(-d1) + r * x * math.exp(-r * t) * normal.cdf(-d2)
+            vega = math.exp((b - r) * t) * fs * t_sqrt * normal.pdf(d1)
+            rho = -x * t * math.exp(-r * t) * normal.cdf(-d2)
 
         return {
             'DELTA': delta,
@@ -127,11 +125,19 @@ class BlackScholesOptionPricer:
 
 class Black76CommodityOptionPricer(BlackScholesOptionPricer):
 
-    __slots__ = ('contract', 'exchange_code', 'month', 'year', 'expiry_date')
+    __slots__ = ('contract', 'exchange_code', 'month', 'year', 'expiry_date', 'snapshot', 'as_of', '_trade_date')
 
     def __init__(
-            self, option_type: str, contract: str, exchange_code: str, month: str, year: str, strike = None
+            self, option_type: str, contract: str, exchange_code: str, month: str, year: str, strike = None,
+            snapshot = None, as_of = None
     ):
+        """
+        :param snapshot: Optional market.snapshot.MarketSnapshot, if set all market data is taken from the
+                         snapshot (and its trade date) rather than queried per pricer
+        :param as_of: Optional knowledge time, price with market data as it was known at that time
+
+        The trade date (env.TRADE_DATE unless a snapshot is set) is fixed when the pricer is created
+        """
         assert contract
         assert exchange_code
         assert month
@@ -143,16 +149,18 @@ class Black76CommodityOptionPricer(BlackScholesOptionPricer):
         self.exchange_code = exchange_code
         self.month = month
         self.year = year
-        self.expiry_date = option_expiry(
-            contract=self.contract,
-            exchange_code=self.exchange_code,
-            month=self.month,
-            year=self.year
+        self.snapshot = snapshot
+        self.as_of = snapshot.as_of if snapshot else as_of
+        self._trade_date = snapshot.trade_date if snapshot else env.TRADE_DATE
+        self.expiry_date = snapshot.option_expiry(
+            contract=self.contract, exchange_code=self.exchange_code, month=self.month, year=self.year
+        ) if snapshot else option_expiry(
+            contract=self.contract, exchange_code=self.exchange_code, month=self.month, year=self.year, as_of=as_of
         )
 
         x_atm = self.atm_strike()
         x = strike or x_atm
-        t = (self.expiry_date - env.TRADE_DATE).days / 365.25
+        t = (self.expiry_date - self.trade_date()).days / 365.25
         b = 0
         fs = x_atm
         r = self.rate()
@@ -162,40 +170,58 @@ class Black76CommodityOptionPricer(BlackScholesOptionPricer):
             option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v
         )
 
-    @lru_cache
+    def trade_date(self):
+        return self._trade_date
+
     def atm_strike(self) -> float:
+        if self.snapshot:
+            return self.snapshot.atm_strike(
+                contract=self.contract, exchange_code=self.exchange_code, month=self.month, year=self.year
+            )
+
         from analytics.options.volatility import atm_strike
 
         return atm_strike(
-            trade_date=env.TRADE_DATE,
+            trade_date=self._trade_date,
             contract=self.contract,
             exchange_code=self.exchange_code,
             month=self.month,
-            year=self.year
+            year=self.year,
+            as_of=self.as_of
         )
 
-    @lru_cache
-    def implied_vol(self, strike: float) -> float:
-        assert strike
+    def implied_vol_smile(self):
+        if self.snapshot:
+            return self.snapshot.implied_vol_smile(
+                contract=self.contract, exchange_code=self.exchange_code, month=self.month, year=self.year
+            )
 
-        from analytics.options.volatility import ows_implied_vol
+        from analytics.options.volatility import implied_vol_smile
 
-        return ows_implied_vol(
-            trade_date=env.TRADE_DATE,
+        return implied_vol_smile(
+            trade_date=self._trade_date,
             contract=self.contract,
             exchange_code=self.exchange_code,
-            strike=strike,
             month=self.month,
-            year=self.year
+            year=self.year,
+            as_of=self.as_of
         )
 
-    @lru_cache
+    def implied_vol(self, strike: float) -> float:
+        assert strike
+
+        return self.implied_vol_smile().implied_vol(strike)
+
     def rate(self) -> float:
+        if self.snapshot:
+            return self.snapshot.rate(expiry_date=self.expiry_date)
+
         from analytics.curves.yield_curve import interpolate_rate
 
         return interpolate_rate(
-            trade_date=env.TRADE_DATE,
-            expiry_date=self.expiry_date
+            trade_date=self._trade_date,
+            expiry_date=self.expiry_date,
+            as_of=self.as_of
         )
 
     def lot_size(self):
@@ -0,0 +1,252 @@
+import env
+import numpy as np
+import pandas as pd
+from analytics import normal
+from analytics.constants import BlackScholesLimits
+from analytics.exceptions import BlackScholesCalculationError, BlackScholesInputError
+
+
+class BlackScholesBatchPricer:
+
+    """
+    Vectorised Generalised Black Scholes pricer, prices arrays of options in a single pass
+
+    Inputs are broadcast against each other, invalid inputs (see BlackScholesLimits) are masked
+    out via the `valid` array and price to NaN rather than raising per element
+    """
+
+    __slots__ = ('option_type', 'x', 'fs', 't', 'b', 'r', 'v', 'valid', 'd1', 'd2')
+
+    COLUMNS = ('OPTION_TYPE', 'X', 'FS', 'T', 'B', 'R', 'V')
+
+    def __init__(self, option_type, x, fs, t, b, r, v):
+        option_type, x, fs, t, b, r, v = np.broadcast_arrays(
+            np.char.lower(np.asarray(option_type, dtype=str)),
+            *(np.asarray(value, dtype=np.float64) for value in (x, fs, t, b, r, v))
+        )
+
+        self.option_type = option_type
+        self.x = x
+        self.fs = fs
+        self.t = t
+        self.b = b
+        self.r = r
+        self.v = v
+
+        self.valid = self.validate_inputs(
+            option_type=self.option_type, x=self.x, fs=self.fs, t=self.t, b=self.b, r=self.r, v=self.v
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_sqrt = np.sqrt(np.where(self.valid, self.t, np.nan))
+            self.d1 = (np.log(self.fs / self.x) + (self.b + (self.v * self.v) / 2) * self.t) / (self.v * t_sqrt)
+            self.d2 = self.d1 - self.v * t_sqrt
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame):
+        assert dataframe is not None
+
+        missing = [column for column in cls.COLUMNS if column not in dataframe.columns]
+        if missing:
+            raise BlackScholesInputError(f'Missing input columns {missing}')
+
+        return cls(*(dataframe[column].values for column in cls.COLUMNS))
+
+    @staticmethod
+    def validate_inputs(option_type, x, fs, t, b, r, v) -> np.ndarray:
+        """
+        Array equivalent of BlackScholesOptionPricer.validate_inputs()
+
+        :return: boolean mask, True where all inputs are within BlackScholesLimits
+        """
+        with np.errstate(invalid='ignore'):
+            return np.isin(option_type, ('c', 'p')) \
+                & (x >= BlackScholesLimits.MIN_X) & (x <= BlackScholesLimits.MAX_X) \
+                & (fs >= BlackScholesLimits.MIN_FS) & (fs <= BlackScholesLimits.MAX_FS) \
+                & (t >= BlackScholesLimits.MIN_T) & (t <= BlackScholesLimits.MAX_T) \
+                & (b >= BlackScholesLimits.MIN_b) & (b <= BlackScholesLimits.MAX_b) \
+                & (r >= BlackScholesLimits.MIN_r) & (r <= BlackScholesLimits.MAX_r) \
+                & (v >= BlackScholesLimits.MIN_V) & (v <= BlackScholesLimits.MAX_V)
+
+    def is_call(self) -> np.ndarray:
+        return self.option_type == 'c'
+
+    def price(self) -> np.ndarray:
+        call = self.is_call()
+        sign = np.where(call, 1., -1.)
+
+        forward = self.fs * np.exp((self.b - self.r) * self.t)
+        discount_strike = self.x * np.exp(-self.r * self.t)
+
+        # call: F N(d1) - K N(d2), put: K N(-d2) - F N(-d1)
+        price = sign * (
+            forward * normal.cdf_array(sign * self.d1) - discount_strike * normal.cdf_array(sign * self.d2)
+        )
+
+        return np.where(self.valid, price, np.nan)
+
+    def greeks(self, second_order: bool = False) -> pd.DataFrame:
+        """
+        Closed form greeks, common sub expressions are computed once for all options
+
+        :param second_order: Optional, set to true to include VANNA, VOLGA & CHARM
+        :return: DataFrame of greeks (one row per option), NaN where inputs are invalid
+        """
+        b = self.b
+        r = self.r
+        t = self.t
+        v = self.v
+        d1 = self.d1
+        d2 = self.d2
+        sign = np.where(self.is_call(), 1., -1.)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_sqrt = np.sqrt(t)
+            ebrt = np.exp((b - r) * t)
+            ert = np.exp(-r * t)
+            pdf_d1 = normal.pdf_array(d1)
+            cdf_d1 = normal.cdf_array(sign * d1)
+            cdf_d2 = normal.cdf_array(sign * d2)
+            ebrt_pdf_d1 = ebrt * pdf_d1
+
+            vega = self.fs * t_sqrt * ebrt_pdf_d1
+            greeks = {
+                'DELTA': sign * ebrt * cdf_d1,
+                'GAMMA': ebrt_pdf_d1 / (self.fs * v * t_sqrt),
+                'THETA': -(self.fs * v * ebrt_pdf_d1) / (2 * t_sqrt)
+                - sign * (b - r) * self.fs * ebrt * cdf_d1 - sign * r * self.x * ert * cdf_d2,
+                'VEGA': vega,
+                'RHO': sign * self.x * t * ert * cdf_d2
+            }
+
+            if second_order:
+                greeks['VANNA'] = -ebrt_pdf_d1 * d2 / v
+                greeks['VOLGA'] = vega * d1 * d2 / v
+                greeks['CHARM'] = -ebrt * (pdf_d1 * (b / (v * t_sqrt) - d2 / (2 * t)) + sign * (b - r) * cdf_d1)
+
+        return pd.DataFrame({
+            greek: np.where(self.valid, value, np.nan).ravel() for greek, value in greeks.items()
+        })
+
+
+class Black76CommodityBatchPricer(BlackScholesBatchPricer):
+
+    """
+    Vectorised equivalent of Black76CommodityOptionPricer
+
+    Market data (expiry, smile, rate) is resolved once per unique contract/exchange/month/year and the smile is
+    evaluated for all strikes of the group in one call, options with missing market data are masked out as invalid.
+    Market data is taken from `snapshot` (market.snapshot.MarketSnapshot) when set, or as known at knowledge time
+    `as_of` when set.
+    """
+
+    __slots__ = ('contract', 'exchange_code', 'month', 'year', 'expiry_date', 'snapshot', 'as_of')
+
+    COLUMNS = ('OPTION_TYPE', 'CONTRACT', 'MONTH', 'YEAR')
+
+    def __init__(
+            self, option_type, contract, exchange_code, month, year, strike=None, snapshot=None, as_of=None
+    ):
+        from analytics.constants import default_exchange_codes
+
+        contract, month, year, option_type, exchange_code, strike = np.broadcast_arrays(
+            np.char.upper(np.atleast_1d(np.asarray(contract, dtype=str))),
+            np.char.upper(np.asarray(month, dtype=str)),
+            np.asarray(year, dtype=str),
+            np.asarray(option_type, dtype=str),
+            np.asarray(exchange_code, dtype=object),
+            np.asarray(np.nan if strike is None else strike, dtype=np.float64)
+        )
+        assert contract.ndim == 1
+
+        self.contract = contract
+        self.exchange_code = default_exchange_codes(contract, exchange_code)
+        self.month = month
+        self.year = year
+        self.snapshot = snapshot
+        self.as_of = snapshot.as_of if snapshot else as_of
+        self.expiry_date = np.full(contract.shape, np.datetime64('NaT'), dtype='datetime64[D]')
+
+        x = strike.copy()
+        fs = np.full(contract.shape, np.nan)
+        r = np.full(contract.shape, np.nan)
+        v = np.full(contract.shape, np.nan)
+
+        trade_date = snapshot.trade_date if snapshot else env.TRADE_DATE
+        codes, uniques = pd.factorize(
+            pd.MultiIndex.from_arrays([self.contract, self.exchange_code, self.month, self.year])
+        )
+        for code, (_contract, _exchange_code, _month, _year) in enumerate(uniques):
+            try:
+                expiry_date, smile, rate = self._market_inputs(
+                    trade_date=trade_date, contract=_contract, exchange_code=_exchange_code, month=_month, year=_year,
+                    snapshot=snapshot, as_of=self.as_of
+                )
+            except (AssertionError, BlackScholesCalculationError, KeyError, IndexError, FileNotFoundError):
+                continue
+
+            mask = codes == code
+            self.expiry_date[mask] = expiry_date
+            fs[mask] = smile.future
+            r[mask] = rate
+            x[mask] = np.where(np.isnan(strike[mask]), smile.future, strike[mask])
+            v[mask] = smile.implied_vol(x[mask])
+
+        t = (self.expiry_date - np.datetime64(trade_date, 'D')).astype(np.float64) / 365.25
+        b = np.zeros(contract.shape)
+
+        super(Black76CommodityBatchPricer, self).__init__(
+            option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v
+        )
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame, snapshot=None, as_of=None):
+        assert dataframe is not None
+
+        missing = [column for column in cls.COLUMNS if column not in dataframe.columns]
+        if missing:
+            raise BlackScholesInputError(f'Missing input columns {missing}')
+
+        return cls(
+            option_type=dataframe['OPTION_TYPE'].values,
+            contract=dataframe['CONTRACT'].values,
+            exchange_code=dataframe['EXCHANGE_CODE'].values if 'EXCHANGE_CODE' in dataframe.columns else None,
+            month=dataframe['MONTH'].values,
+            year=dataframe['YEAR'].values,
+            strike=dataframe['STRIKE'].values if 'STRIKE' in dataframe.columns else None,
+            snapshot=snapshot,
+            as_of=as_of
+        )
+
+    @staticmethod
+    def _market_inputs(
+            trade_date, contract: str, exchange_code: str, month: str, year: str, snapshot=None, as_of=None
+    ) -> tuple:
+        if snapshot:
+            expiry_date = snapshot.option_expiry(contract=contract, exchange_code=exchange_code, month=month, year=year)
+            smile = snapshot.implied_vol_smile(contract=contract, exchange_code=exchange_code, month=month, year=year)
+
+            return expiry_date, smile, snapshot.rate(expiry_date=expiry_date)
+
+        from analytics.curves.yield_curve import interpolate_rate
+        from analytics.options.reference_data import option_expiry
+        from analytics.options.volatility import implied_vol_smile
+
+        expiry_date = option_expiry(
+            contract=contract, exchange_code=exchange_code, month=month, year=year, as_of=as_of
+        )
+        smile = implied_vol_smile(
+            trade_date=trade_date, contract=contract, exchange_code=exchange_code, month=month, year=year,
+            as_of=as_of
+        )
+        rate = interpolate_rate(trade_date=trade_date, expiry_date=expiry_date, as_of=as_of)
+
+        return expiry_date, smile, rate
+
+    def lot_size(self) -> np.ndarray:
+        from analytics.constants import CONTRACT_EXCHANGE_MAP
+
+        return np.array([
+            CONTRACT_EXCHANGE_MAP.get((contract, exchange_code), (None, None, np.nan))[2]
+            for contract, exchange_code in zip(self.contract, self.exchange_code)
+        ], dtype=np.float64)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from analytics.options.volatility import Smile, implied_vol
+from market.snapshot import IVM_COLUMNS
+
+
+DEGREE = len(Smile.BETA_COLUMNS)
+
+
+def calibrate_smiles(
+        expiration, option_type, x, price, fs, t, r, days_to_expiry=np.nan, trading_days=np.nan,
+        method: str = 'rational', out_of_the_money: bool = True, min_quotes: int = DEGREE + 1
+) -> pd.DataFrame:
+    """
+    Fits OptionWorks IVM smiles (IV = AtM + Beta1*x + ... + Beta6*x^6, x = ln(strike / future)) to arrays of
+    option settlement quotes, one smile per expiration
+
+    Implied vols of all quotes are solved in a single batch (analytics.options.volatility.implied_vol, Black 76), the
+    polynomials of all expiries are then fitted with one stacked least squares solve on per expiry normal equations.
+    Moneyness is scaled by its largest absolute value per expiry before the fit, so that the system is well
+    conditioned, and the coefficients are scaled back.
+
+    :param expiration: expiry key per quote e.g. contract code 'F2025'
+    :param fs: future settlement price per quote, the first quote of an expiration gives its Future
+    :param days_to_expiry: DtE per quote (constant per expiration), stored as is
+    :param trading_days: DtT per quote (constant per expiration), stored as is
+    :param out_of_the_money: fit out of the money quotes only (calls with strike >= future, puts with strike <= future)
+    :param min_quotes: expiries with fewer valid quotes are left NaN
+    :return: DataFrame indexed by expiration with IVM_COLUMNS (float32) i.e. the schema of the IVM market data,
+             RR25, RR10, Fly25 & Fly10 are NaN
+    """
+    assert min_quotes >= DEGREE + 1
+
+    expiration, option_type, x, price, fs, t, r, days_to_expiry, trading_days = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(expiration)),
+        np.char.lower(np.asarray(option_type, dtype=str)),
+        *(np.asarray(value, dtype=np.float64) for value in (x, price, fs, t, r, days_to_expiry, trading_days))
+    )
+    assert expiration.ndim == 1
+
+    codes, expirations = pd.factorize(expiration, sort=True)
+    size = len(expirations)
+    # index of the first quote of each expiration (reversed assignment, the first write wins)
+    first_quote = np.empty(size, dtype=np.int64)
+    first_quote[codes[::-1]] = np.arange(len(codes))[::-1]
+
+    vol = implied_vol(option_type=option_type, x=x, fs=fs, t=t, b=0., r=r, cp=price, method=method)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moneyness = np.log(x / fs)
+
+    valid = np.isfinite(vol) & np.isfinite(moneyness)
+    if out_of_the_money:
+        valid &= np.where(option_type == 'c', moneyness >= 0, moneyness <= 0)
+    codes, moneyness, vol = codes[valid], moneyness[valid], vol[valid]
+
+    quotes = np.bincount(codes, minlength=size)
+    min_money = np.full(size, np.inf)
+    max_money = np.full(size, -np.inf)
+    np.minimum.at(min_money, codes, moneyness)
+    np.maximum.at(max_money, codes, moneyness)
+
+    scale = np.maximum(np.maximum(-min_money, max_money), np.finfo(np.float64).eps)
+    vandermonde = (moneyness / scale[codes])[:, None] ** np.arange(DEGREE + 1)
+
+    # normal equations (V^T V) c = V^T IV stacked per expiry
+    lhs = np.zeros((size, DEGREE + 1, DEGREE + 1))
+    rhs = np.zeros((size, DEGREE + 1))
+    np.add.at(lhs, codes, vandermonde[:, :, None] * vandermonde[:, None, :])
+    np.add.at(rhs, codes, vandermonde * vol[:, None])
+
+    fitted = quotes >= min_quotes
+    coefficients = np.full((size, DEGREE + 1), np.nan)
+    if fitted.any():
+        # pseudo inverse, expiries with repeated strikes give singular systems
+        solution = (np.linalg.pinv(lhs[fitted], hermitian=True) @ rhs[fitted][:, :, None])[:, :, 0]
+        coefficients[fitted] = solution / scale[fitted, None] ** np.arange(DEGREE + 1)
+
+    dataframe = pd.DataFrame(np.nan, index=pd.Index(expirations, name='EXPIRATION'), columns=list(IVM_COLUMNS))
+    dataframe['Future'] = fs[first_quote]
+    dataframe['AtM'] = coefficients[:, 0]
+    dataframe[list(Smile.BETA_COLUMNS)] = coefficients[:, 1:]
+    dataframe['MinMoney'] = np.where(fitted, min_money, np.nan)
+    dataframe['MaxMoney'] = np.where(fitted, max_money, np.nan)
+    dataframe['DtE'] = days_to_expiry[first_quote]
+    dataframe['DtT'] = trading_days[first_quote]
+
+    return dataframe.astype(np.float32)
@@ -1,23 +1,127 @@
 import datetime as dt
+import numpy as np
 from analytics.constants import FUTURES_DELIVERY_MAP
 from analytics.exceptions import BlackScholesCalculationError
 from api import LocalClient as c
 from functools import lru_cache
+from market.datastore_adapter import DataAPI
+from market.snapshot import CALENDAR_SYMBOL_PREFIX
 
 
-@lru_cache
-def option_expiry(contract: str, exchange_code: str, month: str, year: str) -> dt.date:
+class OptionExpiryCalendar:
+
+    """
+    Index of the option expiry calendars (CALENDAR_OPTION_*) of all contracts, built once
+
+    - expiries: dict of (contract, contract code e.g. 'F2025') -> expiry date, O(1) lookups
+    - contract_codes & expiry_dates: per contract arrays sorted by expiry date (datetime64[D]), for date arithmetic
+      i.e. "next n expiries after a date" with a binary search & year fractions of a whole strip
+    """
+
+    __slots__ = ('expiries', 'contract_codes', 'expiry_dates')
+
+    def __init__(self, calendars: dict):
+        """
+        :param calendars: dict of contract -> dict of contract code -> expiry date
+        """
+        self.expiries = {}
+        self.contract_codes = {}
+        self.expiry_dates = {}
+        for contract, calendar in calendars.items():
+            contract = contract.upper()
+            contract_codes = np.array(list(calendar.keys()), dtype=str)
+            expiry_dates = np.array(list(calendar.values()), dtype='datetime64[D]')
+            order = np.argsort(expiry_dates, kind='stable')
+
+            self.contract_codes[contract] = contract_codes[order]
+            self.expiry_dates[contract] = expiry_dates[order]
+            self.expiries.update(
+                ((contract, contract_code), expiry_date) for contract_code, expiry_date in calendar.items()
+            )
+
+    @classmethod
+    def from_market_data(cls, as_of=None):
+        calendars = {}
+        for symbol in c.symbols():
+            if symbol.startswith(CALENDAR_SYMBOL_PREFIX):
+                try:
+                    dataframe = c.data(symbol=symbol, as_of=as_of)
+                except FileNotFoundError:
+                    continue
+                calendars[symbol[len(CALENDAR_SYMBOL_PREFIX):]] = {
+                    contract_code: expiration_date.date()
+                    for contract_code, expiration_date in dataframe['EXPIRATION_DATE'].items()
+                }
+
+        return cls(calendars=calendars)
+
+    def __contains__(self, contract: str) -> bool:
+        return contract.upper() in self.expiry_dates
+
+    def expiry(self, contract: str, month: str, year: str) -> dt.date:
+        assert contract
+        assert month
+        assert year
+
+        contract = contract.upper()
+        try:
+            return self.expiries[(contract, f'{FUTURES_DELIVERY_MAP[month.upper()]}{year}')]
+        except KeyError:
+            if contract not in self:
+                raise BlackScholesCalculationError(
+                    f'Missing option expiry market data for symbol {CALENDAR_SYMBOL_PREFIX}{contract}'
+                )
+            raise BlackScholesCalculationError(f'Missing option expiry of {contract} {month} {year}')
+
+    def next_expiries(self, contract: str, date: dt.date, n: int = 1) -> tuple:
+        """
+        :param n: number of expiries, all expiries after date when None
+        :return: (contract codes, expiry dates (datetime64[D])) arrays of the (up to) n first expiries after date
+        """
+        assert n is None or n > 0
+
+        contract_codes, expiry_dates = self._calendar(contract)
+        start = np.searchsorted(expiry_dates, np.datetime64(date, 'D'), side='right')
+        stop = None if n is None else start + n
+
+        return contract_codes[start:stop], expiry_dates[start:stop]
+
+    def year_fractions(self, contract: str, trade_date: dt.date, n: int = None) -> tuple:
+        """
+        :param n: Optional, number of expiries of the strip, all expiries after trade_date when not set
+        :return: (contract codes, year fractions (days / 365.25) from trade_date) arrays of the strip of expiries
+                 after trade_date
+        """
+        contract_codes, expiry_dates = self.next_expiries(contract=contract, date=trade_date, n=n)
+
+        return contract_codes, (expiry_dates - np.datetime64(trade_date, 'D')).astype(np.float64) / 365.25
+
+    def _calendar(self, contract: str) -> tuple:
+        try:
+            return self.contract_codes[contract.upper()], self.expiry_dates[contract.upper()]
+        except KeyError:
+            raise BlackScholesCalculationError(
+                f'Missing option expiry market data for symbol {CALENDAR_SYMBOL_PREFIX}{contract.upper()}'
+            )
+
+
+@lru_cache(maxsize=16)
+def option_expiry_calendar(as_of=None) -> OptionExpiryCalendar:
+    return OptionExpiryCalendar.from_market_data(as_of=as_of)
+
+
+def option_expiry(contract: str, exchange_code: str, month: str, year: str, as_of=None) -> dt.date:
     assert contract
     assert exchange_code
     assert month
     assert year
 
-    symbol = f'CALENDAR_OPTION_{contract.upper()}'
-    try:
-        option_expiries = c.data(symbol=symbol)
-    except FileNotFoundError:
-        raise BlackScholesCalculationError(f'Missing option expiry market data for symbol {symbol}')
+    return option_expiry_calendar(as_of=as_of).expiry(contract=contract, month=month, year=year)
+
+
+def _invalidate(symbol: str) -> None:
+    if symbol.startswith(CALENDAR_SYMBOL_PREFIX):
+        option_expiry_calendar.cache_clear()
 
-    contract_code = f'{FUTURES_DELIVERY_MAP[month.upper()]}{year}'
 
-    return option_expiries.at[contract_code, 'EXPIRATION_DATE'].date()
+DataAPI.on_persist(_invalidate)
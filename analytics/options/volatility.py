@@ -1,18 +1,93 @@
 import datetime as dt
-import math
+import numpy as np
 import pandas as pd
 from analytics.constants import FUTURES_DELIVERY_MAP, CONTRACT_DEFAULT_EXCHANGE_MAP, CONTRACT_EXCHANGE_MAP
+from analytics.cache import trade_date_cache
 from api import LocalClient as c
-from functools import lru_cache
+from market.datastore_adapter import DataAPI
 
 
-@lru_cache
-def implied_vol_model(
-    trade_date: dt.date, contract: str, exchange_code: str, month: str, year: str
-) -> float:
-    assert trade_date
+class Smile:
+
+    """
+    OptionWorks IVM volatility smile, IV = AtM + Beta1*x + Beta2*x^2 + ... + Beta6*x^6 where x = ln(strike / future)
+
+    Moneyness is clipped to the fitted range [MinMoney, MaxMoney] i.e. flat extrapolation
+    """
+
+    __slots__ = ('future', 'coefficients', 'min_money', 'max_money')
+
+    BETA_COLUMNS = ('Beta1', 'Beta2', 'Beta3', 'Beta4', 'Beta5', 'Beta6')
+
+    def __init__(self, future: float, atm: float, betas, min_money: float = np.nan, max_money: float = np.nan):
+        assert future
+        assert len(betas) == len(self.BETA_COLUMNS)
+
+        self.future = float(future)
+        # highest degree first, for Horner evaluation
+        self.coefficients = np.append(np.asarray(betas, dtype=np.float64)[::-1], atm)
+        self.min_money = float(min_money)
+        self.max_money = float(max_money)
+
+    @classmethod
+    def from_data_row(cls, data_row: pd.DataFrame):
+        assert len(data_row) == 1
+
+        return cls(
+            future=data_row['Future'].values[0],
+            atm=data_row['AtM'].values[0],
+            betas=data_row[list(cls.BETA_COLUMNS)].values[0],
+            min_money=data_row['MinMoney'].values[0],
+            max_money=data_row['MaxMoney'].values[0]
+        )
+
+    def moneyness(self, strike):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moneyness = np.log(np.asarray(strike, dtype=np.float64) / self.future)
+
+        # fmax/fmin ignore a NaN (missing) bound
+        return np.fmin(np.fmax(moneyness, self.min_money), self.max_money)
+
+    def implied_vol(self, strike):
+        """
+        :param strike: scalar or array of strikes
+        :return: implied vol, float for a scalar strike otherwise an array
+        """
+        moneyness = self.moneyness(strike)
+
+        vol = np.full(moneyness.shape, self.coefficients[0])
+        for coefficient in self.coefficients[1:]:
+            vol = vol * moneyness + coefficient
+
+        return vol if np.ndim(strike) else float(vol)
+
+
+def ivm_implied_vol(ivm: pd.DataFrame, strike) -> np.ndarray:
+    """
+    Smile evaluation of many IVM rows at once e.g. an IVM time series, equivalent to Smile.implied_vol per row
+
+    :param ivm: DataFrame of IVM rows
+    :param strike: scalar or array of strikes, one per IVM row
+    :return: array of implied vols, one per IVM row
+    """
+    future = ivm['Future'].values.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moneyness = np.log(np.broadcast_to(np.asarray(strike, dtype=np.float64), future.shape) / future)
+    moneyness = np.fmin(
+        np.fmax(moneyness, ivm['MinMoney'].values.astype(np.float64)), ivm['MaxMoney'].values.astype(np.float64)
+    )
+
+    # highest degree first, for Horner evaluation
+    coefficients = ivm[list(Smile.BETA_COLUMNS[::-1]) + ['AtM']].values.astype(np.float64)
+    vol = coefficients[:, 0].copy()
+    for coefficient in coefficients[:, 1:].T:
+        vol = vol * moneyness + coefficient
+
+    return vol
+
+
+def implied_vol_model_symbol(contract: str, exchange_code: str, month: str, year: str) -> str:
     assert contract
-    assert exchange_code
     assert month
     assert year
 
@@ -20,177 +95,202 @@ def implied_vol_model(
     exchange_code = (exchange_code or CONTRACT_DEFAULT_EXCHANGE_MAP[contract]).upper()
     expiration = f'{FUTURES_DELIVERY_MAP[month]}{year}'
     futures_code, options_code, __ = CONTRACT_EXCHANGE_MAP[(contract, exchange_code)]
-    symbol = f'{contract}_{exchange_code}_{futures_code}_{options_code}_{expiration}_IVM'
 
-    data = c.data(symbol=symbol)
+    return f'{contract}_{exchange_code}_{futures_code}_{options_code}_{expiration}_IVM'
+
+
+@trade_date_cache(max_entries=1024)
+def implied_vol_model(
+    trade_date: dt.date, contract: str, exchange_code: str, month: str, year: str, as_of=None
+) -> float:
+    assert trade_date
+    assert contract
+    assert exchange_code
+    assert month
+    assert year
+
+    symbol = implied_vol_model_symbol(contract=contract, exchange_code=exchange_code, month=month, year=year)
+
+    data = c.data(symbol=symbol, start_date=trade_date, end_date=trade_date, as_of=as_of)
 
     return data[data.index == pd.to_datetime(trade_date)]
 
 
-@lru_cache
-def ows_implied_vol(
-        trade_date: dt.date, contract: str, exchange_code: str, strike: float, month: str, year: str
-) -> float:
+@trade_date_cache(max_entries=1024)
+def implied_vol_smile(
+        trade_date: dt.date, contract: str, exchange_code: str, month: str, year: str, as_of=None
+) -> Smile:
     assert trade_date
     assert contract
     assert exchange_code
-    assert strike
     assert month
     assert year
 
     data_row = implied_vol_model(
-        trade_date=trade_date, contract=contract, exchange_code=exchange_code, month=month, year=year
+        trade_date=trade_date, contract=contract, exchange_code=exchange_code, month=month, year=year, as_of=as_of
     )
 
-    moneyness = math.log(strike / data_row['Future'][0])
-    vol_implied = data_row['AtM'][0] \
-                  + data_row['Beta1'][0] * moneyness \
-                  + data_row['Beta2'][0] * moneyness ** 2 \
-                  + data_row['Beta3'][0] * moneyness ** 3 \
-                  + data_row['Beta4'][0] * moneyness ** 4 \
-                  + data_row['Beta5'][0] * moneyness ** 5\
-                  + data_row['Beta6'][0] * moneyness ** 6
+    return Smile.from_data_row(data_row)
 
-    return float(vol_implied)
 
+def ows_implied_vol(
+        trade_date: dt.date, contract: str, exchange_code: str, strike, month: str, year: str, as_of=None
+):
+    assert trade_date
+    assert contract
+    assert exchange_code
+    assert month
+    assert year
 
-@lru_cache
+    smile = implied_vol_smile(
+        trade_date=trade_date, contract=contract, exchange_code=exchange_code, month=month, year=year, as_of=as_of
+    )
+
+    return smile.implied_vol(strike)
+
+
+@trade_date_cache(max_entries=1024)
 def atm_strike(
-        trade_date: dt.date, contract: str, exchange_code: str, month: str, year: str
+        trade_date: dt.date, contract: str, exchange_code: str, month: str, year: str, as_of=None
 ) -> float:
     assert trade_date
     assert month
     assert year
 
     data_row = implied_vol_model(
-        trade_date=trade_date, contract=contract, exchange_code=exchange_code, month=month, year=year
+        trade_date=trade_date, contract=contract, exchange_code=exchange_code, month=month, year=year, as_of=as_of
     )
 
     return float(data_row['Future'].values[0])
 
 
-"""
-# ----------
-# Approximate Implied Volatility
-#
-# This function is used to choose a starting point for the
-# search functions (Newton and bisection searches).
-# Brenner & Subrahmanyam (1988), Feinstein (1988)
-def approx_implied_vol(option_type, fs, x, t, r, b, cp):
+def _invalidate(symbol: str) -> None:
+    if symbol.endswith('_IVM'):
+        implied_vol_model.cache_clear()
+        implied_vol_smile.cache_clear()
+        atm_strike.cache_clear()
 
-    test_option_type(option_type)
 
-    ebrt = math.exp((b - r) * t)
-    ert = math.exp(-r * t)
+DataAPI.on_persist(_invalidate)
 
-    a = math.sqrt(2 * math.pi) / (fs * ebrt + x * ert)
 
-    if option_type == "c":
-        payoff = fs * ebrt - x * ert
-    else:
-        payoff = x * ert - fs * ebrt
+IMPLIED_VOL_METHODS = ('newton', 'rational')
 
+
+def approx_implied_vol(option_type, x, fs, t, b, r, cp) -> np.ndarray:
+    """
+    Brenner & Subrahmanyam (1988), Feinstein (1988) implied vol approximation, used as a starting point for the
+    Newton search
+    """
+    call = np.char.lower(np.asarray(option_type, dtype=str)) == 'c'
+    forward = fs * np.exp((b - r) * t)
+    discount_strike = x * np.exp(-r * t)
+
+    payoff = np.where(call, forward - discount_strike, discount_strike - forward)
+    a = np.sqrt(2 * np.pi) / (forward + discount_strike)
     b = cp - payoff / 2
-    c = (payoff ** 2) / math.pi
+    c = (payoff ** 2) / np.pi
+
+    with np.errstate(invalid='ignore'):
+        return (a * (b + np.sqrt(b ** 2 + c))) / np.sqrt(t)
 
-    v = (a * (b + math.sqrt(b ** 2 + c))) / math.sqrt(t)
 
-    return v
+def corrado_miller_implied_vol(option_type, x, fs, t, b, r, cp) -> np.ndarray:
+    """
+    Corrado & Miller (1996) closed form implied vol approximation, accurate away from deep in/out of the money
+    options, used as the starting point for the third order (Halley) 'rational' search
+    """
+    call = np.char.lower(np.asarray(option_type, dtype=str)) == 'c'
+    forward = fs * np.exp((b - r) * t)
+    discount_strike = x * np.exp(-r * t)
 
+    # put call parity, all prices as calls
+    call_price = np.where(call, cp, cp + forward - discount_strike)
+    a = call_price - (forward - discount_strike) / 2
+    c = np.maximum(a ** 2 - (forward - discount_strike) ** 2 / np.pi, 0.)
 
-# Find the Implied Volatility of an European (GBS) Option given a price
-# using Newton-Raphson method for greater speed since Vega is available
-def black_scholes_implied_vol(option_type, fs, x, t, r, b, cp, precision=.00001, max_steps=100):
-    return _newton_implied_vol(gbs, option_type, x, fs, t, b, r, cp, precision, max_steps)
+    return np.sqrt(2 * np.pi) / (forward + discount_strike) * (a + np.sqrt(c)) / np.sqrt(t)
 
 
-# Calculate Implied Volatility with a Newton Raphson search
-def _newton_implied_vol(val_fn, option_type, x, fs, t, b, r, cp, precision=.00001, max_steps=100):
-    # make sure a valid option type was entered
-    test_option_type(option_type)
+def implied_vol(
+        option_type, x, fs, t, b, r, cp, method: str = 'newton', precision: float = 1e-8, max_steps: int = 100
+) -> np.ndarray:
+    """
+    Implied volatility of arrays of European (GBS / Black 76 with b = 0) option prices
 
-    # Estimate starting Vol, making sure it is allowable range
-    v = approx_implied_vol(option_type, fs, x, t, r, b, cp)
-    v = max(BlackScholesLimits.MIN_V, v)
-    v = min(BlackScholesLimits.MAX_V, v)
+    All options are iterated simultaneously, each lane keeps a [low, high] volatility bracket and stops on
+    convergence i.e. the price is within precision and the vol within precision / vega (or the bracket has
+    collapsed). Steps leaving the bracket fall back to bisection.
 
-    # Calculate the value at the estimated vol
-    value, delta, gamma, theta, vega, rho = val_fn(option_type, fs, x, t, r, b, v)
-    min_diff = abs(cp - value)
+    :param method: 'newton' i.e. Newton-Raphson from a Brenner-Subrahmanyam guess or 'rational' i.e. Halley from a
+                   Corrado-Miller guess (fewer iterations)
+    :return: array of implied vols, NaN where inputs are invalid, the price is outside of the no arbitrage bounds
+             or the search did not converge
+    """
+    assert method in IMPLIED_VOL_METHODS
 
-    # Newton-Raphson Search
-    countr = 0
-    while precision <= abs(cp - value) <= min_diff and countr < max_steps:
+    from analytics import normal
+    from analytics.constants import BlackScholesLimits
+    from analytics.options.black_scholes_batch import BlackScholesBatchPricer
 
-        v = v - (value - cp) / vega
-        if (v > BlackScholesLimits.MAX_V) or (v < BlackScholesLimits.MIN_V):
+    option_type, x, fs, t, b, r, cp = np.broadcast_arrays(
+        np.char.lower(np.asarray(option_type, dtype=str)),
+        *(np.asarray(value, dtype=np.float64) for value in (x, fs, t, b, r, cp))
+    )
+    shape = x.shape
+    option_type, x, fs, t, b, r, cp = (value.ravel() for value in (option_type, x, fs, t, b, r, cp))
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        forward = fs * np.exp((b - r) * t)
+        discount_strike = x * np.exp(-r * t)
+        call = option_type == 'c'
+        lower = np.maximum(np.where(call, forward - discount_strike, discount_strike - forward), 0.)
+        upper = np.where(call, forward, discount_strike)
+        valid = BlackScholesBatchPricer.validate_inputs(
+            option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=BlackScholesLimits.MIN_V
+        ) & (cp > lower) & (cp < upper)
+
+        guess = approx_implied_vol if method == 'newton' else corrado_miller_implied_vol
+        v_guess = guess(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, cp=cp)
+
+    vol = np.full(x.shape, np.nan)
+    v_low = np.full(x.shape, BlackScholesLimits.MIN_V)
+    v_high = np.full(x.shape, float(BlackScholesLimits.MAX_V))
+
+    active = np.flatnonzero(valid)
+    v = np.clip(np.nan_to_num(v_guess[active], nan=0.5 * (v_low[0] + v_high[0])), v_low[0], v_high[0])
+
+    for __ in range(max_steps):
+        if not len(active):
             break
 
-        value, delta, gamma, theta, vega, rho = val_fn(option_type, fs, x, t, r, b, v)
-        min_diff = min(abs(cp - value), min_diff)
-
-        # keep track of how many loops
-        countr += 1
-
-    # check if function converged and return a value
-    if abs(cp - value) < precision:
-        # the search function converged
-        return v
-    else:
-        # if the search function didn't converge, try a bisection search
-        return _bisection_implied_vol(val_fn, option_type, fs, x, t, r, b, cp, precision, max_steps)
-
-
-# ----------
-# Find the Implied Volatility using a Bisection search
-def _bisection_implied_vol(val_fn, option_type, fs, x, t, r, b, cp, precision=.00001, max_steps=100):
-
-    # Estimate Upper and Lower bounds on volatility
-    # Assume American Implied vol is within +/- 50% of the GBS Implied Vol
-    v_mid = approx_implied_vol(option_type, fs, x, t, r, b, cp)
-
-    if (v_mid <= BlackScholesLimits.MIN_V) or (v_mid >= BlackScholesLimits.MAX_V):
-        # if the volatility estimate is out of bounds, search entire allowed vol space
-        v_low = BlackScholesLimits.MIN_V
-        v_high = BlackScholesLimits.MAX_V
-        v_mid = (v_low + v_high) / 2
-    else:
-        # reduce the size of the vol space
-        v_low = max(BlackScholesLimits.MIN_V, v_mid * .5)
-        v_high = min(BlackScholesLimits.MAX_V, v_mid * 1.5)
-
-    # Estimate the high/low bounds on price
-    cp_mid = val_fn(option_type, fs, x, t, r, b, v_mid)[0]
-
-    # initialize bisection loop
-    current_step = 0
-    diff = abs(cp - cp_mid)
-
-    # Keep bisection volatility until correct price is found
-    while (diff > precision) and (current_step < max_steps):
-        current_step += 1
-
-        # Cut the search area in half
-        if cp_mid < cp:
-            v_low = v_mid
-        else:
-            v_high = v_mid
-
-        cp_low = val_fn(option_type, fs, x, t, r, b, v_low)[0]
-        cp_high = val_fn(option_type, fs, x, t, r, b, v_high)[0]
-
-        v_mid = v_low + (cp - cp_low) * (v_high - v_low) / (cp_high - cp_low)
-        v_mid = max(BlackScholesLimits.MIN_V, v_mid)  # enforce high/low bounds
-        v_mid = min(BlackScholesLimits.MAX_V, v_mid)  # enforce high/low bounds
-
-        cp_mid = val_fn(option_type, fs, x, t, r, b, v_mid)[0]
-        diff = abs(cp - cp_mid)
-
-    # return output
-    if abs(cp - cp_mid) < precision:
-        return v_mid
-    else:
-        raise BlackScholesCalculationError(
-            "Implied Vol did not converge. Best Guess={0}, Price diff={1}, Required Precision={2}".format(v_mid, diff,
-                                                                                                          precision))
-"""
+        pricer = BlackScholesBatchPricer(
+            option_type=option_type[active], x=x[active], fs=fs[active], t=t[active], b=b[active], r=r[active], v=v
+        )
+        diff = pricer.price() - cp[active]
+        vega = forward[active] * np.sqrt(t[active]) * normal.pdf_array(pricer.d1)
+
+        low = np.where(diff < 0, v, v_low[active])
+        high = np.where(diff > 0, v, v_high[active])
+        v_low[active] = low
+        v_high[active] = high
+
+        # converged in price & in vol space (deep out of the money lanes have tiny vega)
+        converged = ((np.abs(diff) < precision) & (np.abs(diff) < precision * vega)) | (high - low < precision * 1e-6)
+        vol[active[converged]] = v[converged]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if method == 'newton':
+                v_next = v - diff / vega
+            else:
+                volga = vega * pricer.d1 * pricer.d2 / v
+                v_next = v - 2 * diff * vega / (2 * vega * vega - diff * volga)
+
+        # safeguard, bisect lanes whose step leaves the bracket (or has no vega)
+        inside = (v_next > low) & (v_next < high)
+        v_next = np.where(inside, v_next, 0.5 * (low + high))
+
+        active = active[~converged]
+        v = v_next[~converged]
+
+    return vol.reshape(shape)
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from analytics.exceptions import BlackScholesInputError
+
+
+class Portfolio:
+
+    """
+    Columnar book of commodity option positions, one array element per position
+
+    Quantities are in lots i.e. position PV = option price * futures lot size * quantity. A book is valued in bulk
+    with a single Black76CommodityBatchPricer and aggregated per bucket with vectorised group-by reductions.
+    """
+
+    __slots__ = ('contract', 'exchange_code', 'month', 'year', 'option_type', 'strike', 'quantity')
+
+    COLUMNS = ('CONTRACT', 'EXCHANGE_CODE', 'MONTH', 'YEAR', 'OPTION_TYPE', 'STRIKE', 'QUANTITY')
+    REQUIRED_COLUMNS = ('CONTRACT', 'MONTH', 'YEAR', 'OPTION_TYPE')
+    BUCKET_COLUMNS = ('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION', 'OPTION_TYPE')
+    GREEKS = ('DELTA', 'GAMMA', 'THETA', 'VEGA', 'RHO')
+    SECOND_ORDER_GREEKS = ('VANNA', 'VOLGA', 'CHARM')
+
+    def __init__(self, contract, month, year, option_type, strike=None, exchange_code=None, quantity=1.):
+        from analytics.constants import default_exchange_codes
+
+        contract, month, year, option_type, strike, exchange_code, quantity = np.broadcast_arrays(
+            np.char.upper(np.atleast_1d(np.asarray(contract, dtype=str))),
+            np.char.upper(np.asarray(month, dtype=str)),
+            np.asarray(year, dtype=str),
+            np.char.upper(np.asarray(option_type, dtype=str)),
+            np.asarray(np.nan if strike is None else strike, dtype=np.float64),
+            np.asarray(exchange_code, dtype=object),
+            np.asarray(quantity, dtype=np.float64)
+        )
+        assert contract.ndim == 1
+
+        self.contract = contract
+        self.exchange_code = default_exchange_codes(contract, exchange_code)
+        self.month = month
+        self.year = year
+        self.option_type = option_type
+        self.strike = strike
+        self.quantity = quantity
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame):
+        assert dataframe is not None
+
+        missing = [column for column in cls.REQUIRED_COLUMNS if column not in dataframe.columns]
+        if missing:
+            raise BlackScholesInputError(f'Missing position columns {missing}')
+
+        return cls(
+            contract=dataframe['CONTRACT'].values,
+            month=dataframe['MONTH'].values,
+            year=dataframe['YEAR'].values,
+            option_type=dataframe['OPTION_TYPE'].values,
+            strike=dataframe['STRIKE'].values.astype(np.float64) if 'STRIKE' in dataframe.columns else None,
+            exchange_code=dataframe['EXCHANGE_CODE'].values if 'EXCHANGE_CODE' in dataframe.columns else None,
+            quantity=dataframe['QUANTITY'].values if 'QUANTITY' in dataframe.columns else 1.
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({column: getattr(self, column.lower()) for column in self.COLUMNS})
+
+    def __len__(self):
+        return len(self.contract)
+
+    def expiration(self) -> np.ndarray:
+        """
+        :return: contract codes e.g. 'F2025', see analytics.constants.FUTURES_DELIVERY_MAP
+        """
+        from analytics.constants import FUTURES_DELIVERY_MAP
+
+        return np.array([
+            f'{FUTURES_DELIVERY_MAP.get(month, month)}{year}' for month, year in zip(self.month, self.year)
+        ])
+
+    def pricer(self, snapshot=None, as_of=None):
+        from analytics.options.black_scholes_batch import Black76CommodityBatchPricer
+
+        return Black76CommodityBatchPricer(
+            option_type=self.option_type,
+            contract=self.contract,
+            exchange_code=self.exchange_code,
+            month=self.month,
+            year=self.year,
+            strike=self.strike,
+            snapshot=snapshot,
+            as_of=as_of
+        )
+
+    def position_size(self, pricer) -> np.ndarray:
+        """
+        :return: quantity * futures lot size per position
+        """
+        return self.quantity * pricer.lot_size()
+
+    def valuation(self, second_order: bool = False, snapshot=None, as_of=None) -> pd.DataFrame:
+        """
+        :return: DataFrame of positions with PRICE (per unit), PV & position greeks (scaled by lot size * quantity),
+                 NaN where market data is missing
+        """
+        pricer = self.pricer(snapshot=snapshot, as_of=as_of)
+        position_size = self.position_size(pricer)
+        price = pricer.price()
+
+        valuation = self.to_dataframe()
+        valuation['EXPIRATION'] = self.expiration()
+        valuation['STRIKE'] = pricer.x
+        valuation['PRICE'] = price
+        valuation['PV'] = price * position_size
+        greeks = pricer.greeks(second_order=second_order)
+        for greek in greeks.columns:
+            valuation[greek] = greeks[greek].values * position_size
+
+        return valuation
+
+    def aggregate(
+            self, by=('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION'), second_order: bool = False, snapshot=None, as_of=None
+    ) -> pd.DataFrame:
+        """
+        :param by: bucket columns, any of BUCKET_COLUMNS
+        :return: DataFrame of PV & greeks summed per bucket with the number of POSITIONS, a bucket sums to NaN
+                 if any of its positions could not be valued
+        """
+        by = list(by)
+        assert by
+        assert all(column in self.BUCKET_COLUMNS for column in by)
+
+        valuation = self.valuation(second_order=second_order, snapshot=snapshot, as_of=as_of)
+
+        codes, buckets = pd.factorize(pd.MultiIndex.from_frame(valuation[by]), sort=True)
+        aggregate = buckets.set_names(by).to_frame(index=False)
+        aggregate['POSITIONS'] = np.bincount(codes, minlength=len(buckets))
+        for column in ('PV',) + self.GREEKS + (self.SECOND_ORDER_GREEKS if second_order else ()):
+            aggregate[column] = np.bincount(codes, weights=valuation[column].values, minlength=len(buckets))
+
+        return aggregate
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+from analytics.constants import BlackScholesLimits
+from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+
+
+class ScenarioSpec:
+
+    """
+    Scenario grid specification, the grid is the cartesian product of the bump axes
+
+    - fs_shifts: underlying bumps, relative (fs * (1 + shift)) or absolute (fs + shift) see fs_shift_type
+    - vol_shifts: parallel (absolute) vol bumps, sticky strike
+    - vol_tenor_shifts: Optional {tenor (years): vol shift}, added to every scenario, interpolated on time to expiry
+    - rate_shifts: parallel (absolute) bumps of the yield curve
+    - days: time decay i.e. calendar days rolled forward, rates are re-interpolated on the rolled time to expiry
+    """
+
+    __slots__ = ('fs_shifts', 'fs_shift_type', 'vol_shifts', 'vol_tenor_shifts', 'rate_shifts', 'days')
+
+    FS_SHIFT_TYPES = ('relative', 'absolute')
+    COLUMNS = ('FS_SHIFT', 'VOL_SHIFT', 'RATE_SHIFT', 'DAYS')
+
+    def __init__(
+            self, fs_shifts=(0.,), fs_shift_type: str = 'relative', vol_shifts=(0.,), vol_tenor_shifts: dict = None,
+            rate_shifts=(0.,), days=(0,)
+    ):
+        assert fs_shift_type in self.FS_SHIFT_TYPES
+
+        self.fs_shifts = np.atleast_1d(np.asarray(fs_shifts, dtype=np.float64))
+        self.fs_shift_type = fs_shift_type
+        self.vol_shifts = np.atleast_1d(np.asarray(vol_shifts, dtype=np.float64))
+        self.vol_tenor_shifts = {float(tenor): float(shift) for tenor, shift in (vol_tenor_shifts or {}).items()}
+        self.rate_shifts = np.atleast_1d(np.asarray(rate_shifts, dtype=np.float64))
+        self.days = np.atleast_1d(np.asarray(days, dtype=np.float64))
+
+        assert all(len(axis) for axis in (self.fs_shifts, self.vol_shifts, self.rate_shifts, self.days))
+
+    @classmethod
+    def ladder(cls, fs_step: float = 0.01, fs_steps: int = 20, vol_step: float = 0.01, vol_steps: int = 10, **kwargs):
+        """
+        :return: symmetric spot/vol ladder e.g. the default 41 relative spot bumps x 21 vol bumps
+        """
+        return cls(
+            fs_shifts=fs_step * np.arange(-fs_steps, fs_steps + 1),
+            vol_shifts=vol_step * np.arange(-vol_steps, vol_steps + 1),
+            **kwargs
+        )
+
+    def __len__(self):
+        return len(self.fs_shifts) * len(self.vol_shifts) * len(self.rate_shifts) * len(self.days)
+
+    def grid(self) -> tuple:
+        """
+        :return: (fs shifts, vol shifts, rate shifts, days) flat arrays of length len(self), one element per scenario
+        """
+        return tuple(
+            np.ascontiguousarray(axis.ravel())
+            for axis in np.meshgrid(self.fs_shifts, self.vol_shifts, self.rate_shifts, self.days, indexing='ij')
+        )
+
+    def scenarios(self) -> pd.DataFrame:
+        return pd.DataFrame(dict(zip(self.COLUMNS, self.grid())))
+
+    def tenor_vol_shift(self, t: np.ndarray) -> np.ndarray:
+        if not self.vol_tenor_shifts:
+            return np.zeros(np.shape(t))
+
+        tenors, shifts = zip(*sorted(self.vol_tenor_shifts.items()))
+
+        return np.interp(t, tenors, shifts)
+
+
+class ScenarioEngine:
+
+    """
+    Reprices a positions x scenarios grid as broadcast array computations, positions are processed in chunks so
+    that at most max_cells grid points are held in memory at once
+
+    Positions are given as a (1-D) BlackScholesBatchPricer e.g. Black76CommodityBatchPricer, position values are
+    price * quantity. When a yield curve (analytics.curves.yield_curve.YieldCurve) is given rates are taken from the
+    curve at the (time decayed) time to expiry, otherwise from the pricer. Expired options are valued at intrinsic.
+    """
+
+    __slots__ = ('pricer', 'spec', 'quantity', 'yield_curve', 'max_cells')
+
+    MAX_CELLS = 2 ** 20
+
+    def __init__(
+            self, pricer: BlackScholesBatchPricer, spec: ScenarioSpec, quantity=1., yield_curve=None,
+            max_cells: int = MAX_CELLS
+    ):
+        assert pricer is not None
+        assert pricer.x.ndim == 1
+        assert spec is not None
+        assert max_cells > 0
+
+        self.pricer = pricer
+        self.spec = spec
+        self.quantity = np.broadcast_to(np.asarray(quantity, dtype=np.float64), pricer.x.shape)
+        self.yield_curve = yield_curve
+        self.max_cells = max_cells
+
+    def chunk_size(self) -> int:
+        return max(1, self.max_cells // len(self.spec))
+
+    def chunks(self):
+        """
+        :return: generator of (position slice, position values array (chunk positions x scenarios))
+        """
+        fs_shifts, vol_shifts, rate_shifts, days = self.spec.grid()
+        chunk_size = self.chunk_size()
+
+        for start in range(0, len(self.pricer.x), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            yield chunk, self._values(chunk, fs_shifts, vol_shifts, rate_shifts, days)
+
+    def values(self) -> np.ndarray:
+        """
+        :return: position values array (positions x scenarios)
+        """
+        values = np.empty((len(self.pricer.x), len(self.spec)))
+        for chunk, chunk_values in self.chunks():
+            values[chunk] = chunk_values
+
+        return values
+
+    def portfolio_values(self) -> np.ndarray:
+        """
+        :return: total value per scenario, NaN if any position could not be valued
+        """
+        values = np.zeros(len(self.spec))
+        for __, chunk_values in self.chunks():
+            values += chunk_values.sum(axis=0)
+
+        return values
+
+    def ladder(self) -> pd.DataFrame:
+        """
+        :return: DataFrame of scenarios with the portfolio value (PV) and P&L vs the unbumped portfolio (PNL)
+        """
+        base_value = float(np.sum(self.pricer.price() * self.quantity))
+
+        ladder = self.spec.scenarios()
+        ladder['PV'] = self.portfolio_values()
+        ladder['PNL'] = ladder['PV'] - base_value
+
+        return ladder
+
+    def _values(self, chunk: slice, fs_shifts, vol_shifts, rate_shifts, days) -> np.ndarray:
+        pricer = self.pricer
+        option_type = pricer.option_type[chunk, None]
+        x = pricer.x[chunk, None]
+        fs = pricer.fs[chunk, None]
+        t = pricer.t[chunk, None]
+        b = pricer.b[chunk, None]
+
+        fs = fs * (1. + fs_shifts) if self.spec.fs_shift_type == 'relative' else fs + fs_shifts
+        v = pricer.v[chunk, None] + self.spec.tenor_vol_shift(t) + vol_shifts
+        v = np.maximum(v, BlackScholesLimits.MIN_V)
+        t = t - days / 365.25
+
+        if self.yield_curve is not None:
+            # shifted times to expiry may fall outside the curve tenors
+            r = self.yield_curve.rate(np.nan_to_num(t, nan=self.yield_curve.tenors[0]), extrapolation='flat')
+            r = np.where(np.isnan(pricer.r[chunk, None]), np.nan, r) + rate_shifts
+        else:
+            r = pricer.r[chunk, None] + rate_shifts
+
+        prices = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v).price()
+
+        with np.errstate(invalid='ignore'):
+            expired = t < BlackScholesLimits.MIN_T
+        if expired.any():
+            intrinsic = np.maximum(np.where(option_type == 'c', fs - x, x - fs), 0.)
+            prices = np.where(expired & ~np.isnan(intrinsic), intrinsic, prices)
+
+        return prices * self.quantity[chunk, None]
@@ -1,12 +1,66 @@
+import asyncio
 import env
 import json
-import os
+import numpy as np
 import pandas as pd
 import requests
+import threading
+import weakref
 from abc import ABC, abstractmethod
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from market.datastore_adapter import DataAPI
 
 
+class DataBatches:
+
+    """
+    Iterator of the Arrow record batches of a streamed data query, see data_batches() endpoints
+
+    Batches are read as they are iterated (constant memory), the underlying response (if any) is closed once
+    exhausted, on to_pandas() or close(), also usable as a context manager
+    """
+
+    __slots__ = ('reader', 'response')
+
+    def __init__(self, reader, response=None):
+        """
+        :param reader: pyarrow RecordBatchReader
+        :param response: Optional, streamed HTTP response read by reader
+        """
+        self.reader = reader
+        self.response = response
+
+    @property
+    def schema(self):
+        return self.reader.schema
+
+    def __iter__(self):
+        try:
+            yield from self.reader
+        finally:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        :return: DataFrame of the remaining batches (materialised), the stored index is restored
+        """
+        try:
+            return self.reader.read_pandas()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self.response is not None:
+            self.response.close()
+
+
 class BaseClient(ABC):
 
     @classmethod
@@ -42,6 +96,20 @@ class BaseClient(ABC):
     ) -> float:
         pass
 
+    @staticmethod
+    @abstractmethod
+    def option_greeks_batch(
+            option_type, x, fs, t, b, r, v, second_order: bool = False
+    ) -> pd.DataFrame:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def implied_vol(
+            option_type, x, fs, t, b, r, price, method: str = 'newton'
+    ) -> np.ndarray:
+        pass
+
     @staticmethod
     @abstractmethod
     def commodity_option_price(
@@ -50,6 +118,13 @@ class BaseClient(ABC):
     ) -> float:
         pass
 
+    @staticmethod
+    @abstractmethod
+    def commodity_option_price_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, lot_price=False
+    ) -> np.ndarray:
+        pass
+
     @staticmethod
     @abstractmethod
     def commodity_option_greeks(
@@ -59,7 +134,44 @@ class BaseClient(ABC):
 
     @staticmethod
     @abstractmethod
-    def data(symbol: str) -> object:
+    def commodity_option_greeks_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, second_order: bool = False
+    ) -> pd.DataFrame:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def commodity_option_portfolio(
+            positions: pd.DataFrame, by=('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION'), second_order: bool = False
+    ) -> pd.DataFrame:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def commodity_option_scenarios(
+            positions: pd.DataFrame, fs_shifts=(0.,), fs_shift_type: str = 'relative', vol_shifts=(0.,),
+            vol_tenor_shifts: dict = None, rate_shifts=(0.,), days=(0,)
+    ) -> pd.DataFrame:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def commodity_option_price_history(
+            contract: str, month: str, year: str, option_type: str, start_date, end_date, strike: float = None,
+            exchange_code: str = None, quantity: float = 1., second_order: bool = False, extrapolation: str = 'raise'
+    ) -> pd.DataFrame:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def data(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters: list = None, as_of=None
+    ) -> object:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def data_cache_stats() -> dict:
         pass
 
     @staticmethod
@@ -154,6 +266,54 @@ class LocalClient(BaseClient):
 
         return pricer.price() * lot_factor
 
+    @staticmethod
+    def option_price_batch(option_type, x, fs, t, b, r, v) -> np.ndarray:
+        from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+
+        pricer = BlackScholesBatchPricer(
+            option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v
+        )
+
+        return pricer.price()
+
+    @staticmethod
+    def option_greeks_batch(
+            option_type, x, fs, t, b, r, v, second_order: bool = False
+    ) -> pd.DataFrame:
+        from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+
+        pricer = BlackScholesBatchPricer(
+            option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v
+        )
+
+        return pricer.greeks(second_order=second_order)
+
+    @staticmethod
+    def implied_vol(
+            option_type, x, fs, t, b, r, price, method: str = 'newton'
+    ) -> np.ndarray:
+        from analytics.options.volatility import implied_vol
+
+        return implied_vol(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, cp=price, method=method)
+
+    @staticmethod
+    def commodity_option_price_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, lot_price=False
+    ) -> np.ndarray:
+        from analytics.options.black_scholes_batch import Black76CommodityBatchPricer
+
+        pricer = Black76CommodityBatchPricer(
+            contract=contract,
+            exchange_code=exchange_code,
+            month=month,
+            year=year,
+            option_type=option_type,
+            strike=strike
+        )
+        lot_factor = np.where(lot_price, pricer.lot_size(), 1.)
+
+        return pricer.price() * lot_factor
+
     @staticmethod
     def commodity_option_greeks(
             contract: str, exchange_code: str, month: str, year: str, option_type: str, strike: str
@@ -178,21 +338,100 @@ class LocalClient(BaseClient):
         return pricer.greeks()
 
     @staticmethod
-    def data(symbol: str) -> object:
+    def commodity_option_greeks_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, second_order: bool = False
+    ) -> pd.DataFrame:
+        from analytics.options.black_scholes_batch import Black76CommodityBatchPricer
+
+        pricer = Black76CommodityBatchPricer(
+            contract=contract,
+            exchange_code=exchange_code,
+            month=month,
+            year=year,
+            option_type=option_type,
+            strike=strike
+        )
+
+        return pricer.greeks(second_order=second_order)
+
+    @staticmethod
+    def commodity_option_portfolio(
+            positions: pd.DataFrame, by=('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION'), second_order: bool = False
+    ) -> pd.DataFrame:
+        assert positions is not None
+
+        from analytics.portfolio import Portfolio
+
+        portfolio = Portfolio.from_dataframe(positions)
+
+        return portfolio.aggregate(by=by, second_order=second_order)
+
+    @staticmethod
+    def commodity_option_scenarios(
+            positions: pd.DataFrame, fs_shifts=(0.,), fs_shift_type: str = 'relative', vol_shifts=(0.,),
+            vol_tenor_shifts: dict = None, rate_shifts=(0.,), days=(0,)
+    ) -> pd.DataFrame:
+        assert positions is not None
+
+        from analytics.curves.yield_curve import yield_curve
+        from analytics.portfolio import Portfolio
+        from analytics.scenarios import ScenarioEngine, ScenarioSpec
+
+        spec = ScenarioSpec(
+            fs_shifts=fs_shifts, fs_shift_type=fs_shift_type, vol_shifts=vol_shifts,
+            vol_tenor_shifts=vol_tenor_shifts, rate_shifts=rate_shifts, days=days
+        )
+        portfolio = Portfolio.from_dataframe(positions)
+        pricer = portfolio.pricer()
+        engine = ScenarioEngine(
+            pricer=pricer, spec=spec, quantity=portfolio.position_size(pricer), yield_curve=yield_curve(env.TRADE_DATE)
+        )
+
+        return engine.ladder()
+
+    @staticmethod
+    def commodity_option_price_history(
+            contract: str, month: str, year: str, option_type: str, start_date, end_date, strike: float = None,
+            exchange_code: str = None, quantity: float = 1., second_order: bool = False, extrapolation: str = 'raise'
+    ) -> pd.DataFrame:
+        from analytics.history import commodity_option_history
+
+        return commodity_option_history(
+            contract=contract, month=month, year=year, option_type=option_type, start_date=start_date,
+            end_date=end_date, strike=strike, exchange_code=exchange_code, quantity=quantity, second_order=second_order,
+            extrapolation=extrapolation
+        )
+
+    @staticmethod
+    def data(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters: list = None, as_of=None
+    ) -> object:
         assert symbol
 
-        return DataAPI.query(symbol=symbol)
+        return DataAPI.query(
+            symbol=symbol, columns=columns, start_date=start_date, end_date=end_date, filters=filters, as_of=as_of
+        )
 
     @staticmethod
-    def symbols() -> list:
+    def data_batches(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters: list = None, as_of=None,
+            batch_size: int = None
+    ) -> DataBatches:
+        assert symbol
 
-        import glob
+        return DataBatches(reader=DataAPI.query_batches(
+            symbol=symbol, columns=columns, start_date=start_date, end_date=end_date, filters=filters, as_of=as_of,
+            batch_size=batch_size
+        ))
 
-        return [
-            file_path.split(os.path.sep)[-1].split('.')[0]
-            for file_path in glob.glob(os.path.sep.join((env.MARKET_DATA_PATH, '*.*')))
-            if file_path.endswith('.parquet')
-        ]
+    @staticmethod
+    def data_cache_stats() -> dict:
+        return DataAPI.cache_stats()
+
+    @staticmethod
+    def symbols() -> list:
+
+        return DataAPI.symbols()
 
     @staticmethod
     def save(symbol: str, dataframe: pd.DataFrame) -> str:
@@ -206,8 +445,69 @@ class RestClient(BaseClient):
 
     """
     Proxy Client API for REST API
+
+    All endpoints share one keep-alive connection pool (env.REST_POOL_MAXSIZE connections per host), created on first
+    use. Each thread has its own requests.Session mounted on the shared pool, so worker threads can share the client.
+    Requests time out (env.REST_CONNECT_TIMEOUT, env.REST_READ_TIMEOUT) and idempotent GETs are retried
+    (env.REST_RETRIES) with exponential backoff on connection errors & 502/503/504 responses.
     """
 
+    _adapter = None
+    _adapter_lock = threading.Lock()
+    _sessions = threading.local()
+
+    @staticmethod
+    def _http_adapter() -> HTTPAdapter:
+        """
+        :return: the connection pool shared by all threads, created on first use from the env settings
+        """
+        if RestClient._adapter is None:
+            with RestClient._adapter_lock:
+                if RestClient._adapter is None:
+                    retry = Retry(
+                        total=env.REST_RETRIES,
+                        backoff_factor=env.REST_RETRY_BACKOFF,
+                        status_forcelist=(502, 503, 504),
+                        allowed_methods=frozenset(('GET',)),
+                        raise_on_status=False
+                    )
+                    RestClient._adapter = HTTPAdapter(
+                        pool_connections=4, pool_maxsize=env.REST_POOL_MAXSIZE, max_retries=retry
+                    )
+
+        return RestClient._adapter
+
+    @staticmethod
+    def _http_session() -> requests.Session:
+        """
+        :return: the calling thread's session, mounted on the shared connection pool
+        """
+        session = getattr(RestClient._sessions, 'session', None)
+        adapter = RestClient._http_adapter()
+        if session is None or session.get_adapter('http://') is not adapter:
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            RestClient._sessions.session = session
+
+        return session
+
+    @staticmethod
+    def _request(method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', (env.REST_CONNECT_TIMEOUT, env.REST_READ_TIMEOUT))
+
+        return RestClient._http_session().request(method, url, **kwargs)
+
+    @staticmethod
+    def _close() -> None:
+        """
+        Closes the pooled connections, the next request creates a new pool from the (possibly tweaked) env settings
+        """
+        with RestClient._adapter_lock:
+            if RestClient._adapter is not None:
+                RestClient._adapter.close()
+            RestClient._adapter = None
+
     @staticmethod
     def env_variables() -> dict:
         """
@@ -215,7 +515,7 @@ class RestClient(BaseClient):
         """
 
         url = f'{env.REST_API_URL}/env_variables'
-        response = requests.get(url)
+        response = RestClient._request('GET', url)
 
         return json.loads(response.content)['ENV_VARIABLES']
 
@@ -235,7 +535,7 @@ class RestClient(BaseClient):
 
         url = f'{env.REST_API_URL}/tweak_env?KEY={key}&VALUE={value}'
 
-        return requests.get(url).text
+        return RestClient._request('GET', url).text
 
     @staticmethod
     def option_price(
@@ -264,7 +564,7 @@ class RestClient(BaseClient):
         url = f'{env.REST_API_URL}/option_price' \
               f'?OPTION_TYPE={option_type}&X={x}&FS={fs}&T={t}&B={b}&R={r}&V={v}'
 
-        result = requests.get(url).text
+        result = RestClient._request('GET', url).text
 
         try:
             return float(result)
@@ -300,13 +600,71 @@ class RestClient(BaseClient):
         url = f'{env.REST_API_URL}/option_greeks' \
               f'?OPTION_TYPE={option_type}&X={x}&FS={fs}&T={t}&B={b}&R={r}&V={v}'
 
-        result = requests.get(url).content
+        result = RestClient._request('GET', url).content
 
         try:
             return ast.literal_eval(result.decode('UTF-8'))
         except ValueError:
             return result
 
+    @staticmethod
+    def option_greeks_batch(
+            option_type, x, fs, t, b, r, v, second_order: bool = False
+    ) -> pd.DataFrame:
+        """
+        Vectorised Generalised Black Scholes 73 option greeks endpoint, inputs are sent/returned as Arrow IPC tables
+
+        :param option_type: Use either 'c' (call) or 'p' (put), scalar or array
+        :param x: Option strike price, scalar or array
+        :param fs: Price of underlying, scalar or array
+        :param t: Time to expiry, scalar or array
+        :param b: Cost of carry / yield dividend etc, scalar or array
+        :param r: Risk free rate, scalar or array
+        :param v: Volatility, scalar or array
+        :param second_order: Optional, set to true to include Vanna, Volga & Charm
+        :return: DataFrame of Option greeks (Delta, Gamma, Theta, Vega, Rho), one row per option
+        """
+        columns = ('OPTION_TYPE', 'X', 'FS', 'T', 'B', 'R', 'V')
+        arrays = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(option_type, dtype=str)),
+            *(np.asarray(value, dtype=np.float64) for value in (x, fs, t, b, r, v))
+        )
+
+        return RestClient._post_table(
+            endpoint='option_greeks_batch', dataframe=pd.DataFrame(dict(zip(columns, arrays))),
+            params={'SECOND_ORDER': second_order}
+        )
+
+    @staticmethod
+    def implied_vol(
+            option_type, x, fs, t, b, r, price, method: str = 'newton'
+    ) -> np.ndarray:
+        """
+        Vectorised implied volatility endpoint, backs out GBS 73 (Black 76 with b = 0) vols from option prices
+        e.g. exchange settlement prices of a whole option chain
+
+        :param option_type: Use either 'c' (call) or 'p' (put), scalar or array
+        :param x: Option strike price, scalar or array
+        :param fs: Price of underlying, scalar or array
+        :param t: Time to expiry, scalar or array
+        :param b: Cost of carry / yield dividend etc, scalar or array
+        :param r: Risk free rate, scalar or array
+        :param price: Option price, scalar or array
+        :param method: Optional, 'newton' (Newton-Raphson with bisection fallback) or 'rational' (Halley from a
+                       closed form guess, fewer iterations)
+        :return: array of implied vols, NaN where no implied vol exists for the price
+        """
+        columns = ('OPTION_TYPE', 'X', 'FS', 'T', 'B', 'R', 'PRICE')
+        arrays = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(option_type, dtype=str)),
+            *(np.asarray(value, dtype=np.float64) for value in (x, fs, t, b, r, price))
+        )
+        result = RestClient._post_table(
+            endpoint='implied_vol', dataframe=pd.DataFrame(dict(zip(columns, arrays))), params={'METHOD': method}
+        )
+
+        return result['IMPLIED_VOL'].values
+
     @staticmethod
     def commodity_option_price(
             contract: str, month: str, year: str, option_type: str,
@@ -348,13 +706,40 @@ class RestClient(BaseClient):
         if exchange_code:
             url = url + f'&EXCHANGE_CODE={exchange_code}'
 
-        result = requests.get(url).text
+        result = RestClient._request('GET', url).text
 
         try:
             return float(result)
         except ValueError:
             return result
 
+    @staticmethod
+    def commodity_option_price_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, lot_price=False
+    ) -> np.ndarray:
+        """
+        Vectorised Black 76 option pricer endpoint, prices a book of options in a single request
+        see endpoint commodity_option_price() for model implementation details
+
+        Options are sent/returned as an Arrow IPC stream, options with missing market data price to NaN
+
+        :param contract: Options contract e.g. 'BRENT', 'WTI', 'HH' etc, scalar or array
+        :param month: Expiry month e.g. 'JAN', 'FEB', 'MAR', etc, scalar or array
+        :param year: Expiry year e.g. '2025', scalar or array
+        :param option_type: Use either 'c' (call) or 'p' (put), scalar or array
+        :param strike: Optional, defaults to ATM if not set (or NaN), scalar or array
+        :param exchange_code: Optional, e.g. 'ICE', 'NYM' etc, scalar or array
+        :param lot_price: Optional, set to true to return the Option price * Futures lot size, scalar or array
+        :return: array of Commodity option prices/premiums
+        """
+        dataframe = RestClient._commodity_option_batch_table(
+            contract=contract, month=month, year=year, option_type=option_type, strike=strike,
+            exchange_code=exchange_code, lot_price=lot_price
+        )
+        result = RestClient._post_table(endpoint='commodity_option_price_batch', dataframe=dataframe)
+
+        return result['PRICE'].values
+
     @staticmethod
     def commodity_option_greeks(
             contract: str, month: str, year: str, option_type: str, strike: str = None, exchange_code: str = None
@@ -384,7 +769,7 @@ class RestClient(BaseClient):
         if exchange_code:
             url = url + f'&EXCHANGE_CODE={exchange_code}'
 
-        result = requests.get(url).content
+        result = RestClient._request('GET', url).content
 
         try:
             return ast.literal_eval(result.decode('UTF-8'))
@@ -392,23 +777,209 @@ class RestClient(BaseClient):
             return result
 
     @staticmethod
-    def data(symbol: str) -> object:
+    def commodity_option_greeks_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, second_order: bool = False
+    ) -> pd.DataFrame:
         """
-        Data query endpoint
+        Vectorised commodity option greeks, see endpoint commodity_option_price_batch() for details
+
+        :param second_order: Optional, set to true to include Vanna, Volga & Charm
+        :return: DataFrame of Commodity option greeks (Delta, Gamma, Theta, Vega, Rho), one row per option
+        """
+        dataframe = RestClient._commodity_option_batch_table(
+            contract=contract, month=month, year=year, option_type=option_type, strike=strike,
+            exchange_code=exchange_code
+        )
+
+        return RestClient._post_table(
+            endpoint='commodity_option_greeks_batch', dataframe=dataframe, params={'SECOND_ORDER': second_order}
+        )
+
+    @staticmethod
+    def commodity_option_portfolio(
+            positions: pd.DataFrame, by=('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION'), second_order: bool = False
+    ) -> pd.DataFrame:
+        """
+        Book valuation endpoint, prices all positions in bulk and returns PV & greeks aggregated per bucket
+
+        :param positions: DataFrame of positions, columns CONTRACT, MONTH, YEAR, OPTION_TYPE & optional
+                          EXCHANGE_CODE, STRIKE (defaults to ATM) and QUANTITY (lots, defaults to 1)
+        :param by: Optional, bucket columns, any of CONTRACT, EXCHANGE_CODE, EXPIRATION (e.g. 'F2025'), OPTION_TYPE
+        :param second_order: Optional, set to true to include Vanna, Volga & Charm
+        :return: DataFrame of buckets with the number of POSITIONS, PV & greeks (scaled by lot size * quantity)
+        """
+        assert positions is not None
+
+        params = {
+            'BY': ','.join(by),
+            'SECOND_ORDER': second_order
+        }
+
+        return RestClient._post_table(endpoint='commodity_option_portfolio', dataframe=positions, params=params)
+
+    @staticmethod
+    def commodity_option_scenarios(
+            positions: pd.DataFrame, fs_shifts=(0.,), fs_shift_type: str = 'relative', vol_shifts=(0.,),
+            vol_tenor_shifts: dict = None, rate_shifts=(0.,), days=(0,)
+    ) -> pd.DataFrame:
+        """
+        Scenario grid (risk ladder) repricing of a book of commodity options, the grid is the cartesian product
+        of the bump axes and is evaluated server side as broadcast array computations
+
+        :param positions: DataFrame of positions, columns CONTRACT, MONTH, YEAR, OPTION_TYPE & optional
+                          EXCHANGE_CODE, STRIKE (defaults to ATM) and QUANTITY (lots, defaults to 1)
+        :param fs_shifts: Optional, underlying price bumps
+        :param fs_shift_type: Optional, 'relative' i.e. fs * (1 + shift) or 'absolute' i.e. fs + shift
+        :param vol_shifts: Optional, parallel (absolute) implied vol bumps, sticky strike
+        :param vol_tenor_shifts: Optional, {tenor (years): vol shift} added to all scenarios
+        :param rate_shifts: Optional, parallel (absolute) yield curve bumps
+        :param days: Optional, time decay in calendar days
+        :return: DataFrame of scenarios (FS_SHIFT, VOL_SHIFT, RATE_SHIFT, DAYS) with portfolio value PV & PNL
+        """
+        assert positions is not None
+
+        params = {
+            'FS_SHIFTS': json.dumps(np.atleast_1d(fs_shifts).tolist()),
+            'FS_SHIFT_TYPE': fs_shift_type,
+            'VOL_SHIFTS': json.dumps(np.atleast_1d(vol_shifts).tolist()),
+            'RATE_SHIFTS': json.dumps(np.atleast_1d(rate_shifts).tolist()),
+            'DAYS': json.dumps(np.atleast_1d(days).tolist())
+        }
+        if vol_tenor_shifts:
+            params['VOL_TENOR_SHIFTS'] = json.dumps({str(tenor): shift for tenor, shift in vol_tenor_shifts.items()})
+
+        return RestClient._post_table(endpoint='commodity_option_scenarios', dataframe=positions, params=params)
+
+    @staticmethod
+    def commodity_option_price_history(
+            contract: str, month: str, year: str, option_type: str, start_date, end_date, strike: float = None,
+            exchange_code: str = None, quantity: float = 1., second_order: bool = False, extrapolation: str = 'raise'
+    ) -> pd.DataFrame:
+        """
+        Time series (historical) repricing endpoint, PV & greeks of a position for every trade date of a date range
+        priced server side in one pass e.g. for P&L explain or backtests
+
+        :param contract: Commodity contract e.g. BRENT, WTI, HH
+        :param month: Option expiry month e.g. JAN
+        :param year: Option expiry year e.g. 2025
+        :param option_type: Use either 'c' (call) or 'p' (put)
+        :param start_date: Inclusive start trade date
+        :param end_date: Inclusive end trade date
+        :param strike: Optional, fixed strike, defaults to the ATM strike of each trade date
+        :param exchange_code: Optional, defaults to the contract default exchange
+        :param quantity: Optional, position quantity in lots
+        :param second_order: Optional, set to true to include Vanna, Volga & Charm
+        :param extrapolation: Optional, 'flat' prices dates within a month of expiry at the 1M rate, otherwise raises
+        :return: DataFrame indexed by Date of the market inputs (FS, X, T, R, V), PRICE, PV & position greeks
+        """
+        from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, read_table
+
+        url = f'{env.REST_API_URL}/commodity_option_price_history'
+        params = {
+            'CONTRACT': contract,
+            'MONTH': month,
+            'YEAR': year,
+            'OPTION_TYPE': option_type,
+            'START_DATE': str(start_date),
+            'END_DATE': str(end_date),
+            'QUANTITY': quantity,
+            'SECOND_ORDER': second_order,
+            'EXTRAPOLATION': extrapolation
+        }
+        if strike is not None:
+            params['STRIKE'] = strike
+        if exchange_code is not None:
+            params['EXCHANGE_CODE'] = exchange_code
+
+        response = RestClient._request('GET', url, params=params, headers={'Accept': ARROW_STREAM_CONTENT_TYPE})
+        if response.status_code != 200:
+            raise ValueError(response.text)
+
+        return read_table(response.content, response.headers.get('Content-Type')).to_pandas()
+
+    @staticmethod
+    def data(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters: list = None, as_of=None
+    ) -> object:
+        """
+        Data query endpoint, column & row selections are applied server side when reading the stored data
 
         :param symbol: Data symbol, see symbols() endpoint for existing data symbols
+        :param columns: Optional, list of columns to return (the index is always returned)
+        :param start_date: Optional, inclusive start date filter on a date index
+        :param end_date: Optional, inclusive end date filter on a date index
+        :param filters: Optional, row filters as a DNF list of (column, op, value) tuples e.g. [('AtM', '>', 0.3)]
+        :param as_of: Optional knowledge time (datetime), return the data as it was known at that time
         :return: Table (pandas) data, TODO scalers
         """
         assert symbol
 
-        import io
-        import pyarrow.parquet as pq
+        from api_rest.serialization import CONTENT_TYPES, read_table
+
+        url = f'{env.REST_API_URL}/data'
+        params = RestClient._data_params(
+            symbol=symbol, columns=columns, start_date=start_date, end_date=end_date, filters=filters, as_of=as_of
+        )
+
+        # any table format, the server sends the stored file as is when there is no selection (no re-encoding)
+        response = RestClient._request('GET', url, params=params, headers={'Accept': ', '.join(CONTENT_TYPES)})
+        if response.status_code != 200:
+            raise ValueError(response.text)
+
+        return read_table(response.content, response.headers.get('Content-Type')).to_pandas()
+
+    @staticmethod
+    def data_batches(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters: list = None, as_of=None,
+            batch_size: int = None
+    ) -> DataBatches:
+        """
+        Streamed data query endpoint, the server sends the record batches of the symbol as a chunked Arrow IPC stream
+        and they are decoded as they arrive i.e. arbitrarily large symbols are processed in constant memory
+
+        e.g. for batch in RestClient.data_batches(symbol): ... or RestClient.data_batches(symbol).to_pandas()
+
+        :param symbol: Data symbol, see symbols() endpoint for existing data symbols
+        :param columns: Optional, list of columns to return (the index is always returned)
+        :param start_date: Optional, inclusive start date filter on a date index
+        :param end_date: Optional, inclusive end date filter on a date index
+        :param filters: Optional, row filters as a DNF list of (column, op, value) tuples e.g. [('AtM', '>', 0.3)]
+        :param as_of: Optional knowledge time (datetime), return the data as it was known at that time
+        :param batch_size: Optional, maximum rows per record batch
+        :return: DataBatches iterator of pyarrow RecordBatch
+        """
+        assert symbol
+
+        import pyarrow as pa
+        from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE
+
+        url = f'{env.REST_API_URL}/data'
+        params = RestClient._data_params(
+            symbol=symbol, columns=columns, start_date=start_date, end_date=end_date, filters=filters, as_of=as_of
+        )
+        params['STREAM'] = True
+        if batch_size is not None:
+            params['BATCH_SIZE'] = batch_size
+
+        response = RestClient._request(
+            'GET', url, params=params, headers={'Accept': ARROW_STREAM_CONTENT_TYPE}, stream=True
+        )
+        if response.status_code != 200:
+            raise ValueError(response.text)
+        response.raw.decode_content = True
+
+        return DataBatches(reader=pa.ipc.open_stream(response.raw), response=response)
+
+    @staticmethod
+    def data_cache_stats() -> dict:
+        """
+        :return: dict of server side data cache counters (hits, misses, evictions, entries, size in bytes)
+        """
 
-        url = f'{env.REST_API_URL}/data?SYMBOL={symbol}'
+        url = f'{env.REST_API_URL}/data_cache_stats'
+        response = RestClient._request('GET', url)
 
-        response = requests.get(url)
-        table = pq.read_table(io.BytesIO(response.content))
-        return table.to_pandas()
+        return json.loads(response.content)['DATA_CACHE_STATS']
 
     @staticmethod
     def symbols() -> list:
@@ -417,7 +988,7 @@ class RestClient(BaseClient):
         """
 
         url = f'{env.REST_API_URL}/symbols'
-        response = requests.get(url)
+        response = RestClient._request('GET', url)
 
         return json.loads(response.content)['SYMBOLS']
 
@@ -426,6 +997,9 @@ class RestClient(BaseClient):
         """
         Data upload endpoint, supports table (pandas) data
 
+        The DataFrame is parquet encoded in memory and the buffer streamed as the request body (no temporary file),
+        the server validates the upload's schema before committing it
+
         TODO scalers etc
 
         :param symbol: str symbol
@@ -435,19 +1009,499 @@ class RestClient(BaseClient):
         assert symbol
         assert dataframe is not None
 
-        import tempfile
-
-        file_path_local = os.path.sep.join((tempfile.gettempdir(), f'{symbol}.parquet'))
-        dataframe.to_parquet(file_path_local)
+        import pyarrow as pa
+        from api_rest.serialization import PARQUET_CONTENT_TYPE
 
         url = f'{env.REST_API_URL}/save'
         params = {
             'SYMBOL': symbol,
             'FILE_EXTENSION': '.parquet'
         }
-        files = {"file": open(file_path_local, 'rb')}
+        # zero copy reader of the parquet buffer, sent in blocks
+        data = pa.BufferReader(RestClient._parquet_buffer(dataframe))
+
+        return RestClient._request(
+            'POST', url, params=params, data=data, headers={'Content-Type': PARQUET_CONTENT_TYPE}
+        ).text
+
+    @staticmethod
+    def _commodity_option_batch_table(
+            contract, month, year, option_type, strike=None, exchange_code=None, lot_price=False
+    ) -> pd.DataFrame:
+        contract, month, year, option_type, strike, exchange_code, lot_price = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(contract, dtype=str)),
+            np.asarray(month, dtype=str),
+            np.asarray(year, dtype=str),
+            np.asarray(option_type, dtype=str),
+            np.asarray(np.nan if strike is None else strike, dtype=np.float64),
+            np.asarray(exchange_code, dtype=object),
+            np.asarray(lot_price, dtype=bool)
+        )
+
+        return pd.DataFrame({
+            'CONTRACT': contract, 'EXCHANGE_CODE': exchange_code, 'MONTH': month, 'YEAR': year,
+            'OPTION_TYPE': option_type, 'STRIKE': strike, 'LOT_PRICE': lot_price
+        })
+
+    @staticmethod
+    def _parquet_buffer(dataframe: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        buffer_output_stream = pa.BufferOutputStream()
+        pq.write_table(pa.Table.from_pandas(dataframe), buffer_output_stream, compression='snappy')
+
+        return buffer_output_stream.getvalue()
+
+    @staticmethod
+    def _data_params(symbol: str, columns: list, start_date, end_date, filters: list, as_of) -> dict:
+        params = {
+            'SYMBOL': symbol
+        }
+        if columns is not None:
+            params['COLUMNS'] = ','.join(columns)
+        if start_date is not None:
+            params['START_DATE'] = str(start_date)
+        if end_date is not None:
+            params['END_DATE'] = str(end_date)
+        if filters is not None:
+            params['FILTERS'] = json.dumps(filters)
+        if as_of is not None:
+            params['AS_OF'] = pd.Timestamp(as_of).isoformat()
+
+        return params
+
+    @staticmethod
+    def _post_table(endpoint: str, dataframe: pd.DataFrame, params: dict = None) -> pd.DataFrame:
+        import pyarrow as pa
+        from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, read_table, write_table
+
+        url = f'{env.REST_API_URL}/{endpoint}'
+        data = write_table(pa.Table.from_pandas(dataframe, preserve_index=False), ARROW_STREAM_CONTENT_TYPE)
+        response = RestClient._request(
+            'POST', url, params=params, data=data, headers={'Content-Type': ARROW_STREAM_CONTENT_TYPE}
+        )
+        if response.status_code != 200:
+            raise ValueError(response.text)
+
+        return read_table(response.content, response.headers.get('Content-Type')).to_pandas()
+
+
+class AsyncRestClient(BaseClient):
+
+    """
+    Asyncio proxy Client API for REST API (aiohttp), endpoints are coroutines with the signatures of RestClient
+
+    Each event loop has one keep-alive session (env.REST_POOL_MAXSIZE connections per host) with the timeouts &
+    GET retries of RestClient. gather(), commodity_option_prices() & data_frames() fan out many requests
+    concurrently, at most limit (defaults to the pool size) in flight, e.g. a chain of option lookups completes in
+    about the time of its slowest requests instead of the sum of all of them.
+    """
+
+    _RETRY_STATUSES = (502, 503, 504)
+
+    _sessions = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _http_session():
+        """
+        :return: aiohttp.ClientSession of the running event loop, created on first use from the env settings
+        """
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = AsyncRestClient._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=0, limit_per_host=env.REST_POOL_MAXSIZE)
+            timeout = aiohttp.ClientTimeout(sock_connect=env.REST_CONNECT_TIMEOUT, sock_read=env.REST_READ_TIMEOUT)
+            session = AsyncRestClient._sessions[loop] = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+        return session
+
+    @staticmethod
+    async def _request(method: str, endpoint: str, params: dict = None, **kwargs) -> tuple:
+        """
+        :return: (status code, content bytes, content type) of the response, GETs are retried (env.REST_RETRIES)
+                 with exponential backoff on connection errors & 502/503/504
+        """
+        import aiohttp
+
+        url = f'{env.REST_API_URL}/{endpoint}'
+        if params is not None:
+            # aiohttp only accepts str & number query values
+            params = {key: str(value) for key, value in params.items() if value is not None}
+
+        retries = env.REST_RETRIES if method == 'GET' else 0
+        for attempt in range(retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(env.REST_RETRY_BACKOFF * 2 ** (attempt - 1))
+            try:
+                async with AsyncRestClient._http_session().request(method, url, params=params, **kwargs) as response:
+                    if response.status in AsyncRestClient._RETRY_STATUSES and attempt < retries:
+                        continue
+                    return response.status, await response.read(), response.content_type
+            except aiohttp.ClientConnectionError:
+                if attempt == retries:
+                    raise
+
+    @staticmethod
+    async def _close() -> None:
+        """
+        Closes the session of the running event loop
+        """
+        session = AsyncRestClient._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    @staticmethod
+    async def gather(coroutines, limit: int = None, return_exceptions: bool = False) -> list:
+        """
+        Awaits coroutines (e.g. endpoint calls) concurrently with a bounded semaphore
+
+        :param limit: Optional, maximum number of coroutines in flight, defaults to env.REST_POOL_MAXSIZE
+        :param return_exceptions: Optional, set to true to return exceptions in the results instead of raising
+        :return: list of results in the order of coroutines
+        """
+        semaphore = asyncio.Semaphore(limit or env.REST_POOL_MAXSIZE)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(
+            *(bounded(coroutine) for coroutine in coroutines), return_exceptions=return_exceptions
+        )
+
+    @staticmethod
+    async def commodity_option_prices(options, limit: int = None, return_exceptions: bool = False) -> list:
+        """
+        Concurrent commodity_option_price() requests
+
+        :param options: iterable of dicts of commodity_option_price() arguments, or a DataFrame with a row per option
+        :return: list of Commodity option prices/premiums in the order of options
+        """
+        if isinstance(options, pd.DataFrame):
+            options = (
+                {key.lower(): value for key, value in option.items() if not pd.isna(value)}
+                for option in options.to_dict(orient='records')
+            )
+
+        return await AsyncRestClient.gather(
+            (AsyncRestClient.commodity_option_price(**option) for option in options),
+            limit=limit, return_exceptions=return_exceptions
+        )
+
+    @staticmethod
+    async def data_frames(symbols, limit: int = None, return_exceptions: bool = False, **kwargs) -> dict:
+        """
+        Concurrent data() requests, kwargs (columns, start_date, etc) apply to all symbols
+
+        :return: dict of symbol -> Table (pandas) data
+        """
+        symbols = list(symbols)
+        dataframes = await AsyncRestClient.gather(
+            (AsyncRestClient.data(symbol=symbol, **kwargs) for symbol in symbols),
+            limit=limit, return_exceptions=return_exceptions
+        )
+
+        return dict(zip(symbols, dataframes))
+
+    @staticmethod
+    async def env_variables() -> dict:
+        __, content, __ = await AsyncRestClient._request('GET', 'env_variables')
+
+        return json.loads(content)['ENV_VARIABLES']
+
+    @staticmethod
+    async def tweak_env(key: str, value: object) -> str:
+        assert key
+        assert value
+
+        __, content, __ = await AsyncRestClient._request('GET', 'tweak_env', params={'KEY': key, 'VALUE': value})
+
+        return content.decode('UTF-8')
+
+    @staticmethod
+    async def option_price(
+            option_type: str, x: float, fs: float, t: float, b: float, r: float, v: float
+    ) -> float:
+        assert option_type
+        assert x
+        assert fs
+        assert t
+        assert b is not None
+        assert r
+        assert v
+
+        params = {'OPTION_TYPE': option_type, 'X': x, 'FS': fs, 'T': t, 'B': b, 'R': r, 'V': v}
+        __, content, __ = await AsyncRestClient._request('GET', 'option_price', params=params)
+
+        return AsyncRestClient._float(content)
+
+    @staticmethod
+    async def option_greeks(
+            option_type: str, x: float, fs: float, t: float, b: float, r: float, v: float
+    ) -> dict:
+        assert option_type
+        assert x
+        assert fs
+        assert t
+        assert b is not None
+        assert r
+        assert v
+
+        params = {'OPTION_TYPE': option_type, 'X': x, 'FS': fs, 'T': t, 'B': b, 'R': r, 'V': v}
+        __, content, __ = await AsyncRestClient._request('GET', 'option_greeks', params=params)
+
+        return AsyncRestClient._literal(content)
+
+    @staticmethod
+    async def option_greeks_batch(
+            option_type, x, fs, t, b, r, v, second_order: bool = False
+    ) -> pd.DataFrame:
+        columns = ('OPTION_TYPE', 'X', 'FS', 'T', 'B', 'R', 'V')
+        arrays = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(option_type, dtype=str)),
+            *(np.asarray(value, dtype=np.float64) for value in (x, fs, t, b, r, v))
+        )
+
+        return await AsyncRestClient._post_table(
+            endpoint='option_greeks_batch', dataframe=pd.DataFrame(dict(zip(columns, arrays))),
+            params={'SECOND_ORDER': second_order}
+        )
 
-        return requests.post(url, params=params, files=files).text
+    @staticmethod
+    async def implied_vol(
+            option_type, x, fs, t, b, r, price, method: str = 'newton'
+    ) -> np.ndarray:
+        columns = ('OPTION_TYPE', 'X', 'FS', 'T', 'B', 'R', 'PRICE')
+        arrays = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(option_type, dtype=str)),
+            *(np.asarray(value, dtype=np.float64) for value in (x, fs, t, b, r, price))
+        )
+        result = await AsyncRestClient._post_table(
+            endpoint='implied_vol', dataframe=pd.DataFrame(dict(zip(columns, arrays))), params={'METHOD': method}
+        )
+
+        return result['IMPLIED_VOL'].values
+
+    @staticmethod
+    async def commodity_option_price(
+            contract: str, month: str, year: str, option_type: str,
+            strike: str = None, exchange_code: str = None, lot_price: bool = False
+    ) -> float:
+        assert contract
+        assert month
+        assert year
+        assert option_type
+
+        params = {
+            'CONTRACT': contract,
+            'MONTH': month,
+            'YEAR': year,
+            'OPTION_TYPE': option_type,
+            'LOT_PRICE': lot_price,
+            'STRIKE': strike or None,
+            'EXCHANGE_CODE': exchange_code or None
+        }
+        __, content, __ = await AsyncRestClient._request('GET', 'commodity_option_price', params=params)
+
+        return AsyncRestClient._float(content)
+
+    @staticmethod
+    async def commodity_option_price_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, lot_price=False
+    ) -> np.ndarray:
+        dataframe = RestClient._commodity_option_batch_table(
+            contract=contract, month=month, year=year, option_type=option_type, strike=strike,
+            exchange_code=exchange_code, lot_price=lot_price
+        )
+        result = await AsyncRestClient._post_table(endpoint='commodity_option_price_batch', dataframe=dataframe)
+
+        return result['PRICE'].values
+
+    @staticmethod
+    async def commodity_option_greeks(
+            contract: str, month: str, year: str, option_type: str, strike: str = None, exchange_code: str = None
+    ) -> dict:
+        assert contract
+        assert month
+        assert year
+        assert option_type
+
+        params = {
+            'CONTRACT': contract,
+            'MONTH': month,
+            'YEAR': year,
+            'OPTION_TYPE': option_type,
+            'STRIKE': strike or None,
+            'EXCHANGE_CODE': exchange_code or None
+        }
+        __, content, __ = await AsyncRestClient._request('GET', 'commodity_option_greeks', params=params)
+
+        return AsyncRestClient._literal(content)
+
+    @staticmethod
+    async def commodity_option_greeks_batch(
+            contract, month, year, option_type, strike=None, exchange_code=None, second_order: bool = False
+    ) -> pd.DataFrame:
+        dataframe = RestClient._commodity_option_batch_table(
+            contract=contract, month=month, year=year, option_type=option_type, strike=strike,
+            exchange_code=exchange_code
+        )
+
+        return await AsyncRestClient._post_table(
+            endpoint='commodity_option_greeks_batch', dataframe=dataframe, params={'SECOND_ORDER': second_order}
+        )
+
+    @staticmethod
+    async def commodity_option_portfolio(
+            positions: pd.DataFrame, by=('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION'), second_order: bool = False
+    ) -> pd.DataFrame:
+        assert positions is not None
+
+        params = {
+            'BY': ','.join(by),
+            'SECOND_ORDER': second_order
+        }
+
+        return await AsyncRestClient._post_table(
+            endpoint='commodity_option_portfolio', dataframe=positions, params=params
+        )
+
+    @staticmethod
+    async def commodity_option_scenarios(
+            positions: pd.DataFrame, fs_shifts=(0.,), fs_shift_type: str = 'relative', vol_shifts=(0.,),
+            vol_tenor_shifts: dict = None, rate_shifts=(0.,), days=(0,)
+    ) -> pd.DataFrame:
+        assert positions is not None
+
+        params = {
+            'FS_SHIFTS': json.dumps(np.atleast_1d(fs_shifts).tolist()),
+            'FS_SHIFT_TYPE': fs_shift_type,
+            'VOL_SHIFTS': json.dumps(np.atleast_1d(vol_shifts).tolist()),
+            'RATE_SHIFTS': json.dumps(np.atleast_1d(rate_shifts).tolist()),
+            'DAYS': json.dumps(np.atleast_1d(days).tolist())
+        }
+        if vol_tenor_shifts:
+            params['VOL_TENOR_SHIFTS'] = json.dumps({str(tenor): shift for tenor, shift in vol_tenor_shifts.items()})
+
+        return await AsyncRestClient._post_table(
+            endpoint='commodity_option_scenarios', dataframe=positions, params=params
+        )
+
+    @staticmethod
+    async def commodity_option_price_history(
+            contract: str, month: str, year: str, option_type: str, start_date, end_date, strike: float = None,
+            exchange_code: str = None, quantity: float = 1., second_order: bool = False, extrapolation: str = 'raise'
+    ) -> pd.DataFrame:
+        from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, read_table
+
+        params = {
+            'CONTRACT': contract,
+            'MONTH': month,
+            'YEAR': year,
+            'OPTION_TYPE': option_type,
+            'START_DATE': start_date,
+            'END_DATE': end_date,
+            'STRIKE': strike,
+            'EXCHANGE_CODE': exchange_code,
+            'QUANTITY': quantity,
+            'SECOND_ORDER': second_order,
+            'EXTRAPOLATION': extrapolation
+        }
+        status, content, mimetype = await AsyncRestClient._request(
+            'GET', 'commodity_option_price_history', params=params, headers={'Accept': ARROW_STREAM_CONTENT_TYPE}
+        )
+        if status != 200:
+            raise ValueError(content.decode('UTF-8'))
+
+        return read_table(content, mimetype).to_pandas()
+
+    @staticmethod
+    async def data(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters: list = None, as_of=None
+    ) -> object:
+        assert symbol
+
+        from api_rest.serialization import CONTENT_TYPES, read_table
+
+        params = {
+            'SYMBOL': symbol,
+            'COLUMNS': None if columns is None else ','.join(columns),
+            'START_DATE': start_date,
+            'END_DATE': end_date,
+            'FILTERS': None if filters is None else json.dumps(filters),
+            'AS_OF': None if as_of is None else pd.Timestamp(as_of).isoformat()
+        }
+        status, content, mimetype = await AsyncRestClient._request(
+            'GET', 'data', params=params, headers={'Accept': ', '.join(CONTENT_TYPES)}
+        )
+        if status != 200:
+            raise ValueError(content.decode('UTF-8'))
+
+        return read_table(content, mimetype).to_pandas()
+
+    @staticmethod
+    async def data_cache_stats() -> dict:
+        __, content, __ = await AsyncRestClient._request('GET', 'data_cache_stats')
+
+        return json.loads(content)['DATA_CACHE_STATS']
+
+    @staticmethod
+    async def symbols() -> list:
+        __, content, __ = await AsyncRestClient._request('GET', 'symbols')
+
+        return json.loads(content)['SYMBOLS']
+
+    @staticmethod
+    async def save(symbol: str, dataframe: pd.DataFrame) -> str:
+        assert symbol
+        assert dataframe is not None
+
+        from api_rest.serialization import PARQUET_CONTENT_TYPE
+
+        params = {
+            'SYMBOL': symbol,
+            'FILE_EXTENSION': '.parquet'
+        }
+        __, content, __ = await AsyncRestClient._request(
+            'POST', 'save', params=params, data=memoryview(RestClient._parquet_buffer(dataframe)),
+            headers={'Content-Type': PARQUET_CONTENT_TYPE}
+        )
+
+        return content.decode('UTF-8')
+
+    @staticmethod
+    async def _post_table(endpoint: str, dataframe: pd.DataFrame, params: dict = None) -> pd.DataFrame:
+        import pyarrow as pa
+        from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, read_table, write_table
+
+        data = write_table(pa.Table.from_pandas(dataframe, preserve_index=False), ARROW_STREAM_CONTENT_TYPE)
+        status, content, mimetype = await AsyncRestClient._request(
+            'POST', endpoint, params=params, data=data, headers={'Content-Type': ARROW_STREAM_CONTENT_TYPE}
+        )
+        if status != 200:
+            raise ValueError(content.decode('UTF-8'))
+
+        return read_table(content, mimetype).to_pandas()
+
+    @staticmethod
+    def _float(content: bytes):
+        result = content.decode('UTF-8')
+        try:
+            return float(result)
+        except ValueError:
+            return result
+
+    @staticmethod
+    def _literal(content: bytes):
+        import ast
+
+        try:
+            return ast.literal_eval(content.decode('UTF-8'))
+        except ValueError:
+            return content
 
 
 print(f'***** Shell Trading API *****')
@@ -1,6 +1,13 @@
-from marshmallow import fields, Schema
+from marshmallow import fields, Schema, validate
 
 
 class DataRequestSchema(Schema):
 
     SYMBOL = fields.Str(required=True)
+    COLUMNS = fields.Str(required=False)
+    START_DATE = fields.Date(required=False)
+    END_DATE = fields.Date(required=False)
+    FILTERS = fields.Str(required=False)
+    AS_OF = fields.DateTime(required=False)
+    STREAM = fields.Bool(required=False)
+    BATCH_SIZE = fields.Int(required=False, validate=validate.Range(min=1))
@@ -1,4 +1,4 @@
-from marshmallow import fields, post_load, Schema
+from marshmallow import fields, post_load, Schema, validate
 from api_rest.request import Request
 from api_rest.request_type import RequestType
 
@@ -27,6 +27,16 @@ class OptionPriceRequestSchema(Schema):
         return OptionPriceRequest(**data)
 
 
+class OptionGreeksBatchRequestSchema(Schema):
+
+    SECOND_ORDER = fields.Bool(required=False)
+
+
+class ImpliedVolRequestSchema(Schema):
+
+    METHOD = fields.Str(required=False, validate=validate.OneOf(('newton', 'rational')))
+
+
 class CommodityOptionPriceRequest(Request):
 
     def __init__(self, *args, **kwargs):
@@ -66,3 +76,34 @@ class CommodityOptionPriceRequestSchema(Schema):
             raise ValueError(f'Unsupported contract {contract}, exchange_code {exchange_code}')
 
         return CommodityOptionPriceRequest(**data)
+
+
+class CommodityOptionScenariosRequestSchema(Schema):
+
+    FS_SHIFTS = fields.Str(required=False)
+    FS_SHIFT_TYPE = fields.Str(required=False, validate=validate.OneOf(('relative', 'absolute')))
+    VOL_SHIFTS = fields.Str(required=False)
+    VOL_TENOR_SHIFTS = fields.Str(required=False)
+    RATE_SHIFTS = fields.Str(required=False)
+    DAYS = fields.Str(required=False)
+
+
+class CommodityOptionPriceHistoryRequestSchema(Schema):
+
+    CONTRACT = fields.Str(required=True)
+    EXCHANGE_CODE = fields.Str(required=False)
+    MONTH = fields.Str(required=True)
+    YEAR = fields.Str(required=True)
+    OPTION_TYPE = fields.Str(required=True)
+    START_DATE = fields.Date(required=True)
+    END_DATE = fields.Date(required=True)
+    STRIKE = fields.Float(required=False)
+    QUANTITY = fields.Float(required=False)
+    SECOND_ORDER = fields.Bool(required=False)
+    EXTRAPOLATION = fields.Str(required=False, validate=validate.OneOf(('raise', 'flat')))
+
+
+class CommodityOptionPortfolioRequestSchema(Schema):
+
+    BY = fields.Str(required=False)
+    SECOND_ORDER = fields.Bool(required=False)
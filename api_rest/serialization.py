@@ -0,0 +1,71 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+ARROW_STREAM_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+ARROW_FILE_CONTENT_TYPE = 'application/vnd.apache.arrow.file'
+PARQUET_CONTENT_TYPE = 'application/vnd.apache.parquet'
+
+CONTENT_TYPES = (ARROW_STREAM_CONTENT_TYPE, PARQUET_CONTENT_TYPE, ARROW_FILE_CONTENT_TYPE)
+
+# content type of the stored files of each market data backend (by file extension), see market.datastore_adapter
+FILE_CONTENT_TYPES = {
+    '.parquet': PARQUET_CONTENT_TYPE,
+    '.arrow': ARROW_FILE_CONTENT_TYPE
+}
+
+
+def content_type(mimetype: str = None) -> str:
+    """
+    :param mimetype: Request/response mimetype, parquet is assumed when not set (or not a table content type)
+    :return: supported table content type
+    """
+    return mimetype if mimetype in CONTENT_TYPES else PARQUET_CONTENT_TYPE
+
+
+def read_table(data: bytes, mimetype: str = None) -> pa.Table:
+    if content_type(mimetype) == ARROW_STREAM_CONTENT_TYPE:
+        with pa.ipc.open_stream(pa.py_buffer(data)) as reader:
+            return reader.read_all()
+    if content_type(mimetype) == ARROW_FILE_CONTENT_TYPE:
+        return pa.ipc.open_file(pa.py_buffer(data)).read_all()
+
+    return pq.read_table(pa.BufferReader(data))
+
+
+def write_batches(reader: pa.RecordBatchReader):
+    """
+    Encodes the record batches of reader as an Arrow IPC stream, one chunk of bytes at a time (schema & first batch,
+    following batches, end of stream) i.e. for chunked (streamed) responses of arbitrarily large tables
+
+    :return: generator of bytes
+    """
+    import io
+
+    buffer = io.BytesIO()
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    with pa.ipc.new_stream(buffer, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield drain()
+    yield drain()
+
+
+def write_table(table: pa.Table, mimetype: str = None) -> bytes:
+    buffer_output_stream = pa.BufferOutputStream()
+    if content_type(mimetype) == ARROW_STREAM_CONTENT_TYPE:
+        with pa.ipc.new_stream(buffer_output_stream, table.schema) as writer:
+            writer.write_table(table)
+    elif content_type(mimetype) == ARROW_FILE_CONTENT_TYPE:
+        with pa.ipc.new_file(buffer_output_stream, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, buffer_output_stream, compression='snappy')
+
+    return buffer_output_stream.getvalue().to_pybytes()
@@ -1,8 +1,17 @@
+import json
 from api import LocalClient as c
 from api_rest.data import DataRequestSchema
 from api_rest.env import TweakEnvRequestSchema
 from api_rest.market import MarketDataSaveSchema
-from api_rest.options import CommodityOptionPriceRequestSchema, OptionPriceRequestSchema
+from api_rest.options import (
+    CommodityOptionPortfolioRequestSchema, CommodityOptionPriceHistoryRequestSchema, CommodityOptionPriceRequestSchema,
+    CommodityOptionScenariosRequestSchema, ImpliedVolRequestSchema, OptionGreeksBatchRequestSchema,
+    OptionPriceRequestSchema
+)
+from api_rest.serialization import (
+    ARROW_STREAM_CONTENT_TYPE, CONTENT_TYPES, FILE_CONTENT_TYPES, PARQUET_CONTENT_TYPE, content_type, read_table,
+    write_batches, write_table
+)
 from flask import Flask, jsonify, request, Response
 from http import HTTPStatus
 
@@ -49,7 +58,15 @@ def save():
         market_data_save_schema = MarketDataSaveSchema()
         market_upload_request = market_data_save_schema.load(request.args)
 
-        if request.files:
+        if request.mimetype == PARQUET_CONTENT_TYPE:
+
+            # streamed parquet body, written to disk in chunks & validated before being committed
+            return Response(
+                c.save(symbol=market_upload_request["SYMBOL"], dataframe=request.stream),
+                status=HTTPStatus.OK
+            )
+
+        elif request.files:
 
             file = request.files['file']
             c.save(symbol=market_upload_request["SYMBOL"], dataframe=file)
@@ -73,23 +90,60 @@ def save():
 @app.route('/data', methods=['GET'])
 def data():
 
-    import pyarrow as pa
-    import pyarrow.parquet as pq
+    from flask import send_file
+    from market.datastore_adapter import DataAPI
 
     try:
 
         data_request_schema = DataRequestSchema()
         data_request = data_request_schema.load(request.args)
 
-        dataframe = c.data(symbol=data_request['SYMBOL'])
-        table = pa.Table.from_pandas(dataframe, preserve_index=True)
-        buffer_output_stream = pa.BufferOutputStream()
-        pq.write_table(table, buffer_output_stream, compression='snappy')
+        selection = dict(
+            columns=data_request['COLUMNS'].split(',') if 'COLUMNS' in data_request else None,
+            start_date=data_request.get('START_DATE'),
+            end_date=data_request.get('END_DATE'),
+            filters=json.loads(data_request['FILTERS']) if 'FILTERS' in data_request else None
+        )
+
+        # content negotiated (Accept), parquet when not set: without a selection the stored file is sent as is if
+        # its format is accepted i.e. nothing is decoded, otherwise the selected Arrow table is encoded (no pandas)
+        if data_request.get('STREAM', False):
+            # chunked response, one Arrow IPC stream chunk per record batch read from the stored file
+            reader = DataAPI.query_batches(
+                symbol=data_request['SYMBOL'], as_of=data_request.get('AS_OF'),
+                batch_size=data_request.get('BATCH_SIZE'), **selection
+            )
+            return Response(write_batches(reader), HTTPStatus.OK, content_type=ARROW_STREAM_CONTENT_TYPE)
+
+        file_content_type = FILE_CONTENT_TYPES[DataAPI.backend().FILE_EXTENSION]
+        if all(value is None for value in selection.values()):
+            mimetype = request.accept_mimetypes.best_match(
+                (file_content_type,) + tuple(mimetype for mimetype in CONTENT_TYPES if mimetype != file_content_type)
+            )
+            if content_type(mimetype) == file_content_type:
+                data_file_path = DataAPI.resolve(symbol=data_request['SYMBOL'], as_of=data_request.get('AS_OF'))
+                return send_file(data_file_path, mimetype=file_content_type)
+        else:
+            mimetype = request.accept_mimetypes.best_match(CONTENT_TYPES)
+
+        table = DataAPI.query_table(symbol=data_request['SYMBOL'], as_of=data_request.get('AS_OF'), **selection)
+        data = write_table(table, mimetype)
 
     except Exception as e:
         return Response(str(e), status=HTTPStatus.BAD_REQUEST)
 
-    return Response(buffer_output_stream.getvalue().to_pybytes(), HTTPStatus.OK)
+    return Response(data, HTTPStatus.OK, content_type=content_type(mimetype))
+
+
+@app.route('/data_cache_stats', methods=['GET'])
+def data_cache_stats():
+
+    try:
+
+        return jsonify({'DATA_CACHE_STATS': c.data_cache_stats()})
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
 
 
 @app.route('/symbols', methods=['GET'])
@@ -149,6 +203,51 @@ def option_greeks():
     return Response(str(_option_greeks), status=HTTPStatus.OK)
 
 
+@app.route('/option_greeks_batch', methods=['POST'])
+def option_greeks_batch():
+
+    import pyarrow as pa
+    from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+
+    try:
+
+        option_greeks_batch_request = OptionGreeksBatchRequestSchema().load(request.args)
+
+        dataframe = read_table(request.get_data(), request.mimetype).to_pandas()
+        _option_greeks = c.option_greeks_batch(
+            *(dataframe[column].values for column in BlackScholesBatchPricer.COLUMNS),
+            second_order=option_greeks_batch_request.get('SECOND_ORDER', False)
+        )
+        data = write_table(pa.Table.from_pandas(_option_greeks), request.mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(request.mimetype))
+
+
+@app.route('/implied_vol', methods=['POST'])
+def implied_vol():
+
+    import pyarrow as pa
+
+    try:
+
+        implied_vol_request = ImpliedVolRequestSchema().load(request.args)
+
+        dataframe = read_table(request.get_data(), request.mimetype).to_pandas()
+        _implied_vol = c.implied_vol(
+            *(dataframe[column].values for column in ('OPTION_TYPE', 'X', 'FS', 'T', 'B', 'R', 'PRICE')),
+            method=implied_vol_request.get('METHOD', 'newton')
+        )
+        data = write_table(pa.table({'IMPLIED_VOL': _implied_vol}), request.mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(request.mimetype))
+
+
 @app.route('/commodity_option_price', methods=['GET'])
 def commodity_option_price():
 
@@ -175,6 +274,26 @@ def commodity_option_price():
     return Response(str(_option_price), status=HTTPStatus.OK)
 
 
+@app.route('/commodity_option_price_batch', methods=['POST'])
+def commodity_option_price_batch():
+
+    import pyarrow as pa
+
+    try:
+
+        dataframe = read_table(request.get_data(), request.mimetype).to_pandas()
+        _option_prices = c.commodity_option_price_batch(
+            **_commodity_option_batch_inputs(dataframe),
+            lot_price=dataframe['LOT_PRICE'].fillna(False).values.astype(bool) if 'LOT_PRICE' in dataframe else False
+        )
+        data = write_table(pa.table({'PRICE': _option_prices}), request.mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(request.mimetype))
+
+
 @app.route('/commodity_option_greeks', methods=['GET'])
 def commodity_option_greeks():
 
@@ -200,5 +319,128 @@ def commodity_option_greeks():
     return Response(str(_option_greeks), status=HTTPStatus.OK)
 
 
+@app.route('/commodity_option_greeks_batch', methods=['POST'])
+def commodity_option_greeks_batch():
+
+    import pyarrow as pa
+
+    try:
+
+        option_greeks_batch_request = OptionGreeksBatchRequestSchema().load(request.args)
+
+        dataframe = read_table(request.get_data(), request.mimetype).to_pandas()
+        _option_greeks = c.commodity_option_greeks_batch(
+            **_commodity_option_batch_inputs(dataframe),
+            second_order=option_greeks_batch_request.get('SECOND_ORDER', False)
+        )
+        data = write_table(pa.Table.from_pandas(_option_greeks), request.mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(request.mimetype))
+
+
+@app.route('/commodity_option_portfolio', methods=['POST'])
+def commodity_option_portfolio():
+
+    import pyarrow as pa
+
+    try:
+
+        portfolio_request = CommodityOptionPortfolioRequestSchema().load(request.args)
+
+        positions = read_table(request.get_data(), request.mimetype).to_pandas()
+        aggregate = c.commodity_option_portfolio(
+            positions=positions,
+            by=portfolio_request['BY'].split(',') if 'BY' in portfolio_request
+            else ('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION'),
+            second_order=portfolio_request.get('SECOND_ORDER', False)
+        )
+        data = write_table(pa.Table.from_pandas(aggregate, preserve_index=False), request.mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(request.mimetype))
+
+
+@app.route('/commodity_option_scenarios', methods=['POST'])
+def commodity_option_scenarios():
+
+    import pyarrow as pa
+
+    try:
+
+        scenarios_request = CommodityOptionScenariosRequestSchema().load(request.args)
+
+        positions = read_table(request.get_data(), request.mimetype).to_pandas()
+        ladder = c.commodity_option_scenarios(
+            positions=positions,
+            fs_shifts=json.loads(scenarios_request.get('FS_SHIFTS', '[0]')),
+            fs_shift_type=scenarios_request.get('FS_SHIFT_TYPE', 'relative'),
+            vol_shifts=json.loads(scenarios_request.get('VOL_SHIFTS', '[0]')),
+            vol_tenor_shifts=json.loads(scenarios_request.get('VOL_TENOR_SHIFTS', '{}')),
+            rate_shifts=json.loads(scenarios_request.get('RATE_SHIFTS', '[0]')),
+            days=json.loads(scenarios_request.get('DAYS', '[0]'))
+        )
+        data = write_table(pa.Table.from_pandas(ladder, preserve_index=False), request.mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(request.mimetype))
+
+
+@app.route('/commodity_option_price_history', methods=['GET'])
+def commodity_option_price_history():
+
+    import pyarrow as pa
+
+    mimetype = request.accept_mimetypes.best_match(CONTENT_TYPES)
+
+    try:
+
+        history_request = CommodityOptionPriceHistoryRequestSchema().load(request.args)
+
+        history = c.commodity_option_price_history(
+            contract=history_request['CONTRACT'],
+            exchange_code=history_request.get('EXCHANGE_CODE'),
+            month=history_request['MONTH'],
+            year=history_request['YEAR'],
+            option_type=history_request['OPTION_TYPE'],
+            start_date=history_request['START_DATE'],
+            end_date=history_request['END_DATE'],
+            strike=history_request.get('STRIKE'),
+            quantity=history_request.get('QUANTITY', 1.),
+            second_order=history_request.get('SECOND_ORDER', False),
+            extrapolation=history_request.get('EXTRAPOLATION', 'raise')
+        )
+        data = write_table(pa.Table.from_pandas(history, preserve_index=True), mimetype)
+
+    except Exception as e:
+        return Response(str(e), status=HTTPStatus.BAD_REQUEST)
+
+    return Response(data, HTTPStatus.OK, content_type=content_type(mimetype))
+
+
+def _commodity_option_batch_inputs(dataframe) -> dict:
+    from analytics.exceptions import BlackScholesInputError
+    from analytics.options.black_scholes_batch import Black76CommodityBatchPricer
+
+    missing = [column for column in Black76CommodityBatchPricer.COLUMNS if column not in dataframe.columns]
+    if missing:
+        raise BlackScholesInputError(f'Missing input columns {missing}')
+
+    return {
+        'contract': dataframe['CONTRACT'].values,
+        'exchange_code': dataframe['EXCHANGE_CODE'].values if 'EXCHANGE_CODE' in dataframe else None,
+        'month': dataframe['MONTH'].values,
+        'year': dataframe['YEAR'].values,
+        'option_type': dataframe['OPTION_TYPE'].values,
+        'strike': dataframe['STRIKE'].values.astype(float) if 'STRIKE' in dataframe else None
+    }
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,9 @@
+"""
+Benchmark suite of the pricing, data access & REST hot paths, results are written to a JSON file that can be diffed
+across releases to catch performance regressions
+
+python -m benchmarks.run --output benchmarks.json [--filter pricing] [--repeat 7]
+python -m benchmarks.compare baseline.json benchmarks.json [--threshold 1.25]
+
+Benchmarks are registered with the benchmarks.harness.benchmark decorator in the benchmarks.bench_* modules
+"""
@@ -0,0 +1,40 @@
+import numpy as np
+from benchmarks.harness import benchmark
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def quotes() -> dict:
+    """
+    Settlement quotes of 60 expiries x 81 strikes (calls & puts) priced off random 6th order polynomial smiles
+    """
+    from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+
+    rng = np.random.default_rng(11)
+    expiries, strikes = 60, 81
+    atm = rng.uniform(0.3, 0.6, expiries)
+    betas = rng.uniform([-0.3, 0.2, -0.3, -0.3, -0.3, -0.3], [0., 0.5, 0.3, 0.3, 0.3, 0.3], (expiries, 6))
+    moneyness = np.tile(np.linspace(-0.6, 0.6, strikes), 2 * expiries)
+    option_type = np.tile(np.repeat(['c', 'p'], strikes), expiries)
+    fs = np.repeat(rng.uniform(50., 100., expiries), 2 * strikes)
+    x = fs * np.exp(moneyness)
+    t = np.repeat(np.linspace(0.1, 5., expiries), 2 * strikes)
+    v = np.repeat(atm, 2 * strikes) + sum(
+        np.repeat(betas[:, i], 2 * strikes) * moneyness ** (i + 1) for i in range(6)
+    )
+    price = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t, b=0., r=0.03, v=v).price()
+
+    return dict(
+        expiration=np.repeat([f'E{i:02}' for i in range(expiries)], 2 * strikes), option_type=option_type, x=x,
+        price=price, fs=fs, t=t, r=0.03, days_to_expiry=t * 365.25
+    )
+
+
+@benchmark(warmup=quotes)
+def calibrate_smiles():
+    """
+    Fit of all 60 smiles from 9720 quotes in one vectorised pass
+    """
+    from analytics.options.calibration import calibrate_smiles
+
+    calibrate_smiles(**quotes())
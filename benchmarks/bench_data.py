@@ -0,0 +1,27 @@
+from benchmarks.harness import benchmark
+from market.datastore_adapter import DataAPI
+
+
+# small (option expiry calendar), medium (IVM time series of an expiry) & large (yield curve history) symbols
+SYMBOLS = {
+    'small': 'CALENDAR_OPTION_BRENT',
+    'medium': 'BRENT_ICE_B_B_F2025_IVM',
+    'large': 'RIFLGFC'
+}
+
+
+def _register(size: str, symbol: str) -> None:
+    def query():
+        DataAPI.query(symbol=symbol)
+
+    def query_date():
+        DataAPI.query(symbol=symbol, start_date='2022-12-09', end_date='2022-12-09')
+
+    benchmark(name=f'data.query_{size}_cold', setup=DataAPI.cache.clear)(query)
+    benchmark(name=f'data.query_{size}_warm', warmup=query)(query)
+    if size != 'small':
+        benchmark(name=f'data.query_{size}_date_cold', setup=DataAPI.cache.clear)(query_date)
+
+
+for _size, _symbol in SYMBOLS.items():
+    _register(_size, _symbol)
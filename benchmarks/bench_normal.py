@@ -0,0 +1,37 @@
+import numpy as np
+from analytics import normal
+from benchmarks.harness import benchmark
+from scipy.stats import norm
+
+
+X_ARRAY = np.linspace(-5., 5., 10000)
+
+
+@benchmark()
+def scalar_cdf():
+    normal.cdf(0.3)
+
+
+@benchmark()
+def scalar_cdf_scipy():
+    norm.cdf(0.3)
+
+
+@benchmark()
+def scalar_pdf():
+    normal.pdf(0.3)
+
+
+@benchmark()
+def scalar_pdf_scipy():
+    norm.pdf(0.3)
+
+
+@benchmark()
+def array_cdf():
+    normal.cdf_array(X_ARRAY)
+
+
+@benchmark()
+def array_cdf_scipy():
+    norm.cdf(X_ARRAY)
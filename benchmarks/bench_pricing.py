@@ -0,0 +1,55 @@
+import datetime as dt
+import env
+from benchmarks.harness import benchmark
+
+
+def clear_caches() -> None:
+    from analytics import cache
+    from analytics.options.reference_data import option_expiry_calendar
+    from market.datastore_adapter import DataAPI
+
+    cache.clear()
+    option_expiry_calendar.cache_clear()
+    DataAPI.cache.clear()
+
+
+def black_76_pricer():
+    from analytics.options.black_scholes import Black76CommodityOptionPricer
+
+    return Black76CommodityOptionPricer(
+        contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C', strike=80.
+    )
+
+
+@benchmark()
+def scalar_price():
+    from analytics.options.black_scholes import BlackScholesOptionPricer
+
+    BlackScholesOptionPricer(option_type='c', x=19., fs=19., t=0.75, b=0., r=0.1, v=0.28).price()
+
+
+@benchmark()
+def scalar_greeks():
+    from analytics.options.black_scholes import BlackScholesOptionPricer
+
+    BlackScholesOptionPricer(option_type='c', x=19., fs=19., t=0.75, b=0., r=0.1, v=0.28).greeks()
+
+
+@benchmark(setup=clear_caches)
+def black_76_cold():
+    """
+    Market data read from disk, no analytics or data cache hits
+    """
+    black_76_pricer().price()
+
+
+@benchmark(warmup=black_76_pricer)
+def black_76_warm():
+    black_76_pricer().price()
+
+
+@benchmark(warmup=black_76_pricer)
+def interpolate_rate():
+    from analytics.curves.yield_curve import interpolate_rate
+
+    interpolate_rate(trade_date=env.TRADE_DATE, expiry_date=dt.date(2025, 11, 26))
@@ -0,0 +1,41 @@
+from benchmarks.harness import benchmark
+
+
+def test_client():
+    from app import app
+
+    return app.test_client()
+
+
+client = test_client()
+
+
+def get(url: str, headers: dict = None) -> None:
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.data
+
+
+def commodity_option_price():
+    get('/commodity_option_price?CONTRACT=BRENT&MONTH=JAN&YEAR=2025&OPTION_TYPE=C&STRIKE=80')
+
+
+@benchmark(warmup=commodity_option_price)
+def commodity_option_price_warm():
+    commodity_option_price()
+
+
+@benchmark()
+def data_small():
+    get('/data?SYMBOL=CALENDAR_OPTION_BRENT')
+
+
+@benchmark()
+def data_large():
+    get('/data?SYMBOL=RIFLGFC')
+
+
+@benchmark()
+def data_large_selection():
+    from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE
+
+    get('/data?SYMBOL=RIFLGFC&START_DATE=2022-01-01', headers={'Accept': ARROW_STREAM_CONTENT_TYPE})
@@ -0,0 +1,30 @@
+import argparse
+import json
+import sys
+from benchmarks.harness import compare
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description='Compare benchmark results against a baseline')
+    parser.add_argument('baseline', help='baseline results JSON file path')
+    parser.add_argument('results', help='results JSON file path')
+    parser.add_argument('--threshold', type=float, default=1.25, help='median time ratio flagged as a regression')
+    args = parser.parse_args(args)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.results) as file:
+        results = json.load(file)
+
+    rows = compare(baseline=baseline, results=results, threshold=args.threshold)
+    print(f'{"benchmark":<50} {"baseline (us)":>14} {"results (us)":>14} {"ratio":>8}')
+    for name, baseline_median, median, ratio, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f'{name:<50} {baseline_median * 1e6:>14.2f} {median * 1e6:>14.2f} {ratio:>8.2f}{flag}')
+
+    # non zero exit code on regressions e.g. to fail a CI step
+    return int(any(regressed for *__, regressed in rows))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import datetime as dt
+import fnmatch
+import platform
+import statistics
+import subprocess
+import time
+
+
+class Benchmark:
+
+    """
+    A timed callable, setup (untimed) is called once before each sample e.g. to clear caches for cold timings,
+    warmup (untimed) is called once before all samples
+    """
+
+    __slots__ = ('name', 'function', 'setup', 'warmup', 'number')
+
+    def __init__(self, name: str, function, setup=None, warmup=None, number: int = None):
+        assert name
+        assert function
+
+        self.name = name
+        self.function = function
+        self.setup = setup
+        self.warmup = warmup
+        self.number = number
+
+    def calls_per_sample(self, min_time: float) -> int:
+        """
+        :return: number of calls per sample, one when setup is set otherwise enough calls to last min_time seconds
+        """
+        if self.number:
+            return self.number
+        if self.setup:
+            return 1
+
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for __ in range(number):
+                self.function()
+            if time.perf_counter() - start >= min_time or number >= 10 ** 6:
+                return number
+            number *= 10
+
+    def measure(self, repeat: int = 7, min_time: float = 0.05) -> dict:
+        """
+        :return: dict of per call timings (seconds) i.e. min, median, mean, stdev over repeat samples
+        """
+        assert repeat > 0
+
+        if self.warmup:
+            self.warmup()
+        number = self.calls_per_sample(min_time)
+
+        samples = []
+        for __ in range(repeat):
+            if self.setup:
+                self.setup()
+            start = time.perf_counter()
+            for __ in range(number):
+                self.function()
+            samples.append((time.perf_counter() - start) / number)
+
+        return {
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+            'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.,
+            'number': number,
+            'repeat': repeat
+        }
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str = None, setup=None, warmup=None, number: int = None):
+    """
+    Decorator registering a benchmark, names are {module group}.{function name} by default e.g. pricing.scalar_price
+    """
+    def decorator(function):
+        group = function.__module__.split('.')[-1].replace('bench_', '')
+        _name = name or f'{group}.{function.__name__}'
+        assert _name not in BENCHMARKS
+
+        BENCHMARKS[_name] = Benchmark(name=_name, function=function, setup=setup, warmup=warmup, number=number)
+
+        return function
+
+    return decorator
+
+
+def metadata() -> dict:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': dt.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__
+    }
+
+
+def run(pattern: str = '*', repeat: int = 7, min_time: float = 0.05, verbose: bool = True) -> dict:
+    """
+    :param pattern: fnmatch pattern of the benchmark names to run
+    :return: results dict i.e. {'metadata': {...}, 'benchmarks': {name: timings}}
+    """
+    results = {}
+    for name in sorted(BENCHMARKS):
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+
+        results[name] = BENCHMARKS[name].measure(repeat=repeat, min_time=min_time)
+        if verbose:
+            print(f'{name:<50} {results[name]["median"] * 1e6:>14.2f} us')
+
+    return {'metadata': metadata(), 'benchmarks': results}
+
+
+def compare(baseline: dict, results: dict, threshold: float = 1.25) -> list:
+    """
+    :param threshold: median time ratio (results / baseline) above which a benchmark has regressed
+    :return: list of (name, baseline median, median, ratio, regressed) of the benchmarks of both results
+    """
+    assert threshold > 0
+
+    rows = []
+    for name, timings in sorted(results['benchmarks'].items()):
+        baseline_timings = baseline['benchmarks'].get(name)
+        if baseline_timings is None:
+            continue
+
+        ratio = timings['median'] / baseline_timings['median']
+        rows.append((name, baseline_timings['median'], timings['median'], ratio, ratio > threshold))
+
+    return rows
@@ -0,0 +1,33 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+from benchmarks.harness import run
+
+
+def load_benchmarks() -> None:
+    directory = os.path.dirname(os.path.realpath(__file__))
+    for file_path in sorted(glob.glob(os.path.join(directory, 'bench_*.py'))):
+        importlib.import_module(f'benchmarks.{os.path.basename(file_path)[:-3]}')
+
+
+def main(args=None) -> dict:
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--output', default='benchmarks.json', help='results JSON file path')
+    parser.add_argument('--filter', default='*', help='fnmatch pattern of the benchmark names e.g. "pricing.*"')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum duration of a sample (seconds)')
+    args = parser.parse_args(args)
+
+    load_benchmarks()
+    results = run(pattern=args.filter, repeat=args.repeat, min_time=args.min_time)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f'Results saved to {args.output}')
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,14 @@ TRADE_DATE = dt.date(day=9, month=12, year=2022)
 MARKET_DATE = dt.date(day=9, month=12, year=2022)
 ROOT_PATH = os.path.sep.join(os.path.realpath(__file__).split(os.path.sep)[:-1])
 MARKET_DATA_PATH = os.path.sep.join((ROOT_PATH, 'data'))
+MARKET_DATA_BACKEND = 'parquet'  # 'parquet' or 'arrow' (memory mapped Arrow IPC), see market.datastore_adapter
 REST_API_URL = 'http://127.0.0.1:5000'
+REST_POOL_MAXSIZE = 16  # keep-alive connections per host, shared by all RestClient threads
+REST_CONNECT_TIMEOUT = 3.05
+REST_READ_TIMEOUT = 60.
+REST_RETRIES = 3  # idempotent (GET) requests only
+REST_RETRY_BACKOFF = 0.2  # seconds, doubled on each retry
+DATA_CACHE_MAX_BYTES = 512 * 1024 ** 2
 
 
 def env_variables() -> dict:
@@ -16,10 +23,27 @@ def env_variables() -> dict:
         'MARKET_DATE': MARKET_DATE,
         'ROOT_PATH': ROOT_PATH,
         'MARKET_DATA_PATH': MARKET_DATA_PATH,
-        'REST_API_URL': REST_API_URL
+        'MARKET_DATA_BACKEND': MARKET_DATA_BACKEND,
+        'REST_API_URL': REST_API_URL,
+        'REST_POOL_MAXSIZE': REST_POOL_MAXSIZE,
+        'REST_CONNECT_TIMEOUT': REST_CONNECT_TIMEOUT,
+        'REST_READ_TIMEOUT': REST_READ_TIMEOUT,
+        'REST_RETRIES': REST_RETRIES,
+        'REST_RETRY_BACKOFF': REST_RETRY_BACKOFF,
+        'DATA_CACHE_MAX_BYTES': DATA_CACHE_MAX_BYTES
     }
 
 
+tweak_listeners = []
+
+
+def on_tweak(listener) -> None:
+    """
+    Register a callable(key, old value, new value) invoked after each tweak_env(), used to manage analytics caches
+    """
+    tweak_listeners.append(listener)
+
+
 def tweak_env(key: str, value: object) -> None:
     assert key
 
@@ -27,10 +51,14 @@ def tweak_env(key: str, value: object) -> None:
 
         global TRADE_DATE
 
+        old_value = TRADE_DATE
         try:
             import pandas as pd
             TRADE_DATE = pd.to_datetime(value).date()
         except:
             raise ValueError(f'Unsupported value {value} for TRADE_DATE tweak')
+
+        for listener in tweak_listeners:
+            listener('TRADE_DATE', old_value, TRADE_DATE)
     else:
         raise ValueError(f'Unsupported env tweak for key {key}')
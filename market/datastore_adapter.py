@@ -1,31 +1,815 @@
+import contextlib
 import env
 import os
+import time
 import pandas as pd
+import pyarrow as pa
+from abc import ABC, abstractmethod
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        import fcntl
+
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        import msvcrt
+
+        try:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+    except OSError:
+        return False
+
+    return True
+
+
+def _unlock(lock_file) -> None:
+    try:
+        import fcntl
+
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    except ImportError:
+        import msvcrt
+
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def _file_lock(lock_file_path: str, timeout: float):
+    """
+    Cross process lock, an OS lock (flock, msvcrt.locking on Windows) on the lock file. The OS releases it when the
+    holding process dies, so a crashed writer never leaves a stale lock. The lock file itself is never removed.
+    """
+    deadline = time.monotonic() + timeout
+    with open(lock_file_path, 'a+b') as lock_file:
+        # msvcrt locks the byte range from the current position
+        lock_file.seek(0)
+        while not _try_lock(lock_file):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Timed out waiting for lock {lock_file_path}')
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            _unlock(lock_file)
+
+
+def _conjunction(conditions: list):
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    return expression
+
+
+class DataCache:
+
+    """
+    Bounded, byte size aware LRU cache of DataAPI query results
+
+    Entries are keyed by (symbol, file path, file version, *query arguments), so a re-saved file is never served
+    stale, and are evicted least recently used first once the total (deep) DataFrame memory exceeds max_bytes
+    """
+
+    __slots__ = ('max_bytes', 'entries', 'size_bytes', 'hits', 'misses', 'evictions', 'lock')
+
+    def __init__(self, max_bytes: int):
+        import threading
+        from collections import OrderedDict
+
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def get(self, key: tuple):
+        with self.lock:
+            try:
+                dataframe, __ = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return dataframe
+
+    def put(self, key: tuple, dataframe: pd.DataFrame) -> None:
+        size_bytes = int(dataframe.memory_usage(index=True, deep=True).sum())
+        if size_bytes > self.max_bytes:
+            return
+
+        with self.lock:
+            # older versions of the same file can never be hit again
+            for stale_key in [k for k in self.entries if k[:2] == key[:2] and k[2] != key[2]]:
+                self._remove(stale_key)
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = (dataframe, size_bytes)
+            self.size_bytes += size_bytes
+
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, symbol: str) -> None:
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == symbol]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'HITS': self.hits,
+                'MISSES': self.misses,
+                'EVICTIONS': self.evictions,
+                'ENTRIES': len(self.entries),
+                'SIZE_BYTES': self.size_bytes,
+                'MAX_BYTES': self.max_bytes
+            }
+
+    def _remove(self, key: tuple) -> None:
+        __, size_bytes = self.entries.pop(key)
+        self.size_bytes -= size_bytes
+
+
+class StorageBackend(ABC):
+
+    """
+    File format used by DataAPI to store a symbol's table, selected via env.MARKET_DATA_BACKEND
+    """
+
+    FILE_EXTENSION = None
+    DATASET_FORMAT = None
+
+    @abstractmethod
+    def schema(self, data_file_path: str) -> pa.Schema:
+        pass
+
+    def batches(
+            self, data_file_path: str, columns: list = None, expression=None, batch_size: int = None
+    ) -> pa.RecordBatchReader:
+        """
+        :param batch_size: Optional, maximum rows per record batch, defaults to the pyarrow dataset scanner default
+        :return: reader of the (selected) table's record batches, read lazily i.e. in constant memory
+        """
+        import pyarrow.dataset as ds
+
+        kwargs = {} if batch_size is None else {'batch_size': batch_size}
+        scanner = ds.dataset(data_file_path, format=self.DATASET_FORMAT).scanner(
+            columns=columns, filter=expression, **kwargs
+        )
+
+        return scanner.to_reader()
+
+    @abstractmethod
+    def read(self, data_file_path: str, columns: list = None, expression=None) -> pa.Table:
+        pass
+
+    @abstractmethod
+    def write(self, data_file_path: str, table: pa.Table) -> None:
+        pass
+
+
+class ParquetStorageBackend(StorageBackend):
+
+    FILE_EXTENSION = '.parquet'
+    DATASET_FORMAT = 'parquet'
+
+    def schema(self, data_file_path: str) -> pa.Schema:
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(data_file_path)
+
+    def read(self, data_file_path: str, columns: list = None, expression=None) -> pa.Table:
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        if columns is None and expression is None:
+            return pq.read_table(data_file_path)
+
+        return ds.dataset(data_file_path, format='parquet').to_table(columns=columns, filter=expression)
+
+    def write(self, data_file_path: str, table: pa.Table) -> None:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, data_file_path)
+
+
+class ArrowIPCStorageBackend(StorageBackend):
+
+    """
+    Arrow IPC (Feather v2) files, read via memory map so tables are zero copy views of the OS page cache, which is
+    shared by all server worker processes reading the same symbol
+
+    Files are replaced atomically (write to a temporary file then rename) as readers may still map the old file
+    """
+
+    FILE_EXTENSION = '.arrow'
+    DATASET_FORMAT = 'ipc'
+
+    def schema(self, data_file_path: str) -> pa.Schema:
+        with pa.memory_map(data_file_path, 'r') as source:
+            return pa.ipc.open_file(source).schema
+
+    def read(self, data_file_path: str, columns: list = None, expression=None) -> pa.Table:
+        table = pa.ipc.open_file(pa.memory_map(data_file_path, 'r')).read_all()
+
+        if expression is not None:
+            table = table.filter(expression)
+        if columns is not None:
+            table = table.select(columns)
+
+        return table
+
+    def write(self, data_file_path: str, table: pa.Table) -> None:
+        temp_file_path = f'{data_file_path}.{os.getpid()}.tmp'
+        try:
+            with pa.OSFile(temp_file_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temp_file_path, data_file_path)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+
+STORAGE_BACKENDS = {
+    'parquet': ParquetStorageBackend(),
+    'arrow': ArrowIPCStorageBackend()
+}
+
+
+class VersionManifest:
+
+    """
+    Append only, point in time (bitemporal) version history of a symbol
+
+    Every persist() writes an immutable version file to {MARKET_DATA_PATH}/_versions/{symbol}/ named by its knowledge
+    time (ns since epoch, UTC) and appends it to manifest.json, then replaces the symbol's head file (the latest
+    version, read when no as_of is given) with a copy of it. Heads are only ever replaced by rename and never share
+    an inode with a version file, so writing to a head in place can not rewrite history. Commits are serialised per
+    symbol via an OS file lock, so concurrent writers never lose a version. Reads as_of a knowledge time bisect the
+    (cached) manifest i.e. O(log n).
+
+    Data saved before versioning existed is treated as known since the epoch.
+    """
+
+    __slots__ = ('symbol', 'path')
+
+    DIRECTORY = '_versions'
+    MANIFEST = 'manifest.json'
+    LOCK_TIMEOUT = 10.
+
+    manifests = {}
+
+    def __init__(self, symbol: str, market_data_path: str = None):
+        assert symbol
+
+        self.symbol = symbol
+        self.path = os.path.sep.join((market_data_path or env.MARKET_DATA_PATH, self.DIRECTORY, symbol))
+
+    @staticmethod
+    def knowledge_time(as_of) -> int:
+        """
+        :param as_of: datetime/date/str/pd.Timestamp, timezone naive values are taken as UTC
+        :return: knowledge time in ns since epoch
+        """
+        timestamp = pd.Timestamp(as_of)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+
+        return timestamp.value
+
+    def entries(self) -> tuple:
+        """
+        :return: (knowledge times, version file names), sorted by knowledge time
+        """
+        import json
+
+        manifest_path = os.path.sep.join((self.path, self.MANIFEST))
+        try:
+            manifest_stat = os.stat(manifest_path)
+        except FileNotFoundError:
+            return (), ()
+
+        manifest_version = (manifest_stat.st_mtime_ns, manifest_stat.st_size)
+        cached = self.manifests.get(manifest_path)
+        if cached is None or cached[0] != manifest_version:
+            with open(manifest_path) as manifest_file:
+                versions = json.load(manifest_file)['VERSIONS']
+            cached = (
+                manifest_version, tuple(version[0] for version in versions), tuple(version[1] for version in versions)
+            )
+            self.manifests[manifest_path] = cached
+
+        return cached[1:]
+
+    def versions(self) -> pd.DataFrame:
+        knowledge_times, file_names = self.entries()
+
+        return pd.DataFrame({
+            'KNOWLEDGE_TIME': pd.to_datetime(list(knowledge_times), unit='ns'),
+            'FILE': [os.path.sep.join((self.path, file_name)) for file_name in file_names]
+        })
+
+    def resolve(self, as_of, head_file_path: str) -> str:
+        """
+        :return: path of the version file known as of the given knowledge time
+        """
+        import bisect
+
+        knowledge_times, file_names = self.entries()
+        if not knowledge_times:
+            if os.path.exists(head_file_path):
+                return head_file_path
+            raise FileNotFoundError(f'Missing market data for symbol {self.symbol}')
+
+        i = bisect.bisect_right(knowledge_times, self.knowledge_time(as_of)) - 1
+        if i < 0:
+            raise FileNotFoundError(f'No version of symbol {self.symbol} known as of {as_of}')
+
+        return os.path.sep.join((self.path, file_names[i]))
+
+    def temp_file_path(self, file_extension: str) -> str:
+        import uuid
+
+        os.makedirs(self.path, exist_ok=True)
+
+        return os.path.sep.join((self.path, f'.{uuid.uuid4().hex}{file_extension}.tmp'))
+
+    def commit(self, temp_file_path: str, head_file_path: str) -> int:
+        """
+        Publish a fully written temporary version file as the latest version & head
+
+        :return: knowledge time (ns since epoch) of the new version
+        """
+        import json
+
+        file_extension = os.path.splitext(head_file_path)[1]
+
+        with self._lock():
+            knowledge_times, file_names = self.entries()
+            knowledge_times, file_names = list(knowledge_times), list(file_names)
+
+            if not knowledge_times and os.path.exists(head_file_path):
+                # archive pre versioning data as known since the epoch
+                file_name = f'{0:020d}{file_extension}'
+                self._copy(head_file_path, os.path.sep.join((self.path, file_name)))
+                knowledge_times.append(0)
+                file_names.append(file_name)
+
+            knowledge_time = max(time.time_ns(), knowledge_times[-1] + 1 if knowledge_times else 0)
+            file_name = f'{knowledge_time:020d}{file_extension}'
+            os.replace(temp_file_path, os.path.sep.join((self.path, file_name)))
+            knowledge_times.append(knowledge_time)
+            file_names.append(file_name)
+
+            manifest_path = os.path.sep.join((self.path, self.MANIFEST))
+            with open(f'{manifest_path}.tmp', 'w') as manifest_file:
+                json.dump({'VERSIONS': [list(version) for version in zip(knowledge_times, file_names)]}, manifest_file)
+            os.replace(f'{manifest_path}.tmp', manifest_path)
+
+            head_temp_file_path = f'{head_file_path}.{os.getpid()}.tmp'
+            self._copy(os.path.sep.join((self.path, file_name)), head_temp_file_path)
+            os.replace(head_temp_file_path, head_file_path)
+
+        return knowledge_time
+
+    @staticmethod
+    def _copy(source: str, destination: str) -> None:
+        import shutil
+
+        # never hard link, an in place write to one path would silently change the other
+        shutil.copyfile(source, destination)
+
+    def _lock(self):
+        return _file_lock(lock_file_path=os.path.sep.join((self.path, '.lock')), timeout=self.LOCK_TIMEOUT)
 
 
 class DataAPI:
 
+    cache = DataCache(max_bytes=env.DATA_CACHE_MAX_BYTES)
+    persist_listeners = []
+
+    UPLOAD_CHUNK_SIZE = 1024 ** 2
+
+    @staticmethod
+    def on_persist(listener) -> None:
+        """
+        Register a callable(symbol) invoked after each persist(), used to invalidate analytics caches
+        """
+        DataAPI.persist_listeners.append(listener)
+
+    @staticmethod
+    def backend() -> StorageBackend:
+        try:
+            return STORAGE_BACKENDS[env.MARKET_DATA_BACKEND]
+        except KeyError:
+            raise ValueError(f'Unsupported market data backend {env.MARKET_DATA_BACKEND}')
+
+    @staticmethod
+    def data_file_path(symbol: str) -> str:
+        assert symbol
+
+        return os.path.sep.join((env.MARKET_DATA_PATH, f'{symbol}{DataAPI.backend().FILE_EXTENSION}'))
+
     @staticmethod
     def persist(symbol: str, dataframe: pd.DataFrame) -> str:
+        """
+        :param dataframe: pandas DataFrame or a readable binary stream of parquet bytes (e.g. werkzeug FileStorage or
+                          a request body), streams are written to disk in chunks & validated before being committed
+        """
         assert symbol
         assert dataframe is not None
 
-        from werkzeug.datastructures import FileStorage
+        backend = DataAPI.backend()
+        version_manifest = VersionManifest(symbol=symbol)
+        temp_file_path = version_manifest.temp_file_path(file_extension=backend.FILE_EXTENSION)
+        try:
+            if isinstance(dataframe, pd.DataFrame):
+                backend.write(temp_file_path, pa.Table.from_pandas(dataframe))
+            elif hasattr(dataframe, 'read'):
+                DataAPI._write_upload(symbol=symbol, stream=dataframe, temp_file_path=temp_file_path)
+            else:
+                raise ValueError(f'Unsupported object type {type(dataframe)}')
 
-        data_file_path = os.path.sep.join((env.MARKET_DATA_PATH, f'{symbol}.parquet'))
-        if isinstance(dataframe, pd.DataFrame):
-            dataframe.to_parquet(path=data_file_path)
-        elif isinstance(dataframe, FileStorage):
-            dataframe.save(data_file_path)
-        else:
-            raise ValueError(f'Unsupported object type {type(dataframe)}')
+            version_manifest.commit(temp_file_path=temp_file_path, head_file_path=DataAPI.data_file_path(symbol))
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+        if symbol.endswith(ImpliedVolModelStore.SYMBOL_SUFFIX) and ImpliedVolModelStore.exists():
+            ImpliedVolModelStore.migrate(symbols=[symbol])
+
+        DataAPI.cache.invalidate(symbol)
+        for listener in DataAPI.persist_listeners:
+            listener(symbol)
 
         return f'Market data save successful for symbol {symbol}'
 
     @staticmethod
-    def query(symbol: str) -> pd.DataFrame:
+    def symbols() -> list:
+        import glob
+
+        return [
+            file_path.split(os.path.sep)[-1].split('.')[0]
+            for file_path in glob.glob(os.path.sep.join((env.MARKET_DATA_PATH, '*.*')))
+            if file_path.endswith(DataAPI.backend().FILE_EXTENSION)
+        ]
+
+    @staticmethod
+    def versions(symbol: str) -> pd.DataFrame:
+        """
+        :return: DataFrame of the symbol's versions (KNOWLEDGE_TIME, FILE)
+        """
+        return VersionManifest(symbol=symbol).versions()
+
+    @staticmethod
+    def query(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters=None, as_of=None
+    ) -> pd.DataFrame:
+        """
+        Query a symbol, optional column/row selections are pushed down to the storage backend reader so only the
+        requested columns & row groups are decoded
+
+        :param symbol: Data symbol
+        :param columns: Optional, columns to read (the index is always read)
+        :param start_date: Optional, inclusive start date filter on a date/time index
+        :param end_date: Optional, inclusive end date filter on a date/time index
+        :param filters: Optional, row filters as a pyarrow.dataset.Expression or DNF list of
+                        (column, op, value) tuples e.g. [('AtM', '>', 0.3)], see pyarrow.parquet.filters_to_expression
+        :param as_of: Optional, knowledge time (UTC) i.e. return the data as it was known at that time
+        :return: pandas DataFrame, served from DataAPI.cache while the stored file is unchanged
+        """
         assert symbol
 
-        data_file_path = os.path.sep.join((env.MARKET_DATA_PATH, f'{symbol}.parquet'))
+        data_file_path = DataAPI.resolve(symbol=symbol, as_of=as_of)
+        file_stat = os.stat(data_file_path)
+        key = (
+            symbol,
+            data_file_path,
+            (file_stat.st_mtime_ns, file_stat.st_size),
+            tuple(columns) if columns is not None else None,
+            start_date,
+            end_date,
+            str(filters) if filters is not None else None
+        )
+
+        dataframe = DataAPI.cache.get(key)
+        if dataframe is None:
+            dataframe = DataAPI._read(
+                data_file_path=data_file_path, columns=columns, start_date=start_date, end_date=end_date,
+                filters=filters
+            ).to_pandas()
+            DataAPI.cache.put(key, dataframe)
+
+        # deep copy, the cached frame is shared by all callers and must not see their in place edits (a shallow copy
+        # shares the column blocks)
+        return dataframe.copy()
+
+    @staticmethod
+    def query_table(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters=None, as_of=None
+    ) -> pa.Table:
+        """
+        Query a symbol as an Arrow table, see query() for the selections. The table keeps the stored pandas metadata
+        (index) and is not converted to pandas nor cached i.e. for callers serialising the result e.g. the REST API
+
+        :return: pyarrow Table
+        """
+        assert symbol
+
+        return DataAPI._read(
+            data_file_path=DataAPI.resolve(symbol=symbol, as_of=as_of), columns=columns, start_date=start_date,
+            end_date=end_date, filters=filters
+        )
+
+    @staticmethod
+    def query_batches(
+            symbol: str, columns: list = None, start_date=None, end_date=None, filters=None, as_of=None,
+            batch_size: int = None
+    ) -> pa.RecordBatchReader:
+        """
+        Streaming query of a symbol, see query() for the selections. Record batches (of at most batch_size rows) are
+        read lazily, so arbitrarily large symbols can be processed in constant memory
+
+        :return: pyarrow RecordBatchReader, its schema keeps the stored pandas metadata (index)
+        """
+        assert symbol
+
+        backend = DataAPI.backend()
+        data_file_path = DataAPI.resolve(symbol=symbol, as_of=as_of)
+        columns, expression = DataAPI._selection(
+            data_file_path=data_file_path, columns=columns, start_date=start_date, end_date=end_date, filters=filters
+        )
+
+        return backend.batches(data_file_path, columns=columns, expression=expression, batch_size=batch_size)
+
+    @staticmethod
+    def resolve(symbol: str, as_of=None) -> str:
+        """
+        :return: path of the symbol's stored file, of the version known as of as_of when set
+        """
+        data_file_path = DataAPI.data_file_path(symbol)
+        if as_of is not None:
+            data_file_path = VersionManifest(symbol=symbol).resolve(as_of=as_of, head_file_path=data_file_path)
+
+        return data_file_path
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return DataAPI.cache.stats()
+
+    @staticmethod
+    def _write_upload(symbol: str, stream, temp_file_path: str) -> None:
+        """
+        Writes a parquet encoded upload (see RestClient.save()) to temp_file_path in the backend's format, the stream
+        is copied in chunks (constant memory) and its schema validated from the parquet footer only
+        """
+        import pyarrow.parquet as pq
+        import shutil
+
+        backend = DataAPI.backend()
+        upload_file_path = temp_file_path if isinstance(backend, ParquetStorageBackend) else f'{temp_file_path}.parquet'
+        try:
+            with open(upload_file_path, 'wb') as upload_file:
+                shutil.copyfileobj(stream, upload_file, DataAPI.UPLOAD_CHUNK_SIZE)
+
+            try:
+                schema = pq.read_schema(upload_file_path)
+            except pa.ArrowException as e:
+                raise ValueError(f'Invalid parquet upload for symbol {symbol}: {e}')
+            if not schema.names:
+                raise ValueError(f'Invalid parquet upload for symbol {symbol}: no columns')
+            missing = [
+                column['field_name'] for column in (schema.pandas_metadata or {}).get('columns', [])
+                if column['field_name'] not in schema.names
+            ]
+            if missing:
+                raise ValueError(f'Invalid parquet upload for symbol {symbol}: missing pandas columns {missing}')
+
+            if upload_file_path != temp_file_path:
+                backend.write(temp_file_path, pq.read_table(upload_file_path))
+        finally:
+            if upload_file_path != temp_file_path and os.path.exists(upload_file_path):
+                os.remove(upload_file_path)
+
+    @staticmethod
+    def _read(data_file_path: str, columns: list, start_date, end_date, filters) -> pa.Table:
+        backend = DataAPI.backend()
+        if columns is None and start_date is None and end_date is None and filters is None:
+            return backend.read(data_file_path)
+
+        columns, expression = DataAPI._selection(
+            data_file_path=data_file_path, columns=columns, start_date=start_date, end_date=end_date, filters=filters
+        )
+
+        return backend.read(data_file_path, columns=columns, expression=expression)
+
+    @staticmethod
+    def _selection(data_file_path: str, columns: list, start_date, end_date, filters) -> tuple:
+        """
+        :return: (columns incl. the index columns, filter expression) pushed down to the storage backend reader
+        """
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        backend = DataAPI.backend()
+        index_columns = [
+            index_column for index_column in (backend.schema(data_file_path).pandas_metadata or {}).get(
+                'index_columns', []
+            )
+            if isinstance(index_column, str)
+        ]
+
+        conditions = []
+        if start_date is not None or end_date is not None:
+            if not index_columns:
+                raise ValueError(f'Date filters are not supported for {data_file_path} without a date index')
+            if start_date is not None:
+                conditions.append(ds.field(index_columns[0]) >= pd.Timestamp(start_date))
+            if end_date is not None:
+                conditions.append(ds.field(index_columns[0]) <= pd.Timestamp(end_date))
+        if filters is not None:
+            conditions.append(filters if isinstance(filters, ds.Expression) else pq.filters_to_expression(filters))
+
+        if columns is not None:
+            columns = index_columns + [column for column in columns if column not in index_columns]
+
+        return columns, _conjunction(conditions)
+
+
+class ImpliedVolModelStore:
+
+    """
+    Consolidated columnar store of all implied vol model (IVM) time series
+
+    The per expiry {CONTRACT}_{EXCHANGE}_{FUTURES}_{OPTIONS}_{EXPIRATION}_IVM.parquet files are rewritten (see
+    migrate()) into a single parquet dataset, hive partitioned by CONTRACT, keyed by
+    (CONTRACT, EXCHANGE_CODE, EXPIRATION, DATE) and sorted by DATE so that the row group min/max statistics allow
+    predicate pushdown i.e. "all smiles on date D" is a single scan rather than a read of every market data file
+
+    Each partition holds one {EXCHANGE_CODE}_{EXPIRATION}.parquet file per expiry, so persisting an IVM symbol only
+    rewrites the file of that expiry. Files are replaced atomically by rename under a store lock.
+    """
+
+    DATASET = 'IVM'
+    SYMBOL_SUFFIX = '_IVM'
+    KEY_COLUMNS = ('CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION', 'DATE')
+    ROW_GROUP_SIZE = 8192
+    LOCK_TIMEOUT = 10.
+
+    @classmethod
+    def path(cls, market_data_path: str = None) -> str:
+        return os.path.sep.join((market_data_path or env.MARKET_DATA_PATH, cls.DATASET))
+
+    @classmethod
+    def exists(cls, market_data_path: str = None) -> bool:
+        return os.path.isdir(cls.path(market_data_path=market_data_path))
+
+    @classmethod
+    def migrate(cls, contracts: list = None, symbols: list = None, market_data_path: str = None) -> int:
+        """
+        Rewrite *_IVM.parquet files under the market data path into the consolidated dataset
+
+        :param contracts: Optional, only rewrite the partitions of these contracts e.g. ['BRENT']
+        :param symbols: Optional, only rewrite the expiry files of these IVM symbols e.g. the one just persisted
+        :param market_data_path: Optional, defaults to env.MARKET_DATA_PATH
+        :return: number of rows written
+        """
+        import glob
+
+        backend = DataAPI.backend()
+        market_data_path = market_data_path or env.MARKET_DATA_PATH
+        path = cls.path(market_data_path=market_data_path)
+
+        if symbols is not None:
+            # partitions written before the per expiry layout are rewritten whole, once
+            legacy = sorted({
+                symbol.split('_')[0] for symbol in symbols
+                if glob.glob(os.path.sep.join((path, f'CONTRACT={symbol.split("_")[0]}', 'part-*.parquet')))
+            })
+            if legacy:
+                return cls.migrate(contracts=legacy, market_data_path=market_data_path) + cls.migrate(
+                    symbols=[symbol for symbol in symbols if symbol.split('_')[0] not in legacy],
+                    market_data_path=market_data_path
+                )
+            file_paths = [
+                os.path.sep.join((market_data_path, f'{symbol}{backend.FILE_EXTENSION}')) for symbol in symbols
+            ]
+        else:
+            file_paths = sorted(glob.glob(
+                os.path.sep.join((market_data_path, f'*{cls.SYMBOL_SUFFIX}{backend.FILE_EXTENSION}'))
+            ))
+
+        os.makedirs(path, exist_ok=True)
+        rows = 0
+        with _file_lock(lock_file_path=os.path.sep.join((path, '.lock')), timeout=cls.LOCK_TIMEOUT):
+            partitions = {}
+            for file_path in file_paths:
+                symbol = file_path.split(os.path.sep)[-1].split('.')[0]
+                contract, exchange_code, *__, expiration, __ = symbol.split('_')
+                if contracts and contract not in contracts:
+                    continue
+
+                partition_path = os.path.sep.join((path, f'CONTRACT={contract}'))
+                file_name = f'{exchange_code}_{expiration}.parquet'
+                rows += cls._write(
+                    backend.read(file_path), exchange_code=exchange_code, expiration=expiration,
+                    file_path=os.path.sep.join((partition_path, file_name))
+                )
+                partitions.setdefault(partition_path, set()).add(file_name)
+
+            if symbols is None:
+                # expiries without a market data file any more
+                for partition_path, file_names in partitions.items():
+                    for file_name in os.listdir(partition_path):
+                        if file_name.endswith('.parquet') and file_name not in file_names:
+                            os.remove(os.path.sep.join((partition_path, file_name)))
+
+        return rows
+
+    @classmethod
+    def _write(cls, table: pa.Table, exchange_code: str, expiration: str, file_path: str) -> int:
+        import pyarrow.parquet as pq
+
+        dataframe = table.to_pandas()
+        dataframe.index.name = 'DATE'
+        dataframe = dataframe.reset_index()
+        dataframe.insert(0, 'EXCHANGE_CODE', exchange_code)
+        dataframe.insert(1, 'EXPIRATION', expiration)
+        dataframe = dataframe.sort_values('DATE', ignore_index=True)
+
+        # dot prefixed files are ignored by dataset discovery, readers never see a partially written file
+        directory, file_name = os.path.split(file_path)
+        os.makedirs(directory, exist_ok=True)
+        temp_file_path = os.path.sep.join((directory, f'.{file_name}.{os.getpid()}.tmp'))
+        pq.write_table(
+            pa.Table.from_pandas(dataframe, preserve_index=False), temp_file_path, row_group_size=cls.ROW_GROUP_SIZE
+        )
+        os.replace(temp_file_path, file_path)
+
+        return len(dataframe)
+
+    @classmethod
+    def query(
+            cls,
+            trade_date=None,
+            contract: str = None,
+            exchange_code: str = None,
+            expiration: str = None,
+            start_date=None,
+            end_date=None,
+            columns: list = None,
+            market_data_path: str = None
+    ) -> pd.DataFrame:
+        """
+        :param trade_date: Optional, select the IVM rows for a single date
+        :param contract: Optional, e.g. 'BRENT'
+        :param exchange_code: Optional, e.g. 'ICE'
+        :param expiration: Optional, options contract expiration code e.g. 'F2025'
+        :param start_date: Optional, inclusive start of a date range
+        :param end_date: Optional, inclusive end of a date range
+        :param columns: Optional, IVM columns to read (key columns are always returned)
+        :return: DataFrame of key columns + IVM columns
+        """
+        import pyarrow.dataset as ds
+
+        conditions = []
+        if trade_date is not None:
+            conditions.append(ds.field('DATE') == pd.Timestamp(trade_date))
+        if start_date is not None:
+            conditions.append(ds.field('DATE') >= pd.Timestamp(start_date))
+        if end_date is not None:
+            conditions.append(ds.field('DATE') <= pd.Timestamp(end_date))
+        if contract:
+            conditions.append(ds.field('CONTRACT') == contract.upper())
+        if exchange_code:
+            conditions.append(ds.field('EXCHANGE_CODE') == exchange_code.upper())
+        if expiration:
+            conditions.append(ds.field('EXPIRATION') == expiration.upper())
+
+        expression = _conjunction(conditions)
+
+        dataset = ds.dataset(cls.path(market_data_path=market_data_path), format='parquet', partitioning='hive')
+        if columns is not None:
+            columns = list(cls.KEY_COLUMNS) + [column for column in columns if column not in cls.KEY_COLUMNS]
+
+        dataframe = dataset.to_table(columns=columns, filter=expression).to_pandas()
+        if columns is None:
+            dataframe = dataframe[list(cls.KEY_COLUMNS) + [c for c in dataframe.columns if c not in cls.KEY_COLUMNS]]
 
-        return pd.read_parquet(data_file_path)
+        return dataframe
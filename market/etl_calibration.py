@@ -0,0 +1,103 @@
+"""
+Calibrates our own OptionWorks style IVM rows from option settlement quotes, an alternative to the OWF feed of
+market.etl_implied_vols.QuandlOWFImpliedVolsAdapter
+
+Quotes file (csv or parquet), one row per option settlement:
+CONTRACT, EXCHANGE_CODE (optional), MONTH, YEAR, OPTION_TYPE, STRIKE, PRICE, FUTURE (settlement of the underlying),
+FUTURE_EXPIRY_DATE (optional)
+
+Each expiry gives one row of its {contract}_{exchange code}_{futures code}_{options code}_{expiration}_IVM symbol:
+- Future: futures settlement
+- AtM, Beta1..Beta6: 6-degree polynomial smile fitted to the out of the money implied vols (Black 76)
+- MinMoney, MaxMoney: moneyness range of the fitted quotes
+- DtE: calendar days to the option expiry
+- DtT: calendar days to the futures expiry when FUTURE_EXPIRY_DATE is given, NaN otherwise
+- RR25, RR10, Fly25, Fly10: NaN
+"""
+
+import env
+import numpy as np
+import pandas as pd
+from analytics.curves.yield_curve import yield_curve
+from analytics.exceptions import BlackScholesInputError
+from analytics.options.calibration import calibrate_smiles
+from analytics.options.reference_data import option_expiry
+from analytics.options.volatility import implied_vol_model_symbol
+from analytics.portfolio import Portfolio
+from api import RestClient as rest_client
+from api import LocalClient as local_client
+from market.etl_adapter import BaseETLAdapter
+
+
+QUOTE_COLUMNS = ('CONTRACT', 'MONTH', 'YEAR', 'OPTION_TYPE', 'STRIKE', 'PRICE', 'FUTURE')
+
+
+class SettlementImpliedVolsAdapter(BaseETLAdapter):
+
+    """
+    Transforms to a DataFrame of IVM rows (float32) indexed by Date with a SYMBOL column, run(save=True) saves
+    each symbol, replacing its row of the trade date in the IVM time series
+    """
+
+    def transform(self, url, params: dict) -> pd.DataFrame:
+        assert url
+
+        trade_date = pd.to_datetime(params.get('TRADE_DATE', env.TRADE_DATE)).date()
+
+        quotes = pd.read_parquet(url) if url.endswith('.parquet') else pd.read_csv(url, dtype={'YEAR': str})
+        missing = [column for column in QUOTE_COLUMNS if column not in quotes.columns]
+        if missing:
+            raise BlackScholesInputError(f'Missing quote columns {missing}')
+
+        portfolio = Portfolio.from_dataframe(quotes)
+        keys = pd.MultiIndex.from_arrays(
+            [portfolio.contract, portfolio.exchange_code, portfolio.month, portfolio.year]
+        )
+        codes, expiries = pd.factorize(keys, sort=True)
+
+        # market data is read once per expiry
+        symbols = np.array([implied_vol_model_symbol(*expiry) for expiry in expiries])
+        days_to_expiry = np.array([(option_expiry(*expiry) - trade_date).days for expiry in expiries], dtype=float)
+
+        if 'FUTURE_EXPIRY_DATE' in quotes.columns:
+            future_expiry = pd.to_datetime(quotes['FUTURE_EXPIRY_DATE']).values.astype('datetime64[D]')
+            trading_days = (future_expiry - np.datetime64(trade_date, 'D')).astype(float)
+        else:
+            trading_days = np.nan
+
+        t = days_to_expiry[codes] / 365.25
+        # flat extrapolation beyond the curve tenors
+        r = yield_curve(trade_date).rate(t, extrapolation='flat')
+
+        dataframe = calibrate_smiles(
+            expiration=symbols[codes],
+            option_type=portfolio.option_type,
+            x=quotes['STRIKE'].values,
+            price=quotes['PRICE'].values,
+            fs=quotes['FUTURE'].values,
+            t=t,
+            r=r,
+            days_to_expiry=days_to_expiry[codes],
+            trading_days=trading_days
+        )
+
+        dataframe.insert(0, 'SYMBOL', dataframe.index.values)
+        dataframe.index = pd.DatetimeIndex([pd.Timestamp(trade_date)] * len(dataframe), name='Date')
+
+        return dataframe
+
+    def run(self, save: bool = False) -> pd.DataFrame:
+        dataframe = self.transform(url=self.url, params=self.params)
+        if save:
+            c = local_client if self.use_local_client else rest_client
+            symbols = set(c.symbols())
+            for symbol, rows in dataframe.groupby('SYMBOL'):
+                rows = rows.drop(columns='SYMBOL')
+                history = None
+                if symbol in symbols:
+                    history = c.data(symbol=symbol)
+                    history = history[~history.index.isin(rows.index)]
+                c.save(symbol=symbol, dataframe=pd.concat([rows, history]).sort_index(ascending=False))
+                print(f'Symbol {symbol} saved successfully.')
+
+        return dataframe
@@ -0,0 +1,185 @@
+import datetime as dt
+import env
+import numpy as np
+import pandas as pd
+from analytics.cache import trade_date_cache
+from analytics.exceptions import BlackScholesCalculationError
+from market.datastore_adapter import DataAPI, ImpliedVolModelStore
+
+
+IVM_COLUMNS = (
+    'Future', 'AtM', 'RR25', 'RR10', 'Fly25', 'Fly10', 'Beta1', 'Beta2', 'Beta3', 'Beta4', 'Beta5', 'Beta6',
+    'MinMoney', 'MaxMoney', 'DtE', 'DtT'
+)
+CALENDAR_SYMBOL_PREFIX = 'CALENDAR_OPTION_'
+
+
+class MarketSnapshot:
+
+    """
+    All market data required to price commodity options on a single trade date, loaded in one pass
+
+    - IVM rows of every expiry, as a (symbols x IVM_COLUMNS) float64 array
+    - Fed Reserve UST curve row (RIFLGFC), as an analytics.curves.yield_curve.YieldCurve
+    - Option expiry calendars (CALENDAR_OPTION_*), as an analytics.options.reference_data.OptionExpiryCalendar
+
+    Pricers take a snapshot explicitly so that any number of prices share it with no further I/O
+
+    IVM rows are read with a single scan of the consolidated ImpliedVolModelStore when it has been migrated,
+    otherwise (or when loading market data as known at a past knowledge time as_of) from the per expiry IVM files
+    """
+
+    __slots__ = (
+        'trade_date', 'as_of', 'ivm_index', 'ivm_values', 'yield_curve', 'option_expiry_calendar'
+    )
+
+    def __init__(
+            self,
+            trade_date: dt.date,
+            ivm_index: dict,
+            ivm_values: np.ndarray,
+            yield_curve,
+            option_expiry_calendar,
+            as_of=None
+    ):
+        assert trade_date
+
+        self.trade_date = trade_date
+        self.as_of = as_of
+        self.ivm_index = ivm_index
+        self.ivm_values = ivm_values
+        self.yield_curve = yield_curve
+        self.option_expiry_calendar = option_expiry_calendar
+
+    @classmethod
+    def load(cls, trade_date: dt.date = None, as_of=None):
+        """
+        :param trade_date: Optional, defaults to env.TRADE_DATE
+        :param as_of: Optional knowledge time, load market data as it was known at that time
+        :return: MarketSnapshot, cached per trade date & knowledge time
+        """
+        return load_market_snapshot(trade_date=trade_date or env.TRADE_DATE, as_of=as_of)
+
+    @classmethod
+    def from_market_data(cls, trade_date: dt.date, as_of=None):
+        assert trade_date
+
+        timestamp = pd.Timestamp(trade_date)
+        symbols = DataAPI.symbols()
+
+        ivm_index = {}
+        ivm_rows = []
+        if ImpliedVolModelStore.exists() and as_of is None:
+            from analytics.constants import CONTRACT_EXCHANGE_MAP
+
+            dataframe = ImpliedVolModelStore.query(trade_date=trade_date, columns=list(IVM_COLUMNS))
+            for contract, exchange_code, expiration, data_row in zip(
+                    dataframe['CONTRACT'], dataframe['EXCHANGE_CODE'], dataframe['EXPIRATION'],
+                    dataframe[list(IVM_COLUMNS)].values
+            ):
+                futures_code, options_code, __ = CONTRACT_EXCHANGE_MAP[(contract, exchange_code)]
+                ivm_index[f'{contract}_{exchange_code}_{futures_code}_{options_code}_{expiration}_IVM'] = len(ivm_rows)
+                ivm_rows.append(data_row)
+        else:
+            for symbol in sorted(symbol for symbol in symbols if symbol.endswith(ImpliedVolModelStore.SYMBOL_SUFFIX)):
+                try:
+                    dataframe = DataAPI.query(symbol=symbol, start_date=trade_date, end_date=trade_date, as_of=as_of)
+                except FileNotFoundError:
+                    continue
+                data_row = dataframe[dataframe.index == timestamp]
+                if len(data_row):
+                    ivm_index[symbol] = len(ivm_rows)
+                    ivm_rows.append(data_row[list(IVM_COLUMNS)].values[0])
+        ivm_values = np.array(ivm_rows, dtype=np.float64).reshape(-1, len(IVM_COLUMNS))
+
+        from analytics.curves.yield_curve import YieldCurve
+
+        curve_rates = np.full(len(YieldCurve.TENORS), np.nan)
+        if YieldCurve.SYMBOL in symbols:
+            dataframe = DataAPI.query(
+                symbol=YieldCurve.SYMBOL, start_date=trade_date, end_date=trade_date, as_of=as_of
+            )
+            data_row = dataframe[dataframe.index == timestamp]
+            if len(data_row):
+                curve_rates = data_row.values[0]
+        yield_curve = YieldCurve(tenors=YieldCurve.TENORS, rates=curve_rates)
+
+        from analytics.options.reference_data import OptionExpiryCalendar
+
+        calendars = {}
+        for symbol in symbols:
+            if symbol.startswith(CALENDAR_SYMBOL_PREFIX):
+                try:
+                    dataframe = DataAPI.query(symbol=symbol, as_of=as_of)
+                except FileNotFoundError:
+                    continue
+                calendars[symbol[len(CALENDAR_SYMBOL_PREFIX):]] = {
+                    contract_code: expiration_date.date()
+                    for contract_code, expiration_date in dataframe['EXPIRATION_DATE'].items()
+                }
+
+        return cls(
+            trade_date=trade_date,
+            ivm_index=ivm_index,
+            ivm_values=ivm_values,
+            yield_curve=yield_curve,
+            option_expiry_calendar=OptionExpiryCalendar(calendars=calendars),
+            as_of=as_of
+        )
+
+    def option_expiry(self, contract: str, exchange_code: str, month: str, year: str) -> dt.date:
+        return self.option_expiry_calendar.expiry(contract=contract, month=month, year=year)
+
+    def implied_vol_model(self, contract: str, exchange_code: str, month: str, year: str) -> np.ndarray:
+        """
+        :return: IVM row as a float64 array, see IVM_COLUMNS
+        """
+        from analytics.options.volatility import implied_vol_model_symbol
+
+        symbol = implied_vol_model_symbol(contract=contract, exchange_code=exchange_code, month=month, year=year)
+        try:
+            return self.ivm_values[self.ivm_index[symbol]]
+        except KeyError:
+            raise BlackScholesCalculationError(f'Missing implied vol model for symbol {symbol} on {self.trade_date}')
+
+    def atm_strike(self, contract: str, exchange_code: str, month: str, year: str) -> float:
+        data_row = self.implied_vol_model(contract=contract, exchange_code=exchange_code, month=month, year=year)
+
+        return float(data_row[IVM_COLUMNS.index('Future')])
+
+    def implied_vol_smile(self, contract: str, exchange_code: str, month: str, year: str):
+        from analytics.options.volatility import Smile
+
+        data_row = self.implied_vol_model(contract=contract, exchange_code=exchange_code, month=month, year=year)
+
+        return Smile(
+            future=data_row[IVM_COLUMNS.index('Future')],
+            atm=data_row[IVM_COLUMNS.index('AtM')],
+            betas=data_row[IVM_COLUMNS.index('Beta1'):IVM_COLUMNS.index('Beta6') + 1],
+            min_money=data_row[IVM_COLUMNS.index('MinMoney')],
+            max_money=data_row[IVM_COLUMNS.index('MaxMoney')]
+        )
+
+    def implied_vol(self, contract: str, exchange_code: str, month: str, year: str, strike):
+        """
+        :param strike: scalar or array of strikes
+        """
+        smile = self.implied_vol_smile(contract=contract, exchange_code=exchange_code, month=month, year=year)
+
+        return smile.implied_vol(strike)
+
+    def rate(self, expiry_date: dt.date) -> float:
+        assert expiry_date
+        assert expiry_date > self.trade_date
+
+        year_faction = (expiry_date - self.trade_date).days / 365.25
+
+        return self.yield_curve.rate(year_faction)
+
+
+@trade_date_cache(max_entries=2)
+def load_market_snapshot(trade_date: dt.date, as_of=None) -> MarketSnapshot:
+    return MarketSnapshot.from_market_data(trade_date=trade_date, as_of=as_of)
+
+
+DataAPI.on_persist(lambda symbol: load_market_snapshot.cache_clear())
@@ -0,0 +1,13 @@
+"""
+Rewrite the per expiry *_IVM.parquet market data files into the consolidated ImpliedVolModelStore dataset
+
+python migrate_market.py [CONTRACT ...]
+"""
+
+import sys
+from market.datastore_adapter import ImpliedVolModelStore
+
+
+contracts = [contract.upper() for contract in sys.argv[1:]] or None
+rows = ImpliedVolModelStore.migrate(contracts=contracts)
+print(f'Migrated {rows} IVM rows to {ImpliedVolModelStore.path()}')
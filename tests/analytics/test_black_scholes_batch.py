@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from analytics.options.black_scholes import Black76CommodityOptionPricer, BlackScholesOptionPricer
+from analytics.options.black_scholes_batch import Black76CommodityBatchPricer, BlackScholesBatchPricer
+from api import LocalClient as c
+
+
+def test_batch_option_price():
+    option_type = np.array(['C', 'P', 'c', 'p'])
+    x = np.array([19., 19., 25., 15.])
+    fs = np.array([19., 19., 20., 18.])
+    t = np.array([0.75, 0.75, 1.5, 0.25])
+    b = np.zeros(4)
+    r = np.array([0.1, 0.1, 0.05, 0.02])
+    v = np.array([0.28, 0.28, 0.35, 0.2])
+
+    prices = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v).price()
+
+    assert round(prices[0], 9) == round(1.70105072524, 9)
+    for i, price in enumerate(prices):
+        pricer = BlackScholesOptionPricer(
+            option_type=option_type[i], x=x[i], fs=fs[i], t=t[i], b=b[i], r=r[i], v=v[i]
+        )
+        assert np.isclose(price, pricer.price(), rtol=0, atol=1e-12)
+
+
+def test_batch_option_price_invalid_inputs_masked():
+    pricer = BlackScholesBatchPricer(
+        option_type=['c', 'x', 'c', 'c'], x=19, fs=19, t=[0.75, 0.75, 0.75, 1000], b=0, r=0.1, v=[0.28, 0.28, 15, 0.28]
+    )
+    prices = pricer.price()
+
+    assert pricer.valid.tolist() == [True, False, False, False]
+    assert not np.isnan(prices[0])
+    assert np.isnan(prices[1:]).all()
+
+
+def test_batch_option_price_from_dataframe():
+    dataframe = pd.DataFrame({
+        'OPTION_TYPE': ['C', 'P'], 'X': [19., 19.], 'FS': [19., 19.], 'T': [0.75, 0.75], 'B': [0., 0.],
+        'R': [0.1, 0.1], 'V': [0.28, 0.28]
+    })
+    prices = BlackScholesBatchPricer.from_dataframe(dataframe).price()
+
+    assert np.array_equal(prices, c.option_price_batch(
+        option_type=['C', 'P'], x=19., fs=19., t=0.75, b=0., r=0.1, v=0.28
+    ))
+
+
+def test_batch_commodity_option_price():
+    strikes = np.array([np.nan, 70.5, 90., np.nan])
+    pricer = Black76CommodityBatchPricer(
+        contract=['BRENT', 'BRENT', 'BRENT', 'XXX'],
+        exchange_code=None,
+        month='JAN',
+        year='2025',
+        option_type=['C', 'P', 'C', 'C'],
+        strike=strikes
+    )
+    prices = pricer.price()
+
+    for i in range(3):
+        expected = Black76CommodityOptionPricer(
+            contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type=pricer.option_type[i],
+            strike=None if np.isnan(strikes[i]) else strikes[i]
+        ).price()
+        assert np.isclose(prices[i], expected, rtol=0, atol=1e-12)
+    assert np.isnan(prices[3])
+
+    lot_prices = c.commodity_option_price_batch(
+        contract='BRENT', month='JAN', year='2025', option_type=['C', 'P'], lot_price=True
+    )
+    assert np.isclose(lot_prices[0], prices[0] * 1000)
+    assert lot_prices[1] > 0
+
+
+def test_batch_commodity_option_price_missing_exchange_code():
+    exchange_code = np.array(['ICE', np.nan, None, ''], dtype=object)
+    pricer = Black76CommodityBatchPricer(
+        contract='BRENT', exchange_code=exchange_code, month='JAN', year='2025', option_type='C', strike=80.
+    )
+
+    assert pricer.exchange_code.tolist() == ['ICE'] * 4
+    prices = pricer.price()
+    assert np.all(np.isfinite(prices))
+    assert np.allclose(prices, prices[0], rtol=0, atol=1e-12)
+
+
+def test_batch_option_greeks():
+    option_type = np.array(['C', 'P', 'C', 'P'])
+    x = np.array([19., 19., 25., 15.])
+    fs = np.array([19., 19., 20., 18.])
+    t = np.array([0.75, 0.75, 1.5, 0.25])
+    b = np.array([0., 0., 0.02, -0.01])
+    r = np.array([0.1, 0.1, 0.05, 0.02])
+    v = np.array([0.28, 0.28, 0.35, 0.2])
+
+    greeks = c.option_greeks_batch(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v, second_order=True)
+
+    assert greeks.columns.tolist() == ['DELTA', 'GAMMA', 'THETA', 'VEGA', 'RHO', 'VANNA', 'VOLGA', 'CHARM']
+    for i in range(len(x)):
+        expected = BlackScholesOptionPricer(
+            option_type=option_type[i], x=x[i], fs=fs[i], t=t[i], b=b[i], r=r[i], v=v[i]
+        ).greeks()
+        for greek, value in expected.items():
+            assert np.isclose(greeks[greek][i], value, rtol=1e-12, atol=1e-12)
+
+    # second order greeks against central finite differences of the first order greeks
+    h = 1e-5
+    bumped = {
+        key: BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t + t_bump, b=b, r=r, v=v + v_bump).greeks()
+        for key, t_bump, v_bump in (('v_up', 0, h), ('v_down', 0, -h), ('t_up', h, 0), ('t_down', -h, 0))
+    }
+    vanna = (bumped['v_up']['DELTA'] - bumped['v_down']['DELTA']) / (2 * h)
+    volga = (bumped['v_up']['VEGA'] - bumped['v_down']['VEGA']) / (2 * h)
+    charm = -(bumped['t_up']['DELTA'] - bumped['t_down']['DELTA']) / (2 * h)
+
+    assert np.allclose(greeks['VANNA'], vanna, atol=1e-6)
+    assert np.allclose(greeks['VOLGA'], volga, atol=1e-5)
+    assert np.allclose(greeks['CHARM'], charm, atol=1e-6)
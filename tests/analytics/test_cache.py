@@ -0,0 +1,157 @@
+import datetime as dt
+import env
+import pytest
+import threading
+from analytics import cache
+from analytics.cache import TradeDateCache, trade_date_cache
+
+
+def test_trade_date_cache():
+    _cache = TradeDateCache(name='test', max_entries=2, max_dates=2)
+    dates = [dt.date(2022, 12, day) for day in (5, 6, 7)]
+
+    _cache.put(dates[0], ('a',), 1)
+    _cache.put(dates[0], ('b',), 2)
+    assert _cache.get(dates[0], ('a',)) == 1
+    # least recently used entry of the trade date is evicted first
+    _cache.put(dates[0], ('c',), 3)
+    assert _cache.get(dates[0], ('b',)) is TradeDateCache.MISSING
+    assert _cache.get(dates[0], ('a',)) == 1
+
+    # least recently used trade date is evicted first
+    _cache.put(dates[1], ('a',), 4)
+    _cache.get(dates[0], ('a',))
+    _cache.put(dates[2], ('a',), 5)
+    assert _cache.trade_dates() == [dates[0], dates[2]]
+    assert _cache.stats()['entries'] == 3
+
+    _cache.evict(dates[0])
+    assert _cache.trade_dates() == [dates[2]]
+
+
+def test_trade_date_cache_decorator():
+    calls = []
+
+    @trade_date_cache(max_entries=8)
+    def value(trade_date: dt.date, key: str, scale: float = 1.):
+        calls.append((trade_date, key, scale))
+        return trade_date.day * scale
+
+    trade_date = dt.date(2022, 12, 5)
+    assert value(trade_date, 'a') == value(trade_date=trade_date, key='a', scale=1.) == 5
+    assert value(dt.date(2022, 12, 6), 'a') == 6
+    assert len(calls) == 2
+
+    value.prime(50., trade_date, 'b')
+    assert value(trade_date, key='b') == 50.
+    assert len(calls) == 2
+
+    # entries of an unreferenced trade date are evicted on release
+    cache.retain(trade_date)
+    cache.release(trade_date)
+    assert value.cache.trade_dates() == [dt.date(2022, 12, 6)]
+    cache.caches.remove(value.cache)
+
+
+def test_trade_date_cache_invalidated_during_call(tmp_path, monkeypatch):
+    import pandas as pd
+    from market.datastore_adapter import DataAPI
+
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+    symbol = 'TEST'
+    DataAPI.persist(symbol=symbol, dataframe=pd.DataFrame({'VALUE': [1.]}, index=pd.DatetimeIndex(['2022-12-05'])))
+    calls = []
+
+    @trade_date_cache()
+    def value(trade_date: dt.date):
+        calls.append(trade_date)
+        dataframe = DataAPI.query(symbol=symbol)
+        if len(calls) == 1:
+            # persisted between the read and the put
+            DataAPI.persist(symbol=symbol, dataframe=dataframe * 2)
+        return dataframe.iloc[0, 0]
+
+    DataAPI.on_persist(lambda _symbol: value.cache_clear())
+    trade_date = dt.date(2022, 12, 5)
+    try:
+        assert value(trade_date) == 1.
+        assert value.cache.trade_dates() == []
+
+        # recomputed from the persisted data, then cached
+        assert value(trade_date) == 2.
+        assert value(trade_date) == 2.
+        assert len(calls) == 2
+    finally:
+        DataAPI.persist_listeners.pop()
+        cache.caches.remove(value.cache)
+
+
+def test_tweak_env_trade_date():
+    from analytics.options.black_scholes import Black76CommodityOptionPricer
+    from analytics.options.volatility import implied_vol_smile
+    from market.snapshot import MarketSnapshot
+
+    trade_date = env.TRADE_DATE
+    new_trade_date = dt.date(2022, 12, 5)
+    implied_vol_smile(trade_date=trade_date, contract='BRENT', exchange_code='ICE', month='JAN', year='2025')
+
+    try:
+        env.tweak_env('TRADE_DATE', new_trade_date)
+        for thread in threading.enumerate():
+            if thread.name == f'prewarm-{new_trade_date}':
+                thread.join()
+
+        # the previous trade date is no longer referenced, the new one is pre-warmed
+        assert trade_date not in implied_vol_smile.cache.trade_dates()
+        assert implied_vol_smile.cache.stats()['entries'] > 0
+
+        pricer = Black76CommodityOptionPricer(
+            contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C'
+        )
+        assert pricer.trade_date() == new_trade_date
+        assert pricer.price() == pytest.approx(
+            Black76CommodityOptionPricer(
+                contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C',
+                snapshot=MarketSnapshot.from_market_data(trade_date=new_trade_date)
+            ).price(), abs=1e-12
+        )
+    finally:
+        env.tweak_env('TRADE_DATE', trade_date)
+        for thread in threading.enumerate():
+            if thread.name == f'prewarm-{trade_date}':
+                thread.join()
+
+    assert new_trade_date not in implied_vol_smile.cache.trade_dates()
+
+
+def test_prewarm_invalidated(monkeypatch):
+    from analytics.options.volatility import implied_vol_smile
+    from market.snapshot import MarketSnapshot
+
+    trade_date = dt.date(2022, 12, 5)
+
+    # an unreferenced trade date is not pre-warmed
+    cache.prewarm(trade_date, background=False)
+    assert trade_date not in implied_vol_smile.cache.trade_dates()
+
+    # nor one whose caches are invalidated while its snapshot loads
+    load = MarketSnapshot.load
+
+    def invalidating_load(*args, **kwargs):
+        snapshot = load(*args, **kwargs)
+        cache.clear()
+        return snapshot
+
+    monkeypatch.setattr(MarketSnapshot, 'load', invalidating_load)
+    cache.retain(trade_date)
+    try:
+        cache.prewarm(trade_date, background=False)
+        assert trade_date not in implied_vol_smile.cache.trade_dates()
+
+        monkeypatch.setattr(MarketSnapshot, 'load', load)
+        cache.prewarm(trade_date, background=False)
+        assert trade_date in implied_vol_smile.cache.trade_dates()
+    finally:
+        cache.release(trade_date)
+
+    assert trade_date not in implied_vol_smile.cache.trade_dates()
@@ -0,0 +1,61 @@
+import numpy as np
+from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+from analytics.options.calibration import calibrate_smiles
+from analytics.options.volatility import Smile
+from market.snapshot import IVM_COLUMNS
+
+
+def test_calibrate_smiles():
+    rng = np.random.default_rng(11)
+    expiries, strikes = 60, 81
+    atm = rng.uniform(0.3, 0.6, expiries)
+    betas = rng.uniform([-0.3, 0.2, -0.3, -0.3, -0.3, -0.3], [0., 0.5, 0.3, 0.3, 0.3, 0.3], (expiries, 6))
+    future = rng.uniform(50., 100., expiries)
+    t = np.linspace(0.1, 5., expiries)
+
+    expiration = np.repeat([f'E{i:02}' for i in range(expiries)], 2 * strikes)
+    moneyness = np.tile(np.linspace(-0.6, 0.6, strikes), 2 * expiries)
+    option_type = np.tile(np.repeat(['c', 'p'], strikes), expiries)
+    fs = np.repeat(future, 2 * strikes)
+    x = fs * np.exp(moneyness)
+    tt = np.repeat(t, 2 * strikes)
+    v = np.repeat(atm, 2 * strikes) + sum(
+        np.repeat(betas[:, i], 2 * strikes) * moneyness ** (i + 1) for i in range(6)
+    )
+    assert v.min() > 0. and v.max() < 1.
+    price = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=tt, b=0., r=0.03, v=v).price()
+
+    dataframe = calibrate_smiles(
+        expiration=expiration, option_type=option_type, x=x, price=price, fs=fs, t=tt, r=0.03,
+        days_to_expiry=tt * 365.25
+    )
+
+    assert dataframe.columns.tolist() == list(IVM_COLUMNS)
+    assert (dataframe.dtypes == np.float32).all()
+    assert dataframe.index.tolist() == [f'E{i:02}' for i in range(expiries)]
+    assert dataframe[['RR25', 'RR10', 'Fly25', 'Fly10', 'DtT']].isna().all().all()
+    assert np.allclose(dataframe['Future'], future)
+    assert np.allclose(dataframe['MinMoney'], -0.6) and np.allclose(dataframe['MaxMoney'], 0.6)
+
+    # the fitted smiles reproduce the quoted vols (to float32 coefficients)
+    for i, (expiry, row) in enumerate(dataframe.iterrows()):
+        smile = Smile.from_data_row(dataframe.loc[[expiry]])
+        quotes = expiration == expiry
+        assert np.max(np.abs(smile.implied_vol(x[quotes]) - v[quotes])) < 1e-5
+        assert np.isclose(row['AtM'], atm[i], atol=1e-6)
+
+
+def test_calibrate_smiles_missing_quotes():
+    x = np.linspace(80., 120., 9)
+    price = BlackScholesBatchPricer(option_type='c', x=x, fs=100., t=1., b=0., r=0.03, v=0.3).price()
+
+    dataframe = calibrate_smiles(
+        expiration=['A'] * 9 + ['B'] * 3, option_type='c', x=np.append(x, x[:3]), price=np.append(price, [-1.] * 3),
+        fs=100., t=1., r=0.03, out_of_the_money=False
+    )
+
+    assert np.allclose(dataframe.loc['A', 'AtM'], 0.3)
+    assert np.allclose(dataframe.loc['A', list(Smile.BETA_COLUMNS)].astype(float), 0., atol=1e-5)
+    # too few valid quotes to fit a smile
+    assert dataframe.loc['B', ['AtM', 'Beta1', 'MinMoney', 'MaxMoney']].isna().all()
+    assert dataframe.loc['B', 'Future'] == 100.
@@ -0,0 +1,65 @@
+import datetime as dt
+import numpy as np
+from analytics.options.black_scholes import Black76CommodityOptionPricer
+from api import LocalClient as c
+from market.snapshot import MarketSnapshot
+
+
+def test_commodity_option_price_history():
+    start_date, end_date = dt.date(2022, 11, 1), dt.date(2022, 12, 9)
+
+    history = c.commodity_option_price_history(
+        contract='BRENT', month='JAN', year='2025', option_type='C', start_date=start_date, end_date=end_date,
+        strike=80., quantity=-2., second_order=True
+    )
+
+    assert history.index.name == 'Date'
+    assert history.index.is_monotonic_increasing
+    assert history.index[0].date() >= start_date and history.index[-1].date() == end_date
+    assert history.columns.tolist() == [
+        'FS', 'X', 'T', 'R', 'V', 'PRICE', 'PV', 'DELTA', 'GAMMA', 'THETA', 'VEGA', 'RHO', 'VANNA', 'VOLGA', 'CHARM'
+    ]
+    assert not history.isna().any().any()
+
+    # every trade date matches the single option pricer on that date's market data
+    for trade_date in history.index[::7]:
+        pricer = Black76CommodityOptionPricer(
+            contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C', strike=80.,
+            snapshot=MarketSnapshot.from_market_data(trade_date=trade_date.date())
+        )
+        assert np.isclose(history.at[trade_date, 'PRICE'], pricer.price(), rtol=0, atol=1e-10)
+        assert np.isclose(history.at[trade_date, 'PV'], pricer.price() * pricer.lot_size() * -2., rtol=1e-12)
+        assert np.isclose(history.at[trade_date, 'DELTA'], pricer.greeks()['DELTA'] * pricer.lot_size() * -2.)
+
+    # ATM strike of each trade date when no strike is given
+    atm = c.commodity_option_price_history(
+        contract='BRENT', month='JAN', year='2025', option_type='P', start_date=start_date, end_date=end_date
+    )
+    assert np.array_equal(atm['X'].values, atm['FS'].values)
+
+
+def test_commodity_option_price_history_short_tenor():
+    import env
+    import pytest
+    from analytics.curves.yield_curve import yield_curve
+    from analytics.exceptions import BlackScholesCalculationError
+
+    # expires 2022-12-22 i.e. within the 1M curve tenor on the last trade dates
+    option = dict(contract='BRENT', exchange_code='ICE', month='FEB', year='2023', option_type='C', strike=80.)
+    kwargs = dict(start_date=dt.date(2022, 11, 1), end_date=env.TRADE_DATE, **option)
+
+    # no extrapolation unless asked for, as the option pricers
+    with pytest.raises(BlackScholesCalculationError):
+        c.commodity_option_price_history(**kwargs)
+    with pytest.raises(BlackScholesCalculationError):
+        Black76CommodityOptionPricer(**option).price()
+
+    history = c.commodity_option_price_history(extrapolation='flat', **kwargs)
+    assert history['T'].iloc[-1] < 1 / 12
+    assert not history['PRICE'].isna().any()
+    for trade_date in history.index[-2:]:
+        assert np.isclose(
+            history.at[trade_date, 'R'],
+            yield_curve(trade_date=trade_date.date()).rate(history.at[trade_date, 'T'], extrapolation='flat'),
+            rtol=1e-12
+        )
@@ -1,5 +1,11 @@
 import datetime as dt
-from analytics.options.volatility import implied_vol_model, ows_implied_vol, atm_strike
+import numpy as np
+import pytest
+from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+from analytics.options.volatility import implied_vol_model, implied_vol_smile, ows_implied_vol, atm_strike, Smile
+from analytics.options.volatility import (
+    approx_implied_vol, corrado_miller_implied_vol, implied_vol, IMPLIED_VOL_METHODS
+)
 
 
 def test_implied_vol_model():
@@ -30,3 +36,71 @@ def test_atm_strike():
     )
 
     assert _atm_strike > 0
+
+
+def test_implied_vol_smile():
+    trade_date = dt.date(day=5, month=12, year=2022)
+    data_row = implied_vol_model(
+        trade_date=trade_date, contract='BRENT', exchange_code='ICE', month='JAN', year=2025
+    )
+    smile = implied_vol_smile(
+        trade_date=trade_date, contract='BRENT', exchange_code='ICE', month='JAN', year=2025
+    )
+
+    future = data_row['Future'].values[0]
+    min_money = data_row['MinMoney'].values[0]
+    max_money = data_row['MaxMoney'].values[0]
+    strikes = future * np.exp(np.linspace(min_money, max_money, 200))
+
+    moneyness = np.log(strikes / future)
+    betas = data_row[list(Smile.BETA_COLUMNS)].values[0].astype(np.float64)
+    expected = data_row['AtM'].values[0] + sum(beta * moneyness ** (i + 1) for i, beta in enumerate(betas))
+
+    vols = smile.implied_vol(strikes)
+    assert vols.shape == strikes.shape
+    assert np.allclose(vols, expected)
+    assert smile.implied_vol(strikes[10]) == vols[10]
+    assert smile.implied_vol(future) == np.float64(data_row['AtM'].values[0])
+
+    # flat extrapolation outside of the fitted moneyness range
+    assert smile.implied_vol(strikes[0] / 2) == smile.implied_vol(strikes[0])
+    assert smile.implied_vol(strikes[-1] * 2) == smile.implied_vol(strikes[-1])
+
+
+@pytest.mark.parametrize('method', IMPLIED_VOL_METHODS)
+def test_implied_vol(method):
+    rng = np.random.default_rng(7)
+    size = 10000
+    option_type = rng.choice(['c', 'p'], size)
+    x = rng.uniform(60., 140., size)
+    fs = 100.
+    t = rng.uniform(0.1, 3., size)
+    b = rng.choice([0., 0.02], size)
+    r = 0.03
+    v = rng.uniform(0.1, 0.9, size)
+    pricer = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=v)
+    prices = pricer.price()
+    vega = pricer.greeks()['VEGA'].values
+
+    vols = implied_vol(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, cp=prices, method=method)
+
+    assert vols.shape == (size,)
+    assert np.isnan(vols).mean() < 0.001
+    # deep in/out of the money vols are only determined to price precision / vega
+    assert np.nanmax(np.abs(vols - v)[vega > 1e-4]) < 1e-6
+    repriced = BlackScholesBatchPricer(option_type=option_type, x=x, fs=fs, t=t, b=b, r=r, v=vols).price()
+    assert np.nanmax(np.abs(repriced - prices)) < 1e-8
+
+    # initial guesses are in the right region for near the money options
+    atm = np.abs(np.log(x / fs)) < 0.05
+    for guess in (approx_implied_vol, corrado_miller_implied_vol):
+        assert np.nanmedian(np.abs(guess(option_type, x, fs, t, b, r, prices)[atm] - v[atm])) < 0.05
+
+    # no implied vol exists outside of the no arbitrage bounds, invalid inputs
+    vols = implied_vol(option_type=['c', 'c', 'p', 'x'], x=100., fs=100., t=1., b=0., r=0.03, cp=[-1., 200., 0., 10.])
+    assert np.isnan(vols).all()
+
+    vols = implied_vol(
+        option_type=[['c'], ['p']], x=[90., 100., 110.], fs=100., t=0.5, b=0., r=0.03, cp=[[15., 8., 4.]], method=method
+    )
+    assert vols.shape == (2, 3)
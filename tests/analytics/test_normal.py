@@ -0,0 +1,28 @@
+import numpy as np
+from analytics import normal
+from scipy.stats import norm
+
+
+X = np.linspace(-12., 12., 2401)
+
+
+def test_normal_scalar_accuracy():
+    for x in X:
+        assert np.isclose(normal.cdf(x), norm.cdf(x), rtol=1e-13, atol=1e-300)
+        assert np.isclose(normal.pdf(x), norm.pdf(x), rtol=1e-13, atol=1e-300)
+
+    assert isinstance(normal.cdf(0.5), float)
+    assert normal.cdf(0.) == 0.5
+
+
+def test_normal_array_accuracy():
+    assert np.allclose(normal.cdf_array(X), norm.cdf(X), rtol=1e-14, atol=0)
+    assert np.allclose(normal.pdf_array(X), norm.pdf(X), rtol=1e-14, atol=0)
+
+
+def test_normal_scalar_array_consistency():
+    x = np.linspace(-5., 5., 101)
+
+    assert np.allclose([normal.cdf(value) for value in x], normal.cdf_array(x), rtol=1e-14, atol=0)
+    assert np.allclose([normal.pdf(value) for value in x], normal.pdf_array(x), rtol=1e-14, atol=0)
+    assert np.allclose(normal.cdf_array(x) + normal.cdf_array(-x), 1., rtol=0, atol=1e-15)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analytics.exceptions import BlackScholesInputError
+from analytics.options.black_scholes import Black76CommodityOptionPricer
+from analytics.portfolio import Portfolio
+from api import LocalClient as c
+
+
+def test_portfolio_valuation():
+    positions = pd.DataFrame({
+        'CONTRACT': ['BRENT', 'brent', 'BRENT', 'BRENT', 'XXX'],
+        'EXCHANGE_CODE': ['ICE', None, 'ICE', 'ICE', 'ICE'],
+        'MONTH': ['JAN', 'JAN', 'FEB', 'FEB', 'JAN'],
+        'YEAR': ['2025', '2025', '2025', '2025', '2025'],
+        'OPTION_TYPE': ['C', 'p', 'C', 'P', 'C'],
+        'STRIKE': [np.nan, 80., 90., 85., np.nan],
+        'QUANTITY': [10., -5., 2., 1., 1.]
+    })
+    portfolio = Portfolio.from_dataframe(positions)
+
+    assert len(portfolio) == 5
+    assert portfolio.exchange_code.tolist() == ['ICE'] * 5
+    assert portfolio.expiration().tolist() == ['F2025', 'F2025', 'G2025', 'G2025', 'F2025']
+
+    valuation = portfolio.valuation(second_order=True)
+    for i, position in positions.iloc[:4].iterrows():
+        pricer = Black76CommodityOptionPricer(
+            contract='BRENT', exchange_code='ICE', month=position['MONTH'], year=position['YEAR'],
+            option_type=position['OPTION_TYPE'], strike=None if np.isnan(position['STRIKE']) else position['STRIKE']
+        )
+        assert np.isclose(valuation['PV'][i], pricer.price() * pricer.lot_size() * position['QUANTITY'])
+        assert np.isclose(valuation['DELTA'][i], pricer.greeks()['DELTA'] * pricer.lot_size() * position['QUANTITY'])
+    assert np.isnan(valuation['PV'][4])
+
+    aggregate = portfolio.aggregate(second_order=True)
+    assert aggregate[['CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION']].values.tolist() == [
+        ['BRENT', 'ICE', 'F2025'], ['BRENT', 'ICE', 'G2025'], ['XXX', 'ICE', 'F2025']
+    ]
+    assert aggregate['POSITIONS'].tolist() == [2, 2, 1]
+    assert np.isclose(aggregate['PV'][0], valuation['PV'][:2].sum())
+    assert np.isclose(aggregate['VEGA'][1], valuation['VEGA'][2:4].sum())
+    assert np.isclose(aggregate['VANNA'][1], valuation['VANNA'][2:4].sum())
+    assert np.isnan(aggregate['PV'][2])
+
+    by_type = c.commodity_option_portfolio(positions=positions.iloc[:4], by=['OPTION_TYPE'])
+    assert by_type['OPTION_TYPE'].tolist() == ['C', 'P']
+    assert np.isclose(by_type['PV'].sum(), valuation['PV'][:4].sum())
+
+    with pytest.raises(BlackScholesInputError):
+        Portfolio.from_dataframe(positions.drop(columns=['MONTH']))
+
+
+def test_portfolio_missing_exchange_code():
+    # a mixed book read from CSV has NaN for empty exchange code cells
+    positions = pd.DataFrame({
+        'CONTRACT': ['BRENT', 'BRENT', 'BRENT'],
+        'EXCHANGE_CODE': ['ice', np.nan, ''],
+        'MONTH': ['JAN', 'JAN', 'JAN'],
+        'YEAR': ['2025', '2025', '2025'],
+        'OPTION_TYPE': ['C', 'C', 'C'],
+        'STRIKE': [90., 90., 90.]
+    })
+    portfolio = Portfolio.from_dataframe(positions)
+
+    assert portfolio.exchange_code.tolist() == ['ICE'] * 3
+    valuation = portfolio.valuation()
+    assert np.isclose(valuation['PV'], valuation['PV'][0]).all()
@@ -0,0 +1,45 @@
+import datetime as dt
+import numpy as np
+import pytest
+from analytics.exceptions import BlackScholesCalculationError
+from analytics.options.reference_data import OptionExpiryCalendar, option_expiry, option_expiry_calendar
+from api import LocalClient as c
+
+
+def test_option_expiry_calendar():
+    calendar = OptionExpiryCalendar(calendars={
+        'brent': {'H2023': dt.date(2023, 1, 26), 'G2023': dt.date(2022, 12, 22), 'J2023': dt.date(2023, 2, 23)}
+    })
+
+    assert 'BRENT' in calendar and 'WTI' not in calendar
+    assert calendar.expiry(contract='Brent', month='mar', year='2023') == dt.date(2023, 1, 26)
+    with pytest.raises(BlackScholesCalculationError):
+        calendar.expiry(contract='BRENT', month='DEC', year='2023')
+    with pytest.raises(BlackScholesCalculationError):
+        calendar.expiry(contract='WTI', month='MAR', year='2023')
+
+    # next expiries are strictly after the date, in expiry date order
+    contract_codes, expiry_dates = calendar.next_expiries(contract='BRENT', date=dt.date(2022, 12, 22), n=5)
+    assert contract_codes.tolist() == ['H2023', 'J2023']
+    assert expiry_dates.tolist() == [dt.date(2023, 1, 26), dt.date(2023, 2, 23)]
+    assert calendar.next_expiries(contract='BRENT', date=dt.date(2022, 12, 1))[0].tolist() == ['G2023']
+    assert len(calendar.next_expiries(contract='BRENT', date=dt.date(2023, 3, 1), n=None)[0]) == 0
+
+    contract_codes, year_fractions = calendar.year_fractions(contract='BRENT', trade_date=dt.date(2022, 12, 9))
+    assert contract_codes.tolist() == ['G2023', 'H2023', 'J2023']
+    assert np.allclose(year_fractions, np.array([13, 48, 76]) / 365.25)
+
+
+def test_option_expiry():
+    calendar = option_expiry_calendar()
+    assert option_expiry_calendar() is calendar
+
+    for contract in ('BRENT', 'WTI', 'HH'):
+        option_expiries = c.data(symbol=f'CALENDAR_OPTION_{contract}')['EXPIRATION_DATE']
+        contract_codes, expiry_dates = calendar.next_expiries(contract=contract, date=dt.date(1900, 1, 1), n=None)
+
+        assert sorted(contract_codes.tolist()) == sorted(option_expiries.index.tolist())
+        assert expiry_dates.tolist() == sorted(option_expiries.dt.date.tolist())
+
+    assert option_expiry(contract='BRENT', exchange_code='ICE', month='JAN', year='2025') == \
+           c.data(symbol='CALENDAR_OPTION_BRENT').at['F2025', 'EXPIRATION_DATE'].date()
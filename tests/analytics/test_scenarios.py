@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from analytics.curves.yield_curve import YieldCurve
+from analytics.options.black_scholes import BlackScholesOptionPricer
+from analytics.options.black_scholes_batch import BlackScholesBatchPricer
+from analytics.scenarios import ScenarioEngine, ScenarioSpec
+from api import LocalClient as c
+
+
+def test_scenario_engine():
+    pricer = BlackScholesBatchPricer(
+        option_type=['c', 'p', 'c'], x=[19., 19., 25.], fs=[19., 19., 20.], t=[0.75, 0.75, 1.5], b=0.,
+        r=[0.1, 0.1, 0.05], v=[0.28, 0.28, 0.35]
+    )
+    quantity = np.array([1., -2., 3.])
+    spec = ScenarioSpec(
+        fs_shifts=[-0.1, 0., 0.1], vol_shifts=[-0.05, 0., 0.05], vol_tenor_shifts={1.: 0.01}, rate_shifts=[0., 0.01],
+        days=[0, 30]
+    )
+    engine = ScenarioEngine(pricer=pricer, spec=spec, quantity=quantity)
+
+    values = engine.values()
+    assert values.shape == (3, len(spec)) == (3, 36)
+
+    scenarios = spec.scenarios()
+    for i in range(3):
+        for j, scenario in scenarios.iterrows():
+            expected = BlackScholesOptionPricer(
+                option_type=pricer.option_type[i],
+                x=pricer.x[i],
+                fs=pricer.fs[i] * (1 + scenario['FS_SHIFT']),
+                t=pricer.t[i] - scenario['DAYS'] / 365.25,
+                b=0.,
+                r=pricer.r[i] + scenario['RATE_SHIFT'],
+                v=pricer.v[i] + 0.01 + scenario['VOL_SHIFT']
+            ).price() * quantity[i]
+            assert np.isclose(values[i, j], expected, rtol=0, atol=1e-12)
+
+    # chunking bounds memory without changing results
+    chunked = ScenarioEngine(pricer=pricer, spec=spec, quantity=quantity, max_cells=len(spec))
+    assert chunked.chunk_size() == 1
+    assert np.array_equal(chunked.values(), values)
+    assert np.allclose(chunked.portfolio_values(), values.sum(axis=0))
+
+
+def test_scenario_engine_yield_curve_and_expiry():
+    pricer = BlackScholesBatchPricer(option_type=['c', 'p'], x=[19., 21.], fs=20., t=0.1, b=0., r=0.03, v=0.3)
+    yield_curve = YieldCurve(tenors=[1/12, 1., 2.], rates=[0.02, 0.04, 0.05])
+    engine = ScenarioEngine(pricer=pricer, spec=ScenarioSpec(days=[0, 10, 60]), yield_curve=yield_curve)
+
+    values = engine.values()
+    expected = BlackScholesBatchPricer(
+        option_type=['c', 'p'], x=[19., 21.], fs=20., t=0.1 - 10 / 365.25, b=0., r=0.02, v=0.3
+    ).price()
+
+    # rates are taken from the curve at the decayed time to expiry (flat beyond the curve tenors)
+    assert np.allclose(values[:, 1], expected, rtol=0, atol=1e-12)
+    # expired options are valued at intrinsic
+    assert values[:, 2].tolist() == [1., 1.]
+
+
+def test_commodity_option_scenarios():
+    positions = pd.DataFrame({
+        'CONTRACT': ['BRENT', 'BRENT'],
+        'EXCHANGE_CODE': ['ICE', 'ICE'],
+        'MONTH': ['JAN', 'FEB'],
+        'YEAR': ['2025', '2025'],
+        'OPTION_TYPE': ['C', 'P'],
+        'STRIKE': [np.nan, 85.],
+        'QUANTITY': [10., -5.]
+    })
+    spec = ScenarioSpec.ladder()
+
+    ladder = c.commodity_option_scenarios(positions=positions, fs_shifts=spec.fs_shifts, vol_shifts=spec.vol_shifts)
+
+    assert len(ladder) == 41 * 21
+    assert ladder.columns.tolist() == ['FS_SHIFT', 'VOL_SHIFT', 'RATE_SHIFT', 'DAYS', 'PV', 'PNL']
+    assert not ladder['PV'].isna().any()
+
+    base = ladder[(ladder['FS_SHIFT'] == 0.) & (ladder['VOL_SHIFT'] == 0.)]
+    expected = np.sum(
+        c.commodity_option_price_batch(
+            contract=positions['CONTRACT'], month=positions['MONTH'], year=positions['YEAR'],
+            option_type=positions['OPTION_TYPE'], strike=positions['STRIKE'], exchange_code=positions['EXCHANGE_CODE'],
+            lot_price=True
+        ) * positions['QUANTITY'].values
+    )
+    assert np.isclose(base['PV'].values[0], expected)
+    assert np.isclose(base['PNL'].values[0], 0.)
@@ -16,3 +16,67 @@ def test_interpolate_rate():
         interpolate_rate(
             trade_date=dt.date(day=5, month=12, year=2022), expiry_date=dt.date(day=5, month=12, year=2100)
         )
+
+
+def test_yield_curve():
+    import numpy as np
+    from analytics.curves.yield_curve import YieldCurve, yield_curve
+
+    trade_date = dt.date(day=5, month=12, year=2022)
+    curve = yield_curve(trade_date=trade_date)
+
+    assert np.array_equal(curve.tenors, np.array(YieldCurve.TENORS))
+    assert curve.rate(curve.tenors[4]) == curve.rates[4]
+    assert interpolate_rate(trade_date=trade_date, expiry_date=dt.date(day=5, month=12, year=2025)) == curve.rate(
+        (dt.date(day=5, month=12, year=2025) - trade_date).days / 365.25
+    )
+
+    t = np.linspace(curve.tenors[0], curve.tenors[-1], 500)
+    for interpolation in YieldCurve.INTERPOLATIONS:
+        curve = yield_curve(trade_date=trade_date, interpolation=interpolation)
+        rates = curve.rate(t)
+        discount_factors = curve.discount_factor(t)
+
+        assert rates.shape == t.shape
+        # all interpolations reprice the curve nodes
+        assert np.allclose(curve.rate(curve.tenors), curve.rates)
+        assert np.allclose(discount_factors, np.exp(-rates * t))
+        assert np.all(np.diff(discount_factors) < 0)
+        assert isinstance(curve.rate(2.5), float)
+
+        with pytest.raises(BlackScholesCalculationError):
+            curve.rate(np.array([1., 31.]))
+        assert np.array_equal(
+            curve.rate(np.array([0.01, 31.]), extrapolation='flat'), curve.rate(curve.tenors[[0, -1]])
+        )
+
+    # monotone cubic does not overshoot between tenors
+    curve = YieldCurve(tenors=[1., 2., 3., 4.], rates=[0.01, 0.02, 0.02, 0.03], interpolation='monotone_cubic')
+    rates = curve.rate(np.linspace(2., 3., 11))
+    assert np.allclose(rates, 0.02)
+
+    # log linear i.e. flat forward rates between tenors
+    curve = YieldCurve(tenors=[1., 2.], rates=[0.01, 0.03], interpolation='log_linear')
+    forward = -np.log(curve.discount_factor(2.) / curve.discount_factor(1.))
+    assert np.isclose(-np.log(curve.discount_factor(1.5) / curve.discount_factor(1.)), forward / 2)
+
+
+def test_yield_curve_interpolate():
+    import numpy as np
+    from analytics.curves.yield_curve import YieldCurve
+    from api import LocalClient as c
+
+    rates = c.data(symbol=YieldCurve.SYMBOL, start_date='2022-11-01', end_date='2022-12-09').values
+    t = np.linspace(0., 35., len(rates))
+
+    # every curve of the stack as its own YieldCurve, short & long tenors included
+    for interpolation in YieldCurve.INTERPOLATIONS:
+        curves = [YieldCurve(tenors=YieldCurve.TENORS, rates=_rates, interpolation=interpolation) for _rates in rates]
+        expected = [curve.rate(_t, extrapolation='flat') for curve, _t in zip(curves, t)]
+        assert np.allclose(
+            YieldCurve.interpolate(rates=rates, t=t, interpolation=interpolation, extrapolation='flat'), expected,
+            rtol=1e-12, atol=0
+        )
+
+        with pytest.raises(BlackScholesCalculationError):
+            YieldCurve.interpolate(rates=rates, t=t, interpolation=interpolation)
@@ -0,0 +1,136 @@
+import asyncio
+import env
+import json
+import numpy as np
+import pytest
+import threading
+import time
+from api import AsyncRestClient, LocalClient
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+aiohttp = pytest.importorskip('aiohttp')
+
+
+@pytest.fixture
+def rest_api(monkeypatch):
+    from app import app as flask_app
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(env, 'REST_API_URL', f'http://127.0.0.1:{server.server_port}')
+
+    yield server
+
+    server.shutdown()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_GET(self):
+        with SlowHandler.lock:
+            SlowHandler.in_flight += 1
+            SlowHandler.max_in_flight = max(SlowHandler.max_in_flight, SlowHandler.in_flight)
+        time.sleep(0.1)
+        with SlowHandler.lock:
+            SlowHandler.in_flight -= 1
+
+        body = json.dumps({'SYMBOLS': ['BRENT']}).encode('UTF-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def slow_rest_api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(env, 'REST_API_URL', f'http://127.0.0.1:{server.server_address[1]}')
+    SlowHandler.max_in_flight = 0
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_rest_client_endpoints():
+    from api import RestClient
+
+    endpoints = AsyncRestClient.endpoints()
+
+    # the fan out helpers are endpoints, session internals are not
+    assert set(endpoints) - set(RestClient.endpoints()) == {'gather', 'commodity_option_prices', 'data_frames'}
+
+
+def test_async_rest_client_commodity_option_prices(rest_api):
+    strikes = np.linspace(60., 100., 9)
+    options = [
+        dict(contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type=option_type, strike=strike)
+        for option_type in ('C', 'P') for strike in strikes
+    ]
+
+    async def run():
+        try:
+            return await AsyncRestClient.commodity_option_prices(options, limit=4)
+        finally:
+            await AsyncRestClient._close()
+
+    prices = asyncio.run(run())
+
+    assert prices == pytest.approx([LocalClient.commodity_option_price(**option) for option in options])
+
+
+def test_async_rest_client_data_frames(rest_api):
+    symbols = ('RIFLGFC', 'CALENDAR_OPTION_BRENT', 'BRENT_ICE_B_B_F2025_IVM')
+
+    async def run():
+        try:
+            return await AsyncRestClient.symbols(), await AsyncRestClient.data_frames(symbols, limit=2)
+        finally:
+            await AsyncRestClient._close()
+
+    all_symbols, dataframes = asyncio.run(run())
+
+    assert set(symbols) <= set(all_symbols)
+    for symbol in symbols:
+        assert dataframes[symbol].equals(LocalClient.data(symbol=symbol))
+
+
+def test_async_rest_client_save(rest_api, tmp_path, monkeypatch):
+    dataframe = LocalClient.data(symbol='BRENT_ICE_B_B_F2025_IVM')
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+
+    async def run():
+        try:
+            await AsyncRestClient.save(symbol='TEST', dataframe=dataframe)
+            return await AsyncRestClient.data(symbol='TEST')
+        finally:
+            await AsyncRestClient._close()
+
+    assert asyncio.run(run()).equals(dataframe)
+
+
+def test_async_rest_client_gather_limit(slow_rest_api):
+    async def run():
+        try:
+            return await AsyncRestClient.gather((AsyncRestClient.symbols() for __ in range(20)), limit=10)
+        finally:
+            await AsyncRestClient._close()
+
+    results = asyncio.run(run())
+
+    assert results == [['BRENT']] * 20
+    # requests run concurrently, at most limit in flight
+    assert 1 < SlowHandler.max_in_flight <= 10
@@ -14,9 +14,10 @@ def client(app):
     return app.test_client()
 
 
-def test_save(app, client):
+def test_save(app, client, tmp_path, monkeypatch):
+    import env
     import os
-    import tempfile
+    from market.datastore_adapter import DataAPI
     from market.etl_option_expiries import ICEOptionExpiriesAdapter
 
     symbol = 'CALENDAR_OPTION_BRENT'
@@ -27,18 +28,21 @@ def test_save(app, client):
         use_local_client=True
     ).run(save=False)
 
-    file_name = f'{symbol}.parquet'
-    file_path_local = os.path.sep.join((tempfile.gettempdir(), file_name))
+    file_path_local = str(tmp_path / f'{symbol}.parquet')
     dataframe.to_parquet(file_path_local)
-    file = open(file_path_local, 'rb')
-    data = {
-        'file': file
-    }
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path / 'data'))
 
-    response = client.post(f'/save?SYMBOL={symbol}&FILE_EXTENSION=.parquet', data=data)
+    try:
+        with open(file_path_local, 'rb') as file:
+            response = client.post(f'/save?SYMBOL={symbol}&FILE_EXTENSION=.parquet', data={'file': file})
 
-    assert response.status_code == 200
-    assert response.data.decode('UTF-8') == f'Market data save successful for symbol {symbol}'
+        assert response.status_code == 200
+        assert response.data.decode('UTF-8') == f'Market data save successful for symbol {symbol}'
+        assert DataAPI.query(symbol=symbol).equals(dataframe)
+    finally:
+        # drop analytics results computed from the temporary market data
+        for listener in DataAPI.persist_listeners:
+            listener(symbol)
 
 
 def test_symbols(app, client):
@@ -96,3 +100,276 @@ def test_data(app, client):
 
     dataframe = pq.read_table(io.BytesIO(response.data)).to_pandas()
     assert len(dataframe) > 0
+
+
+def test_option_greeks_batch(app, client):
+    import io
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    dataframe = pd.DataFrame({
+        'OPTION_TYPE': ['C', 'P'], 'X': [19., 19.], 'FS': [19., 19.], 'T': [0.75, 0.75], 'B': [0., 0.],
+        'R': [0.1, 0.1], 'V': [0.28, 0.28]
+    })
+    buffer = io.BytesIO()
+    dataframe.to_parquet(buffer)
+
+    response = client.post('/option_greeks_batch?SECOND_ORDER=true', data=buffer.getvalue())
+
+    assert response.status_code == 200
+
+    greeks = pq.read_table(io.BytesIO(response.data)).to_pandas()
+    assert len(greeks) == 2
+    assert greeks.columns.tolist() == ['DELTA', 'GAMMA', 'THETA', 'VEGA', 'RHO', 'VANNA', 'VOLGA', 'CHARM']
+
+
+def test_data_pushdown(app, client):
+    import io
+    import pyarrow.parquet as pq
+
+    symbol = 'RIFLGFC'
+    url = f'/data?SYMBOL={symbol}&COLUMNS=RIFLGFCY01_N.B&START_DATE=2022-12-01&END_DATE=2022-12-09' \
+          f'&FILTERS=[["RIFLGFCY01_N.B", ">", 0]]'
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+
+    dataframe = pq.read_table(io.BytesIO(response.data)).to_pandas()
+    assert dataframe.columns.tolist() == ['RIFLGFCY01_N.B']
+    assert 0 < len(dataframe) <= 7
+
+
+def test_data_content_negotiation(app, client, tmp_path, monkeypatch):
+    import datetime as dt
+    import env
+    import io
+    import pandas as pd
+    from api import LocalClient as c
+    from api_rest.serialization import (
+        ARROW_FILE_CONTENT_TYPE, ARROW_STREAM_CONTENT_TYPE, CONTENT_TYPES, PARQUET_CONTENT_TYPE, read_table
+    )
+    from market.datastore_adapter import DataAPI
+
+    symbol = 'CALENDAR_OPTION_BRENT'
+    accept = {'Accept': ', '.join(CONTENT_TYPES)}
+
+    # no selection, the stored file is sent as is
+    response = client.get(f'/data?SYMBOL={symbol}', headers=accept)
+    assert response.status_code == 200
+    assert response.content_type == PARQUET_CONTENT_TYPE
+    with open(DataAPI.data_file_path(symbol), 'rb') as data_file:
+        assert response.data == data_file.read()
+
+    response = client.get(f'/data?SYMBOL={symbol}', headers={'Accept': ARROW_STREAM_CONTENT_TYPE})
+    assert response.content_type == ARROW_STREAM_CONTENT_TYPE
+    assert read_table(response.data, response.content_type).to_pandas().equals(c.data(symbol=symbol))
+
+    # selections are sent as an Arrow IPC stream
+    response = client.get('/data?SYMBOL=RIFLGFC&COLUMNS=RIFLGFCY01_N.B&START_DATE=2022-12-01', headers=accept)
+    assert response.content_type == ARROW_STREAM_CONTENT_TYPE
+    expected = c.data(symbol='RIFLGFC', columns=['RIFLGFCY01_N.B'], start_date=dt.date(2022, 12, 1))
+    assert read_table(response.data, response.content_type).to_pandas().equals(expected)
+
+    dataframe = c.data(symbol=symbol)
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(env, 'MARKET_DATA_BACKEND', 'arrow')
+    DataAPI.persist(symbol=symbol, dataframe=dataframe)
+
+    response = client.get(f'/data?SYMBOL={symbol}', headers=accept)
+    assert response.content_type == ARROW_FILE_CONTENT_TYPE
+    with open(DataAPI.data_file_path(symbol), 'rb') as data_file:
+        assert response.data == data_file.read()
+    assert read_table(response.data, response.content_type).to_pandas().equals(dataframe)
+
+    # clients without an Accept header get parquet
+    response = client.get(f'/data?SYMBOL={symbol}')
+    assert response.content_type == PARQUET_CONTENT_TYPE
+    assert pd.read_parquet(io.BytesIO(response.data)).equals(dataframe)
+
+
+def test_data_stream(app, client):
+    import pyarrow as pa
+    from api import LocalClient as c
+    from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE
+
+    response = client.get('/data?SYMBOL=RIFLGFC&STREAM=true&BATCH_SIZE=1000', buffered=False)
+
+    assert response.status_code == 200
+    assert response.content_type == ARROW_STREAM_CONTENT_TYPE
+
+    # one chunk per record batch
+    chunks = list(response.response)
+    assert len(chunks) > 2
+
+    with pa.ipc.open_stream(b''.join(chunks)) as reader:
+        batches = list(reader)
+    assert all(batch.num_rows <= 1000 for batch in batches)
+    assert pa.Table.from_batches(batches).to_pandas().equals(c.data(symbol='RIFLGFC'))
+
+
+def test_data_cache_stats(app, client):
+    from api import LocalClient as c
+
+    c.data(symbol='CALENDAR_OPTION_BRENT')
+    c.data(symbol='CALENDAR_OPTION_BRENT')
+
+    response = client.get('/data_cache_stats')
+    stats = json.loads(response.data)['DATA_CACHE_STATS']
+
+    assert response.status_code == 200
+    assert stats['HITS'] > 0
+    assert stats['SIZE_BYTES'] <= stats['MAX_BYTES']
+
+
+def test_commodity_option_price_batch(app, client):
+    import pandas as pd
+    import pyarrow as pa
+    from api import LocalClient as c
+    from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, PARQUET_CONTENT_TYPE, read_table, write_table
+
+    dataframe = pd.DataFrame({
+        'CONTRACT': ['BRENT', 'BRENT', 'BRENT', 'XXX'],
+        'EXCHANGE_CODE': ['ICE', None, 'ICE', 'ICE'],
+        'MONTH': ['JAN', 'FEB', 'FEB', 'JAN'],
+        'YEAR': ['2025', '2025', '2025', '2025'],
+        'OPTION_TYPE': ['C', 'P', 'C', 'C'],
+        'STRIKE': [None, 85., 90., None],
+        'LOT_PRICE': [False, False, True, False]
+    })
+    expected = [
+        c.commodity_option_price(contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C'),
+        c.commodity_option_price(
+            contract='BRENT', exchange_code='ICE', month='FEB', year='2025', option_type='P', strike=85.
+        ),
+        c.commodity_option_price(
+            contract='BRENT', exchange_code='ICE', month='FEB', year='2025', option_type='C', strike=90.,
+            lot_price=True
+        )
+    ]
+
+    for content_type in (ARROW_STREAM_CONTENT_TYPE, PARQUET_CONTENT_TYPE):
+        response = client.post(
+            '/commodity_option_price_batch', data=write_table(pa.Table.from_pandas(dataframe), content_type),
+            content_type=content_type
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == content_type
+
+        prices = read_table(response.data, response.mimetype).to_pandas()
+        assert prices.columns.tolist() == ['PRICE']
+        assert prices['PRICE'].iloc[:3].tolist() == pytest.approx(expected)
+        assert pd.isna(prices['PRICE'].iloc[3])
+
+    response = client.post(
+        '/commodity_option_greeks_batch?SECOND_ORDER=true',
+        data=write_table(pa.Table.from_pandas(dataframe.drop(columns=['LOT_PRICE'])), ARROW_STREAM_CONTENT_TYPE),
+        content_type=ARROW_STREAM_CONTENT_TYPE
+    )
+
+    assert response.status_code == 200
+
+    greeks = read_table(response.data, response.mimetype).to_pandas()
+    assert greeks.columns.tolist() == ['DELTA', 'GAMMA', 'THETA', 'VEGA', 'RHO', 'VANNA', 'VOLGA', 'CHARM']
+    expected_greeks = c.commodity_option_greeks(
+        contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C', strike=None
+    )
+    assert greeks['DELTA'].iloc[0] == pytest.approx(expected_greeks['DELTA'])
+
+    response = client.post(
+        '/commodity_option_price_batch', data=write_table(pa.Table.from_pandas(dataframe.drop(columns=['MONTH'])))
+    )
+
+    assert response.status_code == 400
+
+
+def test_commodity_option_scenarios(app, client):
+    import pandas as pd
+    import pyarrow as pa
+    from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, read_table, write_table
+
+    positions = pd.DataFrame({
+        'CONTRACT': ['BRENT', 'BRENT'], 'MONTH': ['JAN', 'FEB'], 'YEAR': ['2025', '2025'], 'OPTION_TYPE': ['C', 'P'],
+        'QUANTITY': [10., -5.]
+    })
+    url = '/commodity_option_scenarios?FS_SHIFTS=[-0.1, 0, 0.1]&VOL_SHIFTS=[-0.01, 0, 0.01]&DAYS=[0, 7]' \
+          '&VOL_TENOR_SHIFTS={"1": 0.01, "2": 0.02}'
+
+    response = client.post(
+        url, data=write_table(pa.Table.from_pandas(positions), ARROW_STREAM_CONTENT_TYPE),
+        content_type=ARROW_STREAM_CONTENT_TYPE
+    )
+
+    assert response.status_code == 200
+
+    ladder = read_table(response.data, response.mimetype).to_pandas()
+    assert len(ladder) == 3 * 3 * 2
+    assert ladder.columns.tolist() == ['FS_SHIFT', 'VOL_SHIFT', 'RATE_SHIFT', 'DAYS', 'PV', 'PNL']
+
+    response = client.post(
+        '/commodity_option_scenarios?FS_SHIFT_TYPE=xxx',
+        data=write_table(pa.Table.from_pandas(positions), ARROW_STREAM_CONTENT_TYPE),
+        content_type=ARROW_STREAM_CONTENT_TYPE
+    )
+
+    assert response.status_code == 400
+
+
+def test_commodity_option_portfolio(app, client):
+    import pandas as pd
+    import pyarrow as pa
+    from api_rest.serialization import read_table, write_table
+
+    positions = pd.DataFrame({
+        'CONTRACT': ['BRENT', 'BRENT', 'BRENT'], 'MONTH': ['JAN', 'JAN', 'FEB'], 'YEAR': ['2025', '2025', '2025'],
+        'OPTION_TYPE': ['C', 'P', 'C'], 'QUANTITY': [10., -5., 1.]
+    })
+
+    response = client.post('/commodity_option_portfolio?BY=CONTRACT,EXPIRATION', data=write_table(
+        pa.Table.from_pandas(positions)
+    ))
+
+    assert response.status_code == 200
+
+    aggregate = read_table(response.data, response.mimetype).to_pandas()
+    assert aggregate.columns.tolist() == [
+        'CONTRACT', 'EXPIRATION', 'POSITIONS', 'PV', 'DELTA', 'GAMMA', 'THETA', 'VEGA', 'RHO'
+    ]
+    assert aggregate['POSITIONS'].tolist() == [2, 1]
+
+
+def test_implied_vol(app, client):
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    from api_rest.serialization import read_table, write_table
+
+    dataframe = pd.DataFrame({
+        'OPTION_TYPE': ['C', 'P'], 'X': [19., 19.], 'FS': [19., 19.], 'T': [0.75, 0.75], 'B': [0., 0.],
+        'R': [0.1, 0.1], 'PRICE': [1.70105072524, 1.70105072524]
+    })
+
+    response = client.post('/implied_vol?METHOD=rational', data=write_table(pa.Table.from_pandas(dataframe)))
+
+    assert response.status_code == 200
+
+    vols = read_table(response.data, response.mimetype).to_pandas()
+    assert np.allclose(vols['IMPLIED_VOL'], 0.28)
+
+
+def test_commodity_option_price_history(app, client):
+    from api_rest.serialization import ARROW_STREAM_CONTENT_TYPE, read_table
+
+    response = client.get(
+        '/commodity_option_price_history?CONTRACT=BRENT&MONTH=JAN&YEAR=2025&OPTION_TYPE=C&START_DATE=2022-11-01'
+        '&END_DATE=2022-12-09&QUANTITY=10', headers={'Accept': ARROW_STREAM_CONTENT_TYPE}
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == ARROW_STREAM_CONTENT_TYPE
+
+    history = read_table(response.data, response.mimetype).to_pandas()
+    assert history.index.name == 'Date'
+    assert len(history) > 20
+    assert history.columns.tolist()[:7] == ['FS', 'X', 'T', 'R', 'V', 'PRICE', 'PV']
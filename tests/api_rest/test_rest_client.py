@@ -0,0 +1,180 @@
+import env
+import json
+import pytest
+import threading
+from api import RestClient
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SymbolsHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    client_ports = []
+    failures = 0
+
+    def do_GET(self):
+        SymbolsHandler.client_ports.append(self.client_address[1])
+        if SymbolsHandler.failures > 0:
+            SymbolsHandler.failures -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps({'SYMBOLS': ['BRENT']}).encode('UTF-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def rest_api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SymbolsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(env, 'REST_API_URL', f'http://127.0.0.1:{server.server_address[1]}')
+    monkeypatch.setattr(env, 'REST_RETRY_BACKOFF', 0.)
+    SymbolsHandler.client_ports = []
+    SymbolsHandler.failures = 0
+    RestClient._close()
+
+    yield server
+
+    RestClient._close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def flask_rest_api(monkeypatch):
+    from app import app as flask_app
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(env, 'REST_API_URL', f'http://127.0.0.1:{server.server_port}')
+    RestClient._close()
+
+    yield server
+
+    RestClient._close()
+    server.shutdown()
+
+
+def test_rest_client_keep_alive(rest_api):
+    for __ in range(5):
+        assert RestClient.symbols() == ['BRENT']
+
+    # a single pooled connection serves all requests
+    assert len(SymbolsHandler.client_ports) == 5
+    assert len(set(SymbolsHandler.client_ports)) == 1
+
+
+def test_rest_client_retry(rest_api):
+    SymbolsHandler.failures = 2
+
+    assert RestClient.symbols() == ['BRENT']
+    assert len(SymbolsHandler.client_ports) == 3
+
+
+def test_rest_client_threads(rest_api):
+    sessions = []
+
+    def worker():
+        sessions.append(RestClient._http_session())
+        assert RestClient.symbols() == ['BRENT']
+
+    threads = [threading.Thread(target=worker) for __ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # one session per thread, all mounted on the shared connection pool
+    assert len(set(map(id, sessions))) == 4
+    assert all(session.get_adapter(env.REST_API_URL) is RestClient._http_adapter() for session in sessions)
+    assert len(SymbolsHandler.client_ports) == 4
+
+
+def test_rest_client_endpoints():
+    endpoints = RestClient.endpoints()
+
+    # connection pool internals are not endpoints
+    assert 'symbols' in endpoints and 'data_batches' in endpoints
+    internals = {'adapter', 'adapter_lock', 'sessions', 'http_adapter', 'http_session', 'request', 'close'}
+    assert not internals & set(endpoints)
+
+
+def test_rest_client_data_batches(flask_rest_api):
+    import pandas as pd
+    import pyarrow as pa
+    from api import LocalClient
+
+    symbol = 'RIFLGFC'
+    expected = LocalClient.data(symbol=symbol)
+
+    batches = RestClient.data_batches(symbol=symbol, batch_size=500)
+    sizes = [batch.num_rows for batch in batches]
+    assert len(sizes) > 1
+    assert max(sizes) <= 500
+    assert sum(sizes) == len(expected)
+    assert batches.response.raw.closed
+
+    with RestClient.data_batches(symbol=symbol, batch_size=500) as batches:
+        table = pa.Table.from_batches(list(batches), schema=batches.schema)
+    assert table.to_pandas().equals(expected)
+
+    selection = dict(columns=['RIFLGFCY01_N.B'], start_date='2022-01-01', filters=[('RIFLGFCY01_N.B', '>', 0.)])
+    dataframe = RestClient.data_batches(symbol=symbol, **selection).to_pandas()
+    assert isinstance(dataframe, pd.DataFrame)
+    assert dataframe.equals(LocalClient.data(symbol=symbol, **selection))
+
+    with pytest.raises(ValueError):
+        RestClient.data_batches(symbol='MISSING_SYMBOL')
+
+
+def test_rest_client_save(flask_rest_api, tmp_path, monkeypatch):
+    from api import LocalClient
+
+    dataframe = LocalClient.data(symbol='BRENT_ICE_B_B_F2025_IVM')
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+
+    symbols = [f'TEST_{i}' for i in range(8)]
+    results = {}
+
+    def save(symbol: str, i: int):
+        results[symbol] = RestClient.save(symbol=symbol, dataframe=dataframe.iloc[i:])
+
+    # concurrent saves of different symbols, uploaded from memory
+    threads = [threading.Thread(target=save, args=(symbol, i)) for i, symbol in enumerate(symbols)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i, symbol in enumerate(symbols):
+        assert results[symbol] == f'Market data save successful for symbol {symbol}'
+        assert RestClient.data(symbol=symbol).equals(dataframe.iloc[i:])
+
+    response = RestClient._request(
+        'POST', f'{env.REST_API_URL}/save', params={'SYMBOL': 'TEST_0', 'FILE_EXTENSION': '.parquet'},
+        data=b'not a parquet file', headers={'Content-Type': 'application/vnd.apache.parquet'}
+    )
+    assert response.status_code == 400
+    assert RestClient.data(symbol='TEST_0').equals(dataframe)
+
+
+def test_rest_client_option_greeks_batch(flask_rest_api):
+    import numpy as np
+    from api import LocalClient
+
+    kwargs = dict(option_type=['c', 'p', 'c'], x=np.array([90., 100., 110.]), fs=100., t=0.5, b=0., r=0.03, v=0.3)
+
+    greeks = RestClient.option_greeks_batch(second_order=True, **kwargs)
+    assert greeks.equals(LocalClient.option_greeks_batch(second_order=True, **kwargs))
@@ -0,0 +1,26 @@
+from benchmarks.harness import Benchmark, compare
+
+
+def test_benchmark_measure():
+    calls = []
+    setups = []
+
+    timings = Benchmark(name='test', function=lambda: calls.append(1)).measure(repeat=3, min_time=0.001)
+    assert timings['number'] >= 1
+    assert len(calls) >= 3 * timings['number']
+    assert 0 < timings['min'] <= timings['median']
+
+    # setup runs before every (single call) sample
+    calls.clear()
+    timings = Benchmark(name='test', function=lambda: calls.append(1), setup=lambda: setups.append(1)).measure(3)
+    assert timings['number'] == 1
+    assert len(calls) == len(setups) == 3
+
+
+def test_benchmark_compare():
+    baseline = {'benchmarks': {'a': {'median': 1.}, 'b': {'median': 1.}, 'c': {'median': 1.}}}
+    results = {'benchmarks': {'a': {'median': 1.1}, 'b': {'median': 2.}, 'd': {'median': 1.}}}
+
+    rows = compare(baseline=baseline, results=results, threshold=1.25)
+
+    assert [(name, regressed) for name, *__, regressed in rows] == [('a', False), ('b', True)]
@@ -1,10 +1,26 @@
+import env
 import os
+import pytest
 
 from api import LocalClient as c
 from env import ROOT_PATH
 
 
-def test_ice_option_expiries_adapter():
+@pytest.fixture
+def market_data_path(tmp_path, monkeypatch):
+    from market.datastore_adapter import DataAPI
+
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+
+    yield str(tmp_path)
+
+    # drop analytics results computed from the temporary market data
+    for file_name in os.listdir(tmp_path):
+        for listener in DataAPI.persist_listeners:
+            listener(file_name.split('.')[0])
+
+
+def test_ice_option_expiries_adapter(market_data_path):
     from market.etl_option_expiries import ICEOptionExpiriesAdapter
 
     symbol = 'CALENDAR_OPTION_BRENT'
@@ -20,7 +36,7 @@ def test_ice_option_expiries_adapter():
     assert dataframe.equals(c.data(symbol=symbol))
 
 
-def test_cme_option_expiries_adapter():
+def test_cme_option_expiries_adapter(market_data_path):
     from market.etl_option_expiries import CMEOptionExpiriesAdapter
 
     symbol = 'CALENDAR_OPTION_HH'
@@ -36,7 +52,7 @@ def test_cme_option_expiries_adapter():
     assert dataframe.equals(c.data(symbol=symbol))
 
 
-def test_fed_ust_adapter():
+def test_fed_ust_adapter(market_data_path):
     from market.etl_yield_curve import FEDUSTAdapter
 
     symbol = 'RIFLGFC'
@@ -55,7 +71,7 @@ def test_fed_ust_adapter():
     assert dataframe.equals(c.data(symbol=symbol))
 
 
-def test_quandl_owf_implied_vols_adapter():
+def test_quandl_owf_implied_vols_adapter(market_data_path):
     from analytics.constants import FUTURES_DELIVERY_MAP
     from market.etl_implied_vols import QuandlOWFImpliedVolsAdapter
 
@@ -89,3 +105,51 @@ def test_quandl_owf_implied_vols_adapter():
     ]
     assert len(dataframe) > 0
     assert dataframe.equals(c.data(symbol=symbol))
+
+
+def test_settlement_implied_vols_adapter(tmp_path):
+    import numpy as np
+    import pandas as pd
+    from analytics.options.black_scholes_batch import Black76CommodityBatchPricer
+    from analytics.options.volatility import implied_vol_model, implied_vol_model_symbol, implied_vol_smile, Smile
+    from env import TRADE_DATE
+    from market.etl_calibration import SettlementImpliedVolsAdapter
+
+    month, year = (array.ravel() for array in np.meshgrid(['JAN', 'MAR', 'JUN', 'DEC'], ['2024', '2025']))
+    smiles = [implied_vol_smile(TRADE_DATE, 'BRENT', 'ICE', m, y) for m, y in zip(month, year)]
+
+    # settlement quotes priced off the OWF smiles, out of the money calls & puts within the fitted moneyness range
+    strikes = [smile.future * np.exp(np.linspace(smile.min_money, smile.max_money, 41)) for smile in smiles]
+    quotes = pd.DataFrame({
+        'CONTRACT': 'BRENT',
+        'MONTH': np.repeat(month, 41),
+        'YEAR': np.repeat(year, 41),
+        'STRIKE': np.concatenate(strikes),
+        'FUTURE': np.repeat([smile.future for smile in smiles], 41)
+    })
+    quotes['OPTION_TYPE'] = np.where(quotes['STRIKE'] >= quotes['FUTURE'], 'C', 'P')
+    # empty exchange code cells fall back to the contract default exchange
+    quotes.insert(1, 'EXCHANGE_CODE', np.where(np.arange(len(quotes)) % 2, 'ICE', None))
+    quotes['PRICE'] = Black76CommodityBatchPricer(
+        option_type=quotes['OPTION_TYPE'], contract='BRENT', exchange_code='ICE', month=quotes['MONTH'],
+        year=quotes['YEAR'], strike=quotes['STRIKE']
+    ).price()
+    url = str(tmp_path / 'quotes.csv')
+    quotes.to_csv(url, index=False)
+
+    dataframe = SettlementImpliedVolsAdapter(symbol=None, url=url, use_local_client=True).run(save=False)
+
+    assert len(dataframe) == len(smiles)
+    for m, y, smile, _strikes in zip(month, year, smiles, strikes):
+        expected = implied_vol_model(TRADE_DATE, 'BRENT', 'ICE', m, y)
+        symbol = implied_vol_model_symbol('BRENT', 'ICE', m, y)
+        row = dataframe[dataframe['SYMBOL'] == symbol].drop(columns='SYMBOL')
+
+        # exact schema of the OWF IVM rows
+        assert row.columns.tolist() == expected.columns.tolist()
+        assert (row.dtypes == expected.dtypes).all()
+        assert row.index.equals(expected.index)
+        assert np.isclose(row['DtE'].values[0], expected['DtE'].values[0], atol=1.)
+
+        calibrated = Smile.from_data_row(row)
+        assert np.max(np.abs(calibrated.implied_vol(_strikes) - smile.implied_vol(_strikes))) < 1e-4
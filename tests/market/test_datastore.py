@@ -0,0 +1,347 @@
+import env
+import glob
+import numpy as np
+import os
+import pandas as pd
+import pytest
+import shutil
+from market.datastore_adapter import ImpliedVolModelStore
+from market.snapshot import MarketSnapshot
+
+
+@pytest.fixture
+def market_data_path(tmp_path, monkeypatch):
+    from market.datastore_adapter import DataAPI
+
+    file_paths = glob.glob(os.path.sep.join((env.MARKET_DATA_PATH, 'BRENT_*_IVM.parquet'))) + [
+        os.path.sep.join((env.MARKET_DATA_PATH, 'RIFLGFC.parquet')),
+        os.path.sep.join((env.MARKET_DATA_PATH, 'CALENDAR_OPTION_BRENT.parquet'))
+    ]
+    for file_path in file_paths:
+        shutil.copy(file_path, tmp_path)
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+
+    yield str(tmp_path)
+
+    # drop analytics results computed from the temporary market data
+    for file_path in file_paths:
+        for listener in DataAPI.persist_listeners:
+            listener(file_path.split(os.path.sep)[-1].split('.')[0])
+
+
+def test_implied_vol_model_store(market_data_path):
+    snapshot_files = MarketSnapshot.from_market_data(trade_date=env.TRADE_DATE)
+
+    assert not ImpliedVolModelStore.exists()
+    rows = ImpliedVolModelStore.migrate()
+    assert ImpliedVolModelStore.exists()
+
+    dataframe = ImpliedVolModelStore.query()
+    assert len(dataframe) == rows
+    assert dataframe.columns.tolist()[:4] == ['CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION', 'DATE']
+
+    smiles = ImpliedVolModelStore.query(trade_date=env.TRADE_DATE, columns=['Future', 'AtM'])
+    assert smiles.columns.tolist() == ['CONTRACT', 'EXCHANGE_CODE', 'EXPIRATION', 'DATE', 'Future', 'AtM']
+    assert (smiles['DATE'] == pd.Timestamp(env.TRADE_DATE)).all()
+
+    expected = pd.read_parquet(os.path.sep.join((market_data_path, 'BRENT_ICE_B_B_F2025_IVM.parquet')))
+    history = ImpliedVolModelStore.query(
+        contract='BRENT', exchange_code='ICE', expiration='F2025', start_date='2022-01-01', end_date='2022-12-31'
+    )
+    expected = expected[(expected.index >= '2022-01-01') & (expected.index <= '2022-12-31')].sort_index()
+    assert np.array_equal(history['AtM'].values, expected['AtM'].values)
+
+    snapshot_store = MarketSnapshot.from_market_data(trade_date=env.TRADE_DATE)
+    assert snapshot_store.ivm_index.keys() == snapshot_files.ivm_index.keys()
+    for symbol, index in snapshot_files.ivm_index.items():
+        assert np.array_equal(
+            snapshot_store.ivm_values[snapshot_store.ivm_index[symbol]], snapshot_files.ivm_values[index],
+            equal_nan=True
+        )
+
+
+def test_implied_vol_model_store_persist(market_data_path):
+    import threading
+    from market.datastore_adapter import DataAPI
+
+    ImpliedVolModelStore.migrate()
+    store_files = {
+        file_path: os.stat(file_path).st_mtime_ns
+        for file_path in glob.glob(os.path.sep.join((ImpliedVolModelStore.path(), '*', '*.parquet')))
+    }
+    assert len(store_files) == len(glob.glob(os.path.sep.join((market_data_path, '*_IVM.parquet'))))
+
+    # concurrent saves of expiries of the same contract each rewrite only their own file
+    symbols = ['BRENT_ICE_B_B_F2025_IVM', 'BRENT_ICE_B_B_G2025_IVM', 'BRENT_ICE_B_B_H2025_IVM']
+    dataframes = {symbol: DataAPI.query(symbol=symbol) for symbol in symbols}
+    for dataframe in dataframes.values():
+        dataframe['AtM'] = dataframe['AtM'] * 2
+
+    threads = [
+        threading.Thread(target=DataAPI.persist, kwargs=dict(symbol=symbol, dataframe=dataframe))
+        for symbol, dataframe in dataframes.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for symbol, dataframe in dataframes.items():
+        contract, exchange_code, *__, expiration, __ = symbol.split('_')
+        rows = ImpliedVolModelStore.query(contract=contract, exchange_code=exchange_code, expiration=expiration)
+        assert np.array_equal(rows['AtM'].values, dataframe.sort_index()['AtM'].values)
+
+    changed = {file_path for file_path, mtime in store_files.items() if os.stat(file_path).st_mtime_ns != mtime}
+    assert sorted(file_path.split(os.path.sep)[-1] for file_path in changed) == [
+        'ICE_F2025.parquet', 'ICE_G2025.parquet', 'ICE_H2025.parquet'
+    ]
+    assert not glob.glob(os.path.sep.join((ImpliedVolModelStore.path(), '*', '.*.tmp')))
+
+
+def test_data_api_query_pushdown():
+    from api import LocalClient as c
+
+    symbol = 'BRENT_ICE_B_B_F2025_IVM'
+    dataframe = c.data(symbol=symbol)
+
+    selection = c.data(
+        symbol=symbol, columns=['Future', 'AtM'], start_date='2022-11-01', end_date=env.TRADE_DATE,
+        filters=[('AtM', '>', 0.4)]
+    )
+    expected = dataframe[
+        (dataframe.index >= '2022-11-01') & (dataframe.index <= pd.Timestamp(env.TRADE_DATE)) & (dataframe['AtM'] > 0.4)
+    ][['Future', 'AtM']]
+
+    assert len(selection) > 0
+    assert selection.equals(expected)
+
+    calendar = c.data(symbol='CALENDAR_OPTION_BRENT', columns=['EXPIRATION_DATE'])
+    assert calendar.equals(c.data(symbol='CALENDAR_OPTION_BRENT'))
+
+    with pytest.raises(FileNotFoundError):
+        c.data(symbol='XXX', columns=['EXPIRATION_DATE'])
+
+
+def test_data_cache(market_data_path):
+    from analytics.curves.yield_curve import interpolate_rate
+    from market.datastore_adapter import DataAPI, DataCache
+
+    symbol = 'RIFLGFC'
+    stats = DataAPI.cache_stats()
+    dataframe = DataAPI.query(symbol=symbol)
+    dataframe.columns = range(len(dataframe.columns))
+    cached = DataAPI.query(symbol=symbol)
+
+    assert DataAPI.cache_stats()['HITS'] == stats['HITS'] + 1
+    assert cached.columns.tolist()[0] == 'RIFLGFCM01_N.B'
+
+    # in place edits of a returned frame do not reach the cache
+    expected = cached.copy()
+    cached.iloc[0, 0] = -999.
+    cached.iloc[:, 1] *= 2.
+    cached = DataAPI.query(symbol=symbol)
+    assert cached.equals(expected)
+
+    trade_date = env.TRADE_DATE
+    expiry_date = trade_date.replace(year=trade_date.year + 3)
+    rate = interpolate_rate(trade_date=trade_date, expiry_date=expiry_date)
+
+    DataAPI.persist(symbol=symbol, dataframe=cached + 0.01)
+
+    assert np.allclose(DataAPI.query(symbol=symbol).values, cached.values + 0.01, equal_nan=True)
+    assert np.isclose(interpolate_rate(trade_date=trade_date, expiry_date=expiry_date), rate + 0.01)
+
+    cache = DataCache(max_bytes=cached.memory_usage(index=True, deep=True).sum() * 2)
+    for version in range(3):
+        cache.put((f'SYMBOL_{version}', 'PATH', version), cached)
+    assert cache.stats()['ENTRIES'] == 2
+    assert cache.stats()['EVICTIONS'] == 1
+    assert cache.get(('SYMBOL_0', 'PATH', 0)) is None
+    assert cache.get(('SYMBOL_2', 'PATH', 2)) is cached
+
+    cache.put(('SYMBOL_2', 'PATH', 3), cached)
+    assert cache.stats()['ENTRIES'] == 2
+    assert cache.get(('SYMBOL_2', 'PATH', 2)) is None
+
+
+def test_arrow_ipc_backend(tmp_path, monkeypatch):
+    import io
+    import pyarrow as pa
+    from market.datastore_adapter import ArrowIPCStorageBackend, DataAPI
+    from werkzeug.datastructures import FileStorage
+
+    dataframe = pd.read_parquet(os.path.sep.join((env.MARKET_DATA_PATH, 'BRENT_ICE_B_B_F2025_IVM.parquet')))
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(env, 'MARKET_DATA_BACKEND', 'arrow')
+
+    symbol = 'BRENT_ICE_B_B_F2025_IVM'
+    DataAPI.persist(symbol=symbol, dataframe=dataframe)
+
+    assert os.path.exists(os.path.sep.join((str(tmp_path), f'{symbol}.arrow')))
+    assert DataAPI.symbols() == [symbol]
+    assert DataAPI.query(symbol=symbol).equals(dataframe)
+
+    selection = DataAPI.query(symbol=symbol, columns=['AtM'], start_date='2022-01-01', filters=[('AtM', '>', 0.4)])
+    expected = dataframe[(dataframe.index >= '2022-01-01') & (dataframe['AtM'] > 0.4)][['AtM']]
+    assert selection.equals(expected)
+
+    batches = list(DataAPI.query_batches(symbol=symbol, columns=['AtM'], start_date='2022-01-01', batch_size=100))
+    assert max(batch.num_rows for batch in batches) <= 100
+    assert pa.Table.from_batches(batches).to_pandas().equals(dataframe[dataframe.index >= '2022-01-01'][['AtM']])
+
+    # memory mapped reads are zero copy
+    allocated_bytes = pa.total_allocated_bytes()
+    table = ArrowIPCStorageBackend().read(DataAPI.data_file_path(symbol))
+    assert table.num_rows == len(dataframe)
+    assert pa.total_allocated_bytes() == allocated_bytes
+
+    buffer = io.BytesIO()
+    dataframe.iloc[:10].to_parquet(buffer)
+    buffer.seek(0)
+    DataAPI.persist(symbol=symbol, dataframe=FileStorage(stream=buffer, filename=f'{symbol}.parquet'))
+    assert DataAPI.query(symbol=symbol).equals(dataframe.iloc[:10])
+
+
+def test_versioned_data_store(market_data_path):
+    import time
+    from analytics.options.black_scholes import Black76CommodityOptionPricer
+    from api import LocalClient as c
+    from market.datastore_adapter import DataAPI
+
+    symbol = 'BRENT_ICE_B_B_F2025_IVM'
+    legacy = c.data(symbol=symbol)
+    pricer_kwargs = dict(contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type='C', strike=90.)
+    legacy_price = Black76CommodityOptionPricer(**pricer_kwargs).price()
+
+    before = pd.Timestamp.utcnow()
+    time.sleep(0.001)
+    modified = legacy.copy()
+    modified['AtM'] = modified['AtM'] * 1.5
+    DataAPI.persist(symbol=symbol, dataframe=modified)
+    time.sleep(0.001)
+    after = pd.Timestamp.utcnow()
+
+    # pre versioning data is archived as known since the epoch
+    versions = DataAPI.versions(symbol=symbol)
+    assert len(versions) == 2
+    assert versions['KNOWLEDGE_TIME'].iloc[0] == pd.Timestamp(0)
+
+    assert c.data(symbol=symbol).equals(modified)
+    assert c.data(symbol=symbol, as_of=after).equals(modified)
+    assert c.data(symbol=symbol, as_of=before).equals(legacy)
+    assert c.data(symbol=symbol, as_of=before, columns=['AtM'], start_date='2022-01-01').equals(
+        legacy[legacy.index >= '2022-01-01'][['AtM']]
+    )
+
+    assert Black76CommodityOptionPricer(**pricer_kwargs, as_of=before).price() == legacy_price
+    assert Black76CommodityOptionPricer(**pricer_kwargs, as_of=after).price() != legacy_price
+    assert Black76CommodityOptionPricer(**pricer_kwargs).price() != legacy_price
+
+    snapshot = MarketSnapshot.load(as_of=before)
+    assert snapshot.as_of == before
+    assert Black76CommodityOptionPricer(**pricer_kwargs, snapshot=snapshot).price() == legacy_price
+
+
+@pytest.mark.parametrize('backend', ['parquet', 'arrow'])
+def test_persist_upload_stream(tmp_path, monkeypatch, backend):
+    import io
+    from market.datastore_adapter import DataAPI, VersionManifest
+
+    dataframe = pd.read_parquet(os.path.sep.join((env.MARKET_DATA_PATH, 'BRENT_ICE_B_B_F2025_IVM.parquet')))
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(env, 'MARKET_DATA_BACKEND', backend)
+    monkeypatch.setattr(DataAPI, 'UPLOAD_CHUNK_SIZE', 1024)
+
+    symbol = 'BRENT_ICE_B_B_F2025_IVM'
+    DataAPI.persist(symbol=symbol, dataframe=io.BytesIO(dataframe.to_parquet()))
+    assert DataAPI.query(symbol=symbol).equals(dataframe)
+
+    # invalid uploads are rejected from the parquet footer, the stored data & versions are unchanged
+    for data in (b'', b'not a parquet file', dataframe.to_parquet()[:-100]):
+        with pytest.raises(ValueError):
+            DataAPI.persist(symbol=symbol, dataframe=io.BytesIO(data))
+
+    assert DataAPI.query(symbol=symbol).equals(dataframe)
+    assert len(DataAPI.versions(symbol=symbol)) == 1
+    assert not glob.glob(os.path.sep.join((VersionManifest(symbol=symbol).path, '*.tmp*')))
+
+
+def test_versioned_data_store_as_of_before_first_version(tmp_path, monkeypatch):
+    from market.datastore_adapter import DataAPI
+
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+
+    symbol = 'TEST'
+    before = pd.Timestamp.utcnow()
+    dataframe = pd.DataFrame({'VALUE': [1., 2.]}, index=pd.DatetimeIndex(['2022-01-03', '2022-01-04'], name='DATE'))
+    DataAPI.persist(symbol=symbol, dataframe=dataframe)
+    DataAPI.persist(symbol=symbol, dataframe=dataframe * 2)
+
+    versions = DataAPI.versions(symbol=symbol)
+    assert len(versions) == 2
+    assert versions['KNOWLEDGE_TIME'].is_monotonic_increasing
+    assert all(os.path.exists(file_path) for file_path in versions['FILE'])
+
+    assert DataAPI.query(symbol=symbol).equals(dataframe * 2)
+    assert DataAPI.query(symbol=symbol, as_of=versions['KNOWLEDGE_TIME'].iloc[0]).equals(dataframe)
+    with pytest.raises(FileNotFoundError):
+        DataAPI.query(symbol=symbol, as_of=before)
+
+
+def test_option_expiry_calendar_invalidation(market_data_path):
+    import datetime as dt
+    from analytics.options.reference_data import option_expiry, option_expiry_calendar
+    from api import LocalClient as c
+
+    calendar = option_expiry_calendar()
+    expiry_date = option_expiry(contract='BRENT', exchange_code='ICE', month='JAN', year='2025')
+
+    # re-saving a calendar drops the index, the next lookup rebuilds it from the saved calendar
+    dataframe = c.data(symbol='CALENDAR_OPTION_BRENT')
+    dataframe.at['F2025', 'EXPIRATION_DATE'] = pd.Timestamp(expiry_date + dt.timedelta(days=1))
+    c.save(symbol='CALENDAR_OPTION_BRENT', dataframe=dataframe)
+
+    assert option_expiry_calendar() is not calendar
+    assert option_expiry(contract='BRENT', exchange_code='ICE', month='JAN', year='2025') == \
+           expiry_date + dt.timedelta(days=1)
+
+
+def test_versioned_data_store_stale_lock(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+    from market.datastore_adapter import DataAPI, VersionManifest
+
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(VersionManifest, 'LOCK_TIMEOUT', 1.)
+
+    symbol = 'TEST'
+    dataframe = pd.DataFrame({'VALUE': [1., 2.]}, index=pd.DatetimeIndex(['2022-01-03', '2022-01-04'], name='DATE'))
+    DataAPI.persist(symbol=symbol, dataframe=dataframe)
+
+    # a writer dying while it holds the lock leaves the lock file behind
+    subprocess.run([sys.executable, '-c', (
+        'import os\n'
+        'from market.datastore_adapter import VersionManifest\n'
+        f'with VersionManifest(symbol={symbol!r}, market_data_path={str(tmp_path)!r})._lock():\n'
+        '    os._exit(1)\n'
+    )], cwd=env.ROOT_PATH, check=False)
+    assert os.path.exists(os.path.sep.join((VersionManifest(symbol=symbol).path, '.lock')))
+
+    DataAPI.persist(symbol=symbol, dataframe=dataframe * 2)
+    assert DataAPI.query(symbol=symbol).equals(dataframe * 2)
+    assert len(DataAPI.versions(symbol=symbol)) == 2
+
+
+def test_versioned_data_store_head_write(tmp_path, monkeypatch):
+    from market.datastore_adapter import DataAPI
+
+    monkeypatch.setattr(env, 'MARKET_DATA_PATH', str(tmp_path))
+
+    symbol = 'TEST'
+    dataframe = pd.DataFrame({'VALUE': [1., 2.]}, index=pd.DatetimeIndex(['2022-01-03', '2022-01-04'], name='DATE'))
+    DataAPI.persist(symbol=symbol, dataframe=dataframe)
+    version_file_path = DataAPI.versions(symbol=symbol)['FILE'].iloc[0]
+
+    # writing the head in place leaves the version history untouched
+    (dataframe * 2).to_parquet(str(tmp_path / f'{symbol}.parquet'))
+    assert pd.read_parquet(version_file_path).equals(dataframe)
@@ -0,0 +1,48 @@
+import env
+import numpy as np
+import pytest
+from analytics.exceptions import BlackScholesCalculationError
+from analytics.options.black_scholes import Black76CommodityOptionPricer
+from analytics.options.black_scholes_batch import Black76CommodityBatchPricer
+from market.datastore_adapter import DataAPI
+from market.snapshot import MarketSnapshot
+
+
+def test_market_snapshot_pricing(monkeypatch):
+    snapshot = MarketSnapshot.load()
+
+    assert snapshot.trade_date == env.TRADE_DATE
+    assert MarketSnapshot.load(env.TRADE_DATE) is snapshot
+    assert len(snapshot.ivm_index) > 0
+
+    expected = [
+        Black76CommodityOptionPricer(
+            contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type=option_type, strike=strike
+        ).price()
+        for option_type, strike in (('C', None), ('P', 70.5))
+    ]
+
+    def query(*args, **kwargs):
+        raise AssertionError('MarketSnapshot pricing should not query market data')
+
+    monkeypatch.setattr(DataAPI, 'query', query)
+
+    prices = [
+        Black76CommodityOptionPricer(
+            contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type=option_type, strike=strike,
+            snapshot=snapshot
+        ).price()
+        for option_type, strike in (('C', None), ('P', 70.5))
+    ]
+    batch_prices = Black76CommodityBatchPricer(
+        contract='BRENT', exchange_code='ICE', month='JAN', year='2025', option_type=['C', 'P'],
+        strike=[np.nan, 70.5], snapshot=snapshot
+    ).price()
+
+    assert np.allclose(prices, expected, rtol=0, atol=1e-12)
+    assert np.allclose(batch_prices, expected, rtol=0, atol=1e-12)
+
+    with pytest.raises(BlackScholesCalculationError):
+        Black76CommodityOptionPricer(
+            contract='XXX', exchange_code='ICE', month='JAN', year='2025', option_type='C', snapshot=snapshot
+        )